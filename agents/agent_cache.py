@@ -0,0 +1,84 @@
+"""
+Agent Cache - Memoized agent outputs keyed by a fingerprint of the context they read
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+# Default number of cached agent outputs
+DEFAULT_CACHE_SIZE = 256
+
+# Default seconds a cached agent output stays valid
+DEFAULT_CACHE_TTL = 300.0
+
+
+def context_fingerprint(context: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> str:
+    """
+    Canonical hash of the given context fields (the whole context if fields is None)
+
+    Dict key order does not matter; list order does.
+    """
+    if fields is not None:
+        context = {field: context.get(field) for field in fields}
+    canonical = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AgentResultCache:
+    """
+    LRU cache of agent outputs with a time-to-live
+
+    Keys are (agent name, context fingerprint) pairs. Entries older than
+    `ttl` seconds are treated as misses; once `max_entries` is reached the
+    least recently used entry is dropped.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        """
+        Args:
+            max_entries: Maximum cached outputs (0 disables caching)
+            ttl: Seconds an output stays valid (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, agent_name: str, fingerprint: str) -> Optional[Dict]:
+        """Get a cached output, or None on a miss"""
+        key = (agent_name, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, agent_name: str, fingerprint: str, result: Dict) -> None:
+        """Cache an agent output"""
+        if self.max_entries <= 0:
+            return
+        key = (agent_name, fingerprint)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached output"""
+        with self._lock:
+            self._entries.clear()
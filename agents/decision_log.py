@@ -0,0 +1,98 @@
+"""
+Decision Log - Bounded record of coordinator decisions with running per-agent counters
+"""
+
+import json
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Decisions kept in memory by default
+DEFAULT_RETENTION = 1000
+
+
+class DecisionLog:
+    """
+    Ring buffer of the most recent decision records
+
+    Older records fall off the front once `retention` is reached. If
+    `spill_path` is set, every record is also appended to that file as one
+    JSON line, so the full history survives on disk while memory stays flat.
+    Per-agent call counters cover every decision ever logged, not just the
+    retained ones, and are updated as records arrive. Timed-out calls (agent
+    input status "timeout") are counted separately as well as failed.
+    """
+
+    def __init__(self, retention: int = DEFAULT_RETENTION, spill_path: Optional[str] = None):
+        """
+        Args:
+            retention: Number of decision records kept in memory
+            spill_path: Optional JSON-lines file every record is appended to
+        """
+        if retention <= 0:
+            raise ValueError("retention must be positive")
+
+        self.retention = retention
+        self.spill_path = spill_path
+        self.total_decisions = 0
+        self._records = deque(maxlen=retention)
+        self._failed_calls = {}
+        self._timed_out_calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self._records))
+
+    def __getitem__(self, index: int) -> Dict:
+        return self._records[index]
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add a decision record and update the per-agent counters"""
+        with self._lock:
+            self._records.append(record)
+            self.total_decisions += 1
+            for agent_name, agent_input in record.get("agent_inputs", {}).items():
+                if "error" in agent_input:
+                    self._failed_calls[agent_name] = self._failed_calls.get(agent_name, 0) + 1
+                if agent_input.get("status") == "timeout":
+                    self._timed_out_calls[agent_name] = self._timed_out_calls.get(agent_name, 0) + 1
+
+            if self.spill_path:
+                with open(self.spill_path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        """Get the most recent records, oldest first"""
+        if limit <= 0:
+            return []
+        with self._lock:
+            newest = list(islice(reversed(self._records), limit))
+        newest.reverse()
+        return newest
+
+    def agent_performance(self, agent_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get call counts and success rates for each agent
+
+        An agent missing from a decision's inputs counts as a successful call,
+        matching how the coordinator has always scored the log.
+        """
+        with self._lock:
+            total_calls = self.total_decisions
+            failed_calls = {agent_name: self._failed_calls.get(agent_name, 0) for agent_name in agent_names}
+            timed_out_calls = {agent_name: self._timed_out_calls.get(agent_name, 0) for agent_name in failed_calls}
+
+        performance = {}
+        for agent_name, failed in failed_calls.items():
+            successful_calls = total_calls - failed
+            performance[agent_name] = {
+                "success_rate": (successful_calls / total_calls * 100) if total_calls > 0 else 0,
+                "total_calls": total_calls,
+                "successful_calls": successful_calls,
+                "timed_out_calls": timed_out_calls[agent_name]
+            }
+        return performance
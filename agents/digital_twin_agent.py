@@ -3,30 +3,93 @@ Digital Twin Agent - Manages the digital twin state and risk assessment
 """
 
 from datetime import datetime
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
 import json
 
-class DigitalTwinAgent:
+from agents.risk_factors import RiskFactorSet
+from agents.twin_events import EVENT_TYPES, TwinEventLog
+
+# Risk level definitions
+RISK_LEVELS = {
+    'Healthy': {'score_range': (80, 100), 'color': '#10b981'},
+    'Mild Risk': {'score_range': (60, 79), 'color': '#f59e0b'},
+    'High Risk': {'score_range': (0, 59), 'color': '#ef4444'}
+}
+
+# Health score of a new twin
+INITIAL_HEALTH_SCORE = 85
+
+# Emergencies kept in the live state
+MAX_EMERGENCY_EVENTS = 10
+
+
+class TwinState:
+    """Compact per-patient digital twin state"""
+    
+    __slots__ = (
+        'risk_level',
+        'last_updated',
+        'risk_factors',
+        'health_score',
+        'active_conditions',
+        'medication_effects',
+        'emergency_events'
+    )
+    
     def __init__(self):
-        self.name = "DigitalTwinAgent"
-        self.version = "1.0"
-        
-        # Initialize digital twin state
-        self.current_state = {
-            'risk_level': 'Healthy',
-            'last_updated': datetime.now(),
-            'risk_factors': [],
-            'health_score': 85,
-            'active_conditions': [],
-            'medication_effects': [],
-            'emergency_events': []
-        }
-        
-        # Risk level definitions
-        self.risk_levels = {
-            'Healthy': {'score_range': (80, 100), 'color': '#10b981'},
-            'Mild Risk': {'score_range': (60, 79), 'color': '#f59e0b'},
-            'High Risk': {'score_range': (0, 59), 'color': '#ef4444'}
-        }
+        self.risk_level = 'Healthy'
+        self.last_updated = datetime.now()
+        self.risk_factors = RiskFactorSet()
+        self.health_score = INITIAL_HEALTH_SCORE
+        self.active_conditions = []
+        self.medication_effects = []
+        self.emergency_events = []
+    
+    def to_dict(self):
+        """Get the state as a plain dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a state saved with to_dict"""
+        state = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(state, name, data[name])
+        return state
+
+
+class DigitalTwinAgent:
+    """
+    Digital twin of one patient
+    
+    Instances are kept small so a server can hold thousands of them; use
+    TwinRegistry (agents.twin_registry) to manage one twin per patient.
+    """
+    
+    __slots__ = ('patient_id', 'state', 'events')
+    
+    name = "DigitalTwinAgent"
+    version = "1.0"
+    risk_levels = RISK_LEVELS
+    
+    def __init__(self, patient_id=None, state=None, events=None):
+        """
+        Args:
+            patient_id (str, optional): Patient this twin models
+            state (TwinState, optional): Existing state to resume from
+            events (TwinEventLog, optional): Existing event history to resume from
+        """
+        self.patient_id = patient_id
+        self.state = state or TwinState()
+        self.events = events if events is not None else TwinEventLog(self.state.to_dict())
+    
+    @property
+    def nbytes(self):
+        """Estimated memory use of the twin's event history and snapshots"""
+        return self.events.nbytes
     
     def run(self, event_type, event_data):
         """
@@ -34,31 +97,225 @@ class DigitalTwinAgent:
         
         Args:
             event_type (str): Type of event (vitals_update, medicine_intake, emergency, etc.)
-            event_data (dict): Event-specific data
+            event_data (dict): Event-specific data; a datetime 'timestamp' sets the event time
         
         Returns:
             dict: Updated digital twin state
         """
         try:
-            if event_type == "vitals_update":
-                return self._handle_vitals_update(event_data)
-            elif event_type == "medicine_intake":
-                return self._handle_medicine_intake(event_data)
-            elif event_type == "drug_interaction":
-                return self._handle_drug_interaction(event_data)
-            elif event_type == "emergency":
-                return self._handle_emergency(event_data)
-            elif event_type == "emergency_resolved":
-                return self._handle_emergency_resolved()
-            else:
-                return self._get_current_state()
+            if event_type in EVENT_TYPES:
+                self._record_event(event_type, event_data)
+                self._update_risk_level()
+            return self._get_current_state()
         except Exception as e:
             return {
                 'error': f'Digital twin update failed: {str(e)}',
-                'risk_level': self.current_state['risk_level']
+                'risk_level': self.state.risk_level
             }
     
-    def _handle_vitals_update(self, vitals_data):
+    def apply_events(self, events):
+        """
+        Apply a batch of events in one pass, e.g. to backfill historical data
+        
+        The batch is sorted by event time (events at equal times keep their
+        order). If it starts after the latest logged event it is folded in
+        and logged in bulk (see _fold_and_log); otherwise it is merged into the
+        history in one rebuild from the nearest earlier snapshot (see
+        _merge_events). The risk level and the returned state are computed
+        once at the end instead of per event. Payloads are logged as given, not
+        copied, so they must not be changed afterwards. Only the most recent
+        part of a long backfill stays replayable (see
+        twin_events.DEFAULT_MAX_BYTES).
+        
+        Args:
+            events: Iterable of (event_type, event_data) pairs, in any order
+        
+        Returns:
+            dict: Updated digital twin state, with 'failed_events' listing each
+                event that could not be applied (unknown types included) as
+                {'index': position in the batch, 'event_type', 'error'}
+        """
+        batch = [
+            (self._event_time(event_data), event_type, event_data, index)
+            for index, (event_type, event_data) in enumerate(events)
+        ]
+        batch.sort(key=itemgetter(0))
+        
+        failed_events = [
+            {'index': index, 'event_type': event_type, 'error': 'Unknown event type'}
+            for _, event_type, _, index in batch
+            if event_type not in EVENT_TYPES
+        ]
+        if failed_events:
+            batch = [event for event in batch if event[1] in EVENT_TYPES]
+        
+        if batch and self.events.is_late(batch[0][0]):
+            failures = self._merge_events(batch)
+        else:
+            failures = self._fold_and_log(batch)
+        
+        for (_, event_type, _, index), error in failures:
+            failed_events.append({'index': index, 'event_type': event_type, 'error': str(error)})
+        failed_events.sort(key=lambda failure: failure['index'])
+        
+        self._update_risk_level()
+        current_state = self._get_current_state()
+        current_state['failed_events'] = failed_events
+        return current_state
+    
+    def state_at(self, when):
+        """
+        Rebuild the twin state as it was at a point in time
+        
+        Args:
+            when (datetime): Point in time
+        
+        Returns:
+            dict: Digital twin state at that time, or None if it is older than the retained history
+        """
+        plan = self.events.replay_plan(when)
+        if plan is None:
+            return None
+        
+        snapshot, events = plan
+        past = DigitalTwinAgent(self.patient_id, TwinState.from_dict(snapshot))
+        for timestamp, event_type, event_data in events:
+            try:
+                past._apply_event(event_type, event_data, timestamp)
+            except Exception:
+                # A logged event that no longer applies is skipped, as in _merge_events
+                continue
+        past._update_risk_level()
+        return past._get_current_state()
+    
+    def _record_event(self, event_type, event_data):
+        """
+        Fold an event into the state and log it, snapshotting when one is due
+        
+        The event is only logged once it has been applied. An event older than
+        the latest logged one is merged into the history (see _merge_events).
+        """
+        event = (self._event_time(event_data), event_type, dict(event_data), 0)
+        if self.events.is_late(event[0]):
+            failures = self._merge_events([event])
+        else:
+            failures = self._fold_and_log([event])
+        if failures:
+            raise failures[0][1]
+    
+    def _fold_and_log(self, events):
+        """
+        Fold time-ordered events that go after the logged ones into the state and log them
+        
+        Applied events are logged in bulk a snapshot interval at a time, with a
+        snapshot taken at each interval boundary. Leading events that the log's
+        retention would drop anyway are folded without being logged, and the
+        log restarts after them (see TwinEventLog.unretained_count).
+        
+        Args:
+            events (list): (datetime, event_type, event_data, index) tuples in
+                time order. index is the event's position in the caller's
+                batch, or None for an already logged event, which is logged
+                again even if it no longer applies.
+        
+        Returns:
+            list: (event tuple, exception) for each event that failed to apply
+        """
+        failures = []
+        skip = self.events.unretained_count(events) if len(events) > 1 else 0
+        skipped = 0
+        for event in islice(events, skip):
+            timestamp, event_type, event_data, index = event
+            try:
+                self._apply_event(event_type, event_data, timestamp)
+            except Exception as e:
+                if index is not None:
+                    failures.append((event, e))
+                    continue
+            skipped += 1
+            skipped_until = timestamp
+        if skipped:
+            self._update_risk_level()
+            self.events.skip(skipped, skipped_until, self.state.to_dict())
+        
+        pending = []
+        room = self.events.events_until_snapshot()
+        for event in islice(events, skip, None):
+            timestamp, event_type, event_data, index = event
+            try:
+                self._apply_event(event_type, event_data, timestamp)
+            except Exception as e:
+                if index is not None:
+                    failures.append((event, e))
+                    continue
+            pending.append(event)
+            if len(pending) >= room:
+                self.events.extend(pending)
+                pending = []
+                self._update_risk_level()
+                self.events.add_snapshot(self.state.to_dict())
+                room = self.events.snapshot_interval
+        if pending:
+            self.events.extend(pending)
+        return failures
+    
+    def _merge_events(self, batch):
+        """
+        Merge time-ordered events into the history and rebuild the state
+        
+        The state is rebuilt from the nearest snapshot before the earliest new
+        event by replaying the logged events after it merged with the new ones
+        (logged events first at equal times). Snapshots are retaken on the way.
+        New events that fail to apply are left out of the log; logged events
+        that fail on replay are kept and skipped, as in state_at.
+        
+        Args:
+            batch (list): (datetime, event_type, event_data, index) tuples in
+                time order (see _fold_and_log)
+        
+        Returns:
+            list: (event tuple, exception) for each new event that failed to apply
+        """
+        position, snapshot, logged = self.events.replay_from(batch[0][0])
+        rebuilt = DigitalTwinAgent(self.patient_id, TwinState.from_dict(snapshot), self.events)
+        self.events.truncate(position)
+        
+        merged = merge(
+            ((timestamp, event_type, event_data, None) for timestamp, event_type, event_data in logged),
+            batch,
+            key=itemgetter(0)
+        )
+        failures = rebuilt._fold_and_log(list(merged))
+        
+        self.state = rebuilt.state
+        return failures
+    
+    def _apply_event(self, event_type, event_data, timestamp):
+        """
+        Fold one event into the state (the risk level is updated separately)
+        
+        Each handler reads and checks its whole payload before changing
+        anything (starting with expiring stale risk factors), so an event that
+        fails to apply leaves the state as it was.
+        """
+        if event_type == "vitals_update":
+            self._handle_vitals_update(event_data, timestamp)
+        elif event_type == "medicine_intake":
+            self._handle_medicine_intake(event_data, timestamp)
+        elif event_type == "drug_interaction":
+            self._handle_drug_interaction(event_data, timestamp)
+        elif event_type == "emergency":
+            self._handle_emergency(event_data, timestamp)
+        elif event_type == "emergency_resolved":
+            self._handle_emergency_resolved(timestamp)
+    
+    @staticmethod
+    def _event_time(event_data):
+        """Get an event's time: its datetime 'timestamp' if given, otherwise now"""
+        timestamp = event_data.get('timestamp')
+        return timestamp if isinstance(timestamp, datetime) else datetime.now()
+    
+    def _handle_vitals_update(self, vitals_data, timestamp):
         """Handle vital signs update"""
         risk_factors = []
         health_impact = 0
@@ -100,150 +357,146 @@ class DigitalTwinAgent:
             health_impact -= 20
         
         # Update state
-        self.current_state['risk_factors'] = list(set(self.current_state['risk_factors'] + risk_factors))
-        self.current_state['health_score'] = max(0, min(100, self.current_state['health_score'] + health_impact))
-        self.current_state['last_updated'] = datetime.now()
-        
-        # Update risk level based on health score
-        self._update_risk_level()
-        
-        return self._get_current_state()
+        self.state.risk_factors.expire(timestamp)
+        for risk_factor in risk_factors:
+            self.state.risk_factors.add(risk_factor, timestamp)
+        self.state.health_score = max(0, min(100, self.state.health_score + health_impact))
+        self.state.last_updated = timestamp
     
-    def _handle_medicine_intake(self, medicine_data):
+    def _handle_medicine_intake(self, medicine_data, timestamp):
         """Handle medicine intake event"""
         medicine = medicine_data.get('medicine', '')
         interaction = medicine_data.get('interaction', {})
+        severity = interaction.get('severity', 'None')
+        
+        self.state.risk_factors.expire(timestamp)
         
         # Add to medication effects
         effect = {
             'medicine': medicine,
-            'timestamp': datetime.now(),
-            'interaction_severity': interaction.get('severity', 'None')
+            'timestamp': timestamp,
+            'interaction_severity': severity
         }
         
-        self.current_state['medication_effects'].append(effect)
+        self.state.medication_effects.append(effect)
         
         # Keep only last 10 medication effects
-        if len(self.current_state['medication_effects']) > 10:
-            self.current_state['medication_effects'] = self.current_state['medication_effects'][-10:]
+        if len(self.state.medication_effects) > 10:
+            self.state.medication_effects = self.state.medication_effects[-10:]
         
         # Adjust health score based on interaction severity
-        severity = interaction.get('severity', 'None')
         if severity == 'High':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 25)
-            self.current_state['risk_factors'].append('High-Risk Drug Interaction')
+            self.state.health_score = max(0, self.state.health_score - 25)
+            self.state.risk_factors.add('High-Risk Drug Interaction', timestamp)
         elif severity == 'Medium':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 10)
-            self.current_state['risk_factors'].append('Moderate Drug Interaction')
+            self.state.health_score = max(0, self.state.health_score - 10)
+            self.state.risk_factors.add('Moderate Drug Interaction', timestamp)
         elif severity == 'Low':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 3)
-        
-        self.current_state['last_updated'] = datetime.now()
-        self._update_risk_level()
+            self.state.health_score = max(0, self.state.health_score - 3)
         
-        return self._get_current_state()
+        self.state.last_updated = timestamp
     
-    def _handle_drug_interaction(self, interaction_data):
+    def _handle_drug_interaction(self, interaction_data, timestamp):
         """Handle drug-drug interaction analysis"""
         severity = interaction_data.get('severity', 'None')
         
+        self.state.risk_factors.expire(timestamp)
+        
         # Update risk factors based on interaction severity
         if severity == 'High':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 30)
-            self.current_state['risk_factors'].append('Severe Drug Interaction')
+            self.state.health_score = max(0, self.state.health_score - 30)
+            self.state.risk_factors.add('Severe Drug Interaction', timestamp)
         elif severity == 'Medium':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 15)
-            self.current_state['risk_factors'].append('Moderate Drug Interaction')
+            self.state.health_score = max(0, self.state.health_score - 15)
+            self.state.risk_factors.add('Moderate Drug Interaction', timestamp)
         elif severity == 'Low':
-            self.current_state['health_score'] = max(0, self.current_state['health_score'] - 5)
-            self.current_state['risk_factors'].append('Minor Drug Interaction')
-        
-        self.current_state['last_updated'] = datetime.now()
-        self._update_risk_level()
+            self.state.health_score = max(0, self.state.health_score - 5)
+            self.state.risk_factors.add('Minor Drug Interaction', timestamp)
         
-        return self._get_current_state()
+        self.state.last_updated = timestamp
     
-    def _handle_emergency(self, emergency_data):
+    def _handle_emergency(self, emergency_data, timestamp):
         """Handle emergency event"""
         emergency_type = emergency_data.get('type', 'Unknown')
         severity = emergency_data.get('severity', 'Medium')
         
+        # Significant health score impact for emergencies
+        severity_impact = {
+            'High': -40,
+            'Medium': -25,
+            'Low': -10
+        }
+        
+        impact = severity_impact.get(severity, -25)
+        risk_factor = f'Active Emergency: {emergency_type}'
+        
+        self.state.risk_factors.expire(timestamp)
+        
         # Add emergency event
         emergency_event = {
             'type': emergency_type,
             'severity': severity,
-            'timestamp': datetime.now(),
+            'timestamp': timestamp,
             'status': 'Active'
         }
         
-        self.current_state['emergency_events'].append(emergency_event)
+        self.state.emergency_events.append(emergency_event)
         
-        # Significant health score impact for emergencies
-        severity_impact = {
-            'High': -40,
-            'Medium': -25,
-            'Low': -10
-        }
+        # Keep only the most recent emergencies (full history is in the event log)
+        if len(self.state.emergency_events) > MAX_EMERGENCY_EVENTS:
+            self.state.emergency_events = self.state.emergency_events[-MAX_EMERGENCY_EVENTS:]
         
-        impact = severity_impact.get(severity, -25)
-        self.current_state['health_score'] = max(0, self.current_state['health_score'] + impact)
+        self.state.health_score = max(0, self.state.health_score + impact)
         
         # Add emergency as risk factor
-        self.current_state['risk_factors'].append(f'Active Emergency: {emergency_type}')
-        
-        self.current_state['last_updated'] = datetime.now()
-        self._update_risk_level()
+        self.state.risk_factors.add(risk_factor, timestamp)
         
-        return self._get_current_state()
+        self.state.last_updated = timestamp
     
-    def _handle_emergency_resolved(self):
+    def _handle_emergency_resolved(self, timestamp):
         """Handle emergency resolution"""
+        self.state.risk_factors.expire(timestamp)
+        
         # Mark recent emergencies as resolved
-        for event in self.current_state['emergency_events']:
+        for event in self.state.emergency_events:
             if event.get('status') == 'Active':
                 event['status'] = 'Resolved'
-                event['resolved_at'] = datetime.now()
+                event['resolved_at'] = timestamp
         
         # Remove active emergency risk factors
-        self.current_state['risk_factors'] = [
-            rf for rf in self.current_state['risk_factors'] 
-            if not rf.startswith('Active Emergency:')
-        ]
+        self.state.risk_factors.discard_prefix('Active Emergency:')
         
         # Improve health score slightly
-        self.current_state['health_score'] = min(100, self.current_state['health_score'] + 15)
+        self.state.health_score = min(100, self.state.health_score + 15)
         
-        self.current_state['last_updated'] = datetime.now()
-        self._update_risk_level()
-        
-        return self._get_current_state()
+        self.state.last_updated = timestamp
     
     def _update_risk_level(self):
         """Update risk level based on current health score"""
-        score = self.current_state['health_score']
+        score = self.state.health_score
         
         for level, data in self.risk_levels.items():
             min_score, max_score = data['score_range']
             if min_score <= score <= max_score:
-                self.current_state['risk_level'] = level
+                self.state.risk_level = level
                 break
     
     def _get_current_state(self):
         """Get current digital twin state"""
         return {
-            'risk_level': self.current_state['risk_level'],
-            'health_score': self.current_state['health_score'],
-            'risk_factors': self.current_state['risk_factors'],
-            'last_updated': self.current_state['last_updated'],
-            'active_conditions': self.current_state['active_conditions'],
-            'medication_effects': self.current_state['medication_effects'][-5:],  # Last 5 effects
-            'emergency_events': self.current_state['emergency_events'][-3:],  # Last 3 events
+            'risk_level': self.state.risk_level,
+            'health_score': self.state.health_score,
+            'risk_factors': self.state.risk_factors.names(),
+            'last_updated': self.state.last_updated,
+            'active_conditions': self.state.active_conditions,
+            'medication_effects': self.state.medication_effects[-5:],  # Last 5 effects
+            'emergency_events': self.state.emergency_events[-3:],  # Last 3 events
             'visual_state': self._get_visual_state()
         }
     
     def _get_visual_state(self):
         """Get visual representation state for 3D model"""
-        risk_level = self.current_state['risk_level']
+        risk_level = self.state.risk_level
         
         visual_states = {
             'Healthy': {
@@ -271,9 +524,10 @@ class DigitalTwinAgent:
     def get_risk_assessment(self):
         """Get detailed risk assessment"""
         return {
-            'current_risk_level': self.current_state['risk_level'],
-            'health_score': self.current_state['health_score'],
-            'risk_factors': self.current_state['risk_factors'],
+            'current_risk_level': self.state.risk_level,
+            'health_score': self.state.health_score,
+            'risk_factors': self.state.risk_factors.names(),
+            'risk_factor_details': self.state.risk_factors.details(),
             'recommendations': self._get_risk_recommendations(),
             'trend': self._calculate_risk_trend(),
             'next_assessment_due': self._get_next_assessment_time()
@@ -283,7 +537,7 @@ class DigitalTwinAgent:
         """Get recommendations based on current risk factors"""
         recommendations = []
         
-        risk_factors = self.current_state['risk_factors']
+        risk_factors = self.state.risk_factors
         
         if 'Hypertension' in risk_factors:
             recommendations.extend([
@@ -325,7 +579,7 @@ class DigitalTwinAgent:
     def _calculate_risk_trend(self):
         """Calculate risk trend (simplified)"""
         # In a real implementation, this would analyze historical data
-        current_score = self.current_state['health_score']
+        current_score = self.state.health_score
         
         if current_score >= 80:
             return "Stable - Low Risk"
@@ -336,7 +590,7 @@ class DigitalTwinAgent:
     
     def _get_next_assessment_time(self):
         """Get next recommended assessment time"""
-        risk_level = self.current_state['risk_level']
+        risk_level = self.state.risk_level
         
         if risk_level == 'High Risk':
             return "Within 24 hours"
@@ -347,13 +601,6 @@ class DigitalTwinAgent:
     
     def reset_state(self):
         """Reset digital twin to healthy state"""
-        self.current_state = {
-            'risk_level': 'Healthy',
-            'last_updated': datetime.now(),
-            'risk_factors': [],
-            'health_score': 85,
-            'active_conditions': [],
-            'medication_effects': [],
-            'emergency_events': []
-        }
+        self.state = TwinState()
+        self.events = TwinEventLog(self.state.to_dict())
         return self._get_current_state()
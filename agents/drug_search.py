@@ -0,0 +1,178 @@
+"""
+Drug Search - Prefix and fuzzy drug-name autocomplete index
+"""
+
+from bisect import bisect_left
+
+# Common brand names mapped to the generic names used in the dataset
+BRAND_ALIASES = {
+    'Advil': 'Ibuprofen',
+    'Motrin': 'Ibuprofen',
+    'Tylenol': 'Acetaminophen',
+    'Aleve': 'Naproxen',
+    'Benadryl': 'Diphenhydramine',
+    'Claritin': 'Loratadine',
+    'Zyrtec': 'Cetirizine',
+    'Pepcid': 'Famotidine',
+    'Tums': 'Calcium carbonate',
+    'Robitussin': 'Guaifenesin',
+    'Sudafed': 'Pseudoephedrine',
+    'Lipitor': 'Atorvastatin',
+    'Zocor': 'Simvastatin',
+    'Glucophage': 'Metformin',
+    'Zestril': 'Lisinopril',
+    'Prinivil': 'Lisinopril',
+    'Norvasc': 'Amlodipine',
+    'Prilosec': 'Omeprazole',
+    'Coumadin': 'Warfarin',
+    'Lasix': 'Furosemide',
+    'Lanoxin': 'Digoxin',
+    'Zoloft': 'Sertraline',
+    'Prozac': 'Fluoxetine',
+    'Ativan': 'Lorazepam',
+    'Neurontin': 'Gabapentin',
+    'Januvia': 'Sitagliptin',
+    'Plavix': 'Clopidogrel',
+    'Xarelto': 'Rivaroxaban',
+    'Synthroid': 'Levothyroxine',
+    'Deltasone': 'Prednisone'
+}
+
+# Minimum trigram similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+
+class DrugSearchIndex:
+    """
+    Autocomplete index over a drug-name vocabulary
+
+    Matches are ranked: exact name, name prefix, word prefix (e.g. "glar"
+    finds "Insulin Glargine"), substring (e.g. "statin" finds "Atorvastatin"),
+    then fuzzy trigram matches for misspellings.
+    Brand names resolve to their generic drug.
+    """
+
+    def __init__(self, drug_names, aliases=BRAND_ALIASES):
+        """
+        Args:
+            drug_names (list): Drug names to index
+            aliases (dict, optional): Alternative name -> drug name mappings
+        """
+        self.names = sorted(set(drug_names))
+
+        by_lower = {}
+        for name in self.names:
+            by_lower.setdefault(name.lower(), []).append(name)
+
+        # Sorted (key, name) arrays for prefix search
+        name_entries = [(key, name) for key, names in by_lower.items() for name in names]
+        for alias, generic in aliases.items():
+            for name in by_lower.get(generic.lower(), []):
+                name_entries.append((alias.lower(), name))
+
+        word_entries = []
+        for key, name in name_entries:
+            for word in key.split()[1:]:
+                word_entries.append((word.strip('(),-'), name))
+
+        name_entries.sort()
+        word_entries.sort()
+        self._name_keys = [key for key, _ in name_entries]
+        self._name_values = [name for _, name in name_entries]
+        self._word_keys = [key for key, _ in word_entries]
+        self._word_values = [name for _, name in word_entries]
+
+        # Trigram -> entry positions, for fuzzy matching
+        self._trigrams = {}
+        self._entry_trigrams = []
+        for position, key in enumerate(self._name_keys):
+            grams = self._trigrams_of(key)
+            self._entry_trigrams.append(len(grams))
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(position)
+
+    def search(self, prefix, limit=10):
+        """
+        Find drug names matching what the user has typed so far
+
+        Args:
+            prefix (str): Text typed so far
+            limit (int): Maximum number of names to return
+
+        Returns:
+            list: Matching drug names, best matches first
+        """
+        query = prefix.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        results = []
+        seen = set()
+
+        def add(name):
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+            return len(results) >= limit
+
+        indexes = ((self._name_keys, self._name_values), (self._word_keys, self._word_values))
+
+        # Exact matches sort first within the prefix range
+        for keys, values in indexes:
+            position = bisect_left(keys, query)
+            while position < len(keys) and keys[position] == query:
+                if add(values[position]):
+                    return results
+                position += 1
+
+        for keys, values in indexes:
+            position = bisect_left(keys, query)
+            while position < len(keys) and keys[position].startswith(query):
+                if add(values[position]):
+                    return results
+                position += 1
+
+        for name in self._substring_matches(query):
+            if add(name):
+                return results
+
+        for name in self._fuzzy_matches(query):
+            if add(name):
+                break
+
+        return results
+
+    def _substring_matches(self, query):
+        """Get names containing the query, found through the trigrams every match must share"""
+        if len(query) < 3:
+            return []
+
+        postings = sorted((self._trigrams.get(query[i:i + 3], []) for i in range(len(query) - 2)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [self._name_values[position] for position in sorted(candidates) if query in self._name_keys[position]]
+
+    def _fuzzy_matches(self, query):
+        """Get names whose trigram similarity to the query passes the threshold"""
+        grams = self._trigrams_of(query)
+        if len(query) < 3 or not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for position in self._trigrams.get(gram, []):
+                shared[position] = shared.get(position, 0) + 1
+
+        scored = []
+        for position, count in shared.items():
+            score = count / (len(grams) + self._entry_trigrams[position] - count)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, self._name_keys[position], self._name_values[position]))
+
+        scored.sort()
+        return [name for _, _, name in scored]
+
+    @staticmethod
+    def _trigrams_of(text):
+        """Get the set of padded trigrams of a string"""
+        padded = f'  {text} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -3,14 +3,45 @@ Enhanced AI Coordinator for MediAI Guardian 3.0
 Manages all agentic AI interactions and decision-making
 """
 
+import asyncio
+import inspect
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import random
+from itertools import combinations
+
+from agents.agent_cache import AgentResultCache, context_fingerprint, DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+from agents.decision_log import DecisionLog, DEFAULT_RETENTION
+from agents.interaction_store import get_interaction_store
+
+# How coordinate_decision runs the agents
+EXECUTION_MODES = ("sequential", "threads")
+
+# Seconds an agent may take in concurrent modes before it is reported as timed out
+DEFAULT_AGENT_TIMEOUT = 10.0
 
 class AgenticAICoordinator:
-    def __init__(self):
+    def __init__(self, execution_mode: str = "sequential", agent_timeout: float = DEFAULT_AGENT_TIMEOUT,
+                 agent_timeouts: Optional[Dict[str, float]] = None, decision_retention: int = DEFAULT_RETENTION,
+                 decision_spill_path: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE,
+                 cache_ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        """
+        Args:
+            execution_mode: "sequential" runs agents one after another,
+                "threads" runs them concurrently on a thread pool
+            agent_timeout: Default per-agent timeout in seconds (concurrent modes)
+            agent_timeouts: Per-agent overrides of agent_timeout, keyed by agent name
+            decision_retention: Number of decision records kept in memory
+            decision_spill_path: Optional JSON-lines file every decision is appended to
+            cache_size: Number of agent outputs memoized (0 disables memoization)
+            cache_ttl: Seconds a memoized agent output stays valid (None for no expiry)
+        """
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"execution_mode must be one of {EXECUTION_MODES}")
+        
         self.agents = {
             "ddi_agent": DDIAgent(),
             "digital_twin_agent": DigitalTwinAgent(),
@@ -19,22 +50,167 @@ class AgenticAICoordinator:
             "doctor_support_agent": DoctorSupportAgent(),
             "mediai_chat_agent": MediAIChatAgent()
         }
-        self.decision_log = []
+        self.execution_mode = execution_mode
+        self.agent_timeout = agent_timeout
+        self.agent_timeouts = dict(agent_timeouts or {})
+        self.decision_log = DecisionLog(decision_retention, decision_spill_path)
         self.collaboration_history = []
+        self.agent_cache = AgentResultCache(cache_size, cache_ttl)
+        self._executor = None
+        # Futures of timed-out agent calls whose worker threads may still be running
+        self._stuck_futures = set()
         
     def coordinate_decision(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Coordinate decision-making across all agents"""
         decision_id = f"decision_{int(time.time())}"
         
-        # Gather input from all relevant agents
-        agent_inputs = {}
+        # Gather input from all relevant agents, re-running only those whose inputs changed
+        cached_inputs, pending, fingerprints = self._lookup_cached_inputs(context)
+        if self.execution_mode == "threads":
+            fresh_inputs = self._gather_inputs_threaded(pending, context)
+        else:
+            fresh_inputs = self._gather_inputs_sequential(pending, context)
+        agent_inputs = self._merge_agent_inputs(cached_inputs, fresh_inputs, fingerprints)
+        
+        return self._finalize_decision(decision_id, context, agent_inputs)
+    
+    async def coordinate_decision_async(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Coordinate decision-making with all agents running concurrently on the event loop
+        
+        Agents with an `async def analyze` are awaited directly; synchronous
+        agents run in worker threads. Each agent is bounded by its timeout.
+        """
+        decision_id = f"decision_{int(time.time())}"
+        
+        async def run_agent(agent_name: str, agent: Any) -> Dict:
+            if inspect.iscoroutinefunction(agent.analyze):
+                call = agent.analyze(context)
+            else:
+                call = asyncio.to_thread(agent.analyze, context)
+            
+            try:
+                return await asyncio.wait_for(call, timeout=self._get_agent_timeout(agent_name))
+            except asyncio.TimeoutError:
+                return self._timeout_input(agent_name)
+            except Exception as e:
+                return {"error": str(e), "status": "failed"}
+        
+        cached_inputs, pending, fingerprints = self._lookup_cached_inputs(context)
+        names = list(pending.keys())
+        results = await asyncio.gather(*(run_agent(name, pending[name]) for name in names))
+        agent_inputs = self._merge_agent_inputs(cached_inputs, dict(zip(names, results)), fingerprints)
+        
+        return self._finalize_decision(decision_id, context, agent_inputs)
+    
+    def _lookup_cached_inputs(self, context: Dict[str, Any]):
+        """
+        Split the agents into those with a memoized output for this context and those to run
+        
+        Each agent is keyed on its `depends_on` context fields (the whole
+        context if it does not declare any).
+        
+        Returns:
+            tuple: (cached inputs, agents to run, fingerprint per agent)
+        """
+        cached_inputs = {}
+        pending = {}
+        fingerprints = {}
         for agent_name, agent in self.agents.items():
+            fingerprint = context_fingerprint(context, getattr(agent, "depends_on", None))
+            fingerprints[agent_name] = fingerprint
+            cached = self.agent_cache.get(agent_name, fingerprint)
+            if cached is None:
+                pending[agent_name] = agent
+            else:
+                cached_inputs[agent_name] = cached
+        return cached_inputs, pending, fingerprints
+    
+    def _merge_agent_inputs(self, cached_inputs: Dict[str, Dict], fresh_inputs: Dict[str, Dict],
+                            fingerprints: Dict[str, str]) -> Dict[str, Dict]:
+        """Memoize successful fresh outputs and combine them with cached ones in agent order"""
+        for agent_name, agent_input in fresh_inputs.items():
+            if "error" not in agent_input:
+                self.agent_cache.put(agent_name, fingerprints[agent_name], agent_input)
+        
+        return {
+            agent_name: cached_inputs[agent_name] if agent_name in cached_inputs else fresh_inputs[agent_name]
+            for agent_name in self.agents
+        }
+    
+    def _gather_inputs_sequential(self, agents: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Dict]:
+        """Run each agent in turn"""
+        agent_inputs = {}
+        for agent_name, agent in agents.items():
             try:
-                agent_input = agent.analyze(context)
-                agent_inputs[agent_name] = agent_input
+                agent_inputs[agent_name] = self._call_agent(agent, context)
             except Exception as e:
                 agent_inputs[agent_name] = {"error": str(e), "status": "failed"}
+        return agent_inputs
+    
+    def _gather_inputs_threaded(self, agents: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Dict]:
+        """
+        Run all agents concurrently on the thread pool, waiting at most each agent's timeout
+        
+        A timed-out worker thread cannot be interrupted and keeps its pool slot,
+        so after a timeout the pool is abandoned to the stuck workers and the
+        next call starts a fresh one.
+        """
+        self._stuck_futures = {future for future in self._stuck_futures if not future.done()}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.agents), thread_name_prefix="agent")
+        
+        started = time.monotonic()
+        futures = {
+            agent_name: self._executor.submit(self._call_agent, agent, context)
+            for agent_name, agent in agents.items()
+        }
         
+        agent_inputs = {}
+        for agent_name, future in futures.items():
+            remaining = self._get_agent_timeout(agent_name) - (time.monotonic() - started)
+            done, _ = wait([future], timeout=max(0.0, remaining))
+            if not done:
+                # The worker thread cannot be interrupted; its late result is discarded
+                self._stuck_futures.add(future)
+                agent_inputs[agent_name] = self._timeout_input(agent_name)
+                continue
+            try:
+                agent_inputs[agent_name] = future.result()
+            except Exception as e:
+                agent_inputs[agent_name] = {"error": str(e), "status": "failed"}
+        
+        if any(not future.done() for future in futures.values()):
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return agent_inputs
+    
+    @property
+    def stuck_workers(self) -> int:
+        """Number of timed-out agent calls still occupying a worker thread"""
+        return sum(1 for future in self._stuck_futures if not future.done())
+    
+    @staticmethod
+    def _call_agent(agent: Any, context: Dict[str, Any]) -> Dict:
+        """Call an agent's analyze, running it to completion if it is async"""
+        result = agent.analyze(context)
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+        return result
+    
+    def _get_agent_timeout(self, agent_name: str) -> float:
+        """Get the timeout for one agent"""
+        return self.agent_timeouts.get(agent_name, self.agent_timeout)
+    
+    def _timeout_input(self, agent_name: str) -> Dict:
+        """Agent input recorded for an agent that exceeded its timeout"""
+        return {
+            "error": f"Timed out after {self._get_agent_timeout(agent_name)}s",
+            "status": "timeout"
+        }
+    
+    def _finalize_decision(self, decision_id: str, context: Dict[str, Any], agent_inputs: Dict[str, Dict]) -> Dict[str, Any]:
+        """Synthesize and log the decision from gathered agent inputs"""
         # Synthesize final decision
         final_decision = self._synthesize_decision(agent_inputs, context)
         
@@ -45,7 +221,12 @@ class AgenticAICoordinator:
             "context": context,
             "agent_inputs": agent_inputs,
             "final_decision": final_decision,
-            "collaboration_score": self._calculate_collaboration_score(agent_inputs)
+            "collaboration_score": self._calculate_collaboration_score(agent_inputs),
+            "timed_out_agents": [
+                agent_name for agent_name, agent_input in agent_inputs.items()
+                if agent_input.get("status") == "timeout"
+            ],
+            "stuck_workers": self.stuck_workers
         }
         
         self.decision_log.append(decision_record)
@@ -143,28 +324,30 @@ class AgenticAICoordinator:
     
     def get_recent_decisions(self, limit: int = 10) -> List[Dict]:
         """Get recent decision records"""
-        return self.decision_log[-limit:] if self.decision_log else []
+        return self.decision_log.recent(limit)
     
     def get_agent_performance(self) -> Dict[str, Any]:
         """Get performance metrics for each agent"""
-        performance = {}
-        
-        for agent_name in self.agents.keys():
-            successful_calls = sum(1 for record in self.decision_log 
-                                 if "error" not in record["agent_inputs"].get(agent_name, {}))
-            total_calls = len(self.decision_log)
-            
-            performance[agent_name] = {
-                "success_rate": (successful_calls / total_calls * 100) if total_calls > 0 else 0,
-                "total_calls": total_calls,
-                "successful_calls": successful_calls
-            }
-        
-        return performance
+        return self.decision_log.agent_performance(self.agents.keys())
 
 class DDIAgent:
     """Drug-Drug Interaction Agent"""
     
+    depends_on = ("medications",)
+    
+    # Risk added per interacting pair, by severity
+    SEVERITY_RISK = {"High": 6, "Medium": 3, "Low": 1}
+    
+    # Used only when the interactions dataset is unavailable
+    FALLBACK_HIGH_RISK_COMBINATIONS = [
+        ("warfarin", "aspirin"),
+        ("lisinopril", "potassium"),
+        ("metformin", "alcohol")
+    ]
+    
+    def __init__(self):
+        self.store = get_interaction_store()
+    
     def analyze(self, context: Dict) -> Dict:
         """Analyze drug interactions"""
         medications = context.get("medications", [])
@@ -177,33 +360,59 @@ class DDIAgent:
                 "explanation": "Single medication - no interaction risk"
             }
         
-        # Simulate interaction analysis
-        interaction_risk = self._calculate_interaction_risk(medications)
+        interactions = self._find_interactions(medications)
+        interaction_risk = self._calculate_interaction_risk(medications, interactions)
         
         return {
             "risk_score": interaction_risk,
             "recommendations": self._get_interaction_recommendations(interaction_risk),
-            "warnings": self._get_interaction_warnings(medications, interaction_risk),
-            "explanation": f"Analyzed {len(medications)} medications for interactions"
+            "warnings": self._get_interaction_warnings(medications, interaction_risk, interactions),
+            "interactions": interactions,
+            "explanation": f"Analyzed {len(medications)} medications for interactions: "
+                           f"{len(interactions)} interacting pair(s) found"
         }
     
-    def _calculate_interaction_risk(self, medications: List[str]) -> int:
+    def _find_interactions(self, medications: List[str]) -> List[Dict[str, str]]:
+        """Look up every unordered medication pair once in the interaction dataset"""
+        if self.store.interactions_df is None or not self.store.descriptions:
+            return self._find_fallback_interactions(medications)
+        
+        # Duplicate medications (in any letter case) would only repeat pairs
+        unique_medications = list({med.lower(): med for med in medications}.values())
+        
+        interactions = []
+        for drug_a, drug_b in combinations(unique_medications, 2):
+            row = self.store.find_interaction_row(drug_a, drug_b)
+            if row is not None:
+                interactions.append({
+                    "drug_a": drug_a,
+                    "drug_b": drug_b,
+                    "severity": self.store.severities[row],
+                    "description": self.store.descriptions[row]
+                })
+        return interactions
+    
+    def _find_fallback_interactions(self, medications: List[str]) -> List[Dict[str, str]]:
+        """Check medication pairs against the built-in high risk combinations"""
+        interactions = []
+        for drug_a, drug_b in combinations(medications, 2):
+            for combo in self.FALLBACK_HIGH_RISK_COMBINATIONS:
+                if (drug_a.lower() in combo[0] and drug_b.lower() in combo[1]) or \
+                   (drug_a.lower() in combo[1] and drug_b.lower() in combo[0]):
+                    interactions.append({
+                        "drug_a": drug_a,
+                        "drug_b": drug_b,
+                        "severity": "High",
+                        "description": f"Known high risk combination: {combo[0]} and {combo[1]}"
+                    })
+        return interactions
+    
+    def _calculate_interaction_risk(self, medications: List[str], interactions: List[Dict[str, str]]) -> int:
         """Calculate interaction risk score"""
-        high_risk_combinations = [
-            ("warfarin", "aspirin"),
-            ("lisinopril", "potassium"),
-            ("metformin", "alcohol")
-        ]
-        
         risk_score = 2  # Base risk
         
-        for med1 in medications:
-            for med2 in medications:
-                if med1 != med2:
-                    for combo in high_risk_combinations:
-                        if (med1.lower() in combo[0] and med2.lower() in combo[1]) or \
-                           (med1.lower() in combo[1] and med2.lower() in combo[0]):
-                            risk_score += 4
+        for interaction in interactions:
+            risk_score += self.SEVERITY_RISK.get(interaction["severity"], 3)
         
         return min(risk_score, 10)
     
@@ -227,13 +436,18 @@ class DDIAgent:
                 "Standard monitoring sufficient"
             ]
     
-    def _get_interaction_warnings(self, medications: List[str], risk_score: int) -> List[str]:
+    def _get_interaction_warnings(self, medications: List[str], risk_score: int,
+                                  interactions: List[Dict[str, str]]) -> List[str]:
         """Get specific warnings for medication combinations"""
         warnings = []
         
         if risk_score >= 6:
             warnings.append("⚠️ High interaction risk detected")
         
+        for interaction in interactions:
+            if interaction["severity"] == "High":
+                warnings.append(f"💊 {interaction['drug_a']} + {interaction['drug_b']}: {interaction['description']}")
+        
         if "warfarin" in [med.lower() for med in medications]:
             warnings.append("🩸 Monitor bleeding risk with blood thinners")
         
@@ -242,6 +456,8 @@ class DDIAgent:
 class DigitalTwinAgent:
     """Digital Twin Agent for physiological modeling"""
     
+    depends_on = ("vitals", "medications", "medical_history")
+    
     def analyze(self, context: Dict) -> Dict:
         """Analyze physiological state and predict outcomes"""
         vitals = context.get("vitals", {})
@@ -361,6 +577,8 @@ class DigitalTwinAgent:
 class SafetyAgent:
     """Safety monitoring and alert agent"""
     
+    depends_on = ("vitals", "medications", "symptoms")
+    
     def analyze(self, context: Dict) -> Dict:
         """Analyze safety concerns and generate alerts"""
         vitals = context.get("vitals", {})
@@ -468,6 +686,8 @@ class SafetyAgent:
 class FirstAidAgent:
     """First aid and emergency response agent"""
     
+    depends_on = ("symptoms", "vitals")
+    
     def analyze(self, context: Dict) -> Dict:
         """Analyze emergency situation and provide first aid guidance"""
         symptoms = context.get("symptoms", [])
@@ -573,6 +793,8 @@ class FirstAidAgent:
 class DoctorSupportAgent:
     """Doctor support and clinical decision support agent"""
     
+    depends_on = ("vitals", "medications", "medical_history")
+    
     def analyze(self, context: Dict) -> Dict:
         """Provide clinical decision support"""
         vitals = context.get("vitals", {})
@@ -641,6 +863,8 @@ class DoctorSupportAgent:
 class MediAIChatAgent:
     """Conversational AI agent for health questions"""
     
+    depends_on = ("query", "user_data")
+    
     def analyze(self, context: Dict) -> Dict:
         """Analyze user query and provide intelligent response"""
         query = context.get("query", "")
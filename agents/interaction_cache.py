@@ -0,0 +1,282 @@
+"""
+Interaction Cache - Compact columnar binary cache of the drug interactions CSV
+
+The cache stores drug names as integer ids into one shared drug table and
+descriptions as integer ids into a deduplicated description table. Every
+array is a plain .npy file, so loading memory-maps the data instead of
+parsing the CSV: the id arrays are used in place, written with the dtype
+pandas uses for categorical codes, and descriptions are decoded one at a
+time on access. The cache is rebuilt automatically whenever the CSV changes.
+
+Build it ahead of time with:
+    python -m agents.interaction_cache [path/to/drug_interactions.csv]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 2
+
+DRUG_COLUMNS = ['Drug 1', 'Drug 2']
+DESCRIPTION_COLUMN = 'Interaction Description'
+
+# Loaded frames hold description ids in this column (see StringTable for the text)
+DESCRIPTION_CODE_COLUMN = 'Description Code'
+
+_CODE_FILES = {
+    'Drug 1': 'drug_1_codes.npy',
+    'Drug 2': 'drug_2_codes.npy',
+    DESCRIPTION_CODE_COLUMN: 'description_codes.npy'
+}
+
+
+class StringTable:
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus offsets
+
+    Strings are decoded only when accessed, so a memory-mapped table costs
+    nothing until it is read.
+    """
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def get_cache_dir(csv_path):
+    """Get the cache directory used for a CSV file"""
+    csv_dir = os.path.dirname(os.path.abspath(csv_path))
+    csv_stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(csv_dir, '.cache', csv_stem)
+
+
+def load_interactions(csv_path, cache_dir=None):
+    """
+    Load the interactions dataset, building or refreshing the binary cache if needed
+
+    Args:
+        csv_path (str): Path to the drug interactions CSV
+        cache_dir (str, optional): Cache directory (defaults to get_cache_dir)
+
+    Returns:
+        tuple: (DataFrame with categorical 'Drug 1'/'Drug 2' columns sharing one
+            category list and a 'Description Code' column, sequence of the
+            unique descriptions those codes index; -1 marks a missing value)
+    """
+    cache_dir = cache_dir or get_cache_dir(csv_path)
+
+    try:
+        if not _is_cache_current(csv_path, cache_dir):
+            build_cache(csv_path, cache_dir)
+        return _read_cache(cache_dir)
+    except Exception as e:
+        # A broken or unwritable cache should never stop the app from loading
+        print(f"Interaction cache unavailable ({e}), reading CSV directly")
+        drug_1, drug_2, drug_names, description_codes, descriptions = _encode_csv(csv_path)
+        return _interactions_frame(drug_1, drug_2, drug_names, description_codes), list(descriptions)
+
+
+def build_cache(csv_path, cache_dir=None):
+    """
+    Convert the interactions CSV into the binary cache format
+
+    Args:
+        csv_path (str): Path to the drug interactions CSV
+        cache_dir (str, optional): Cache directory (defaults to get_cache_dir)
+
+    Returns:
+        str: The cache directory written
+    """
+    cache_dir = cache_dir or get_cache_dir(csv_path)
+    drug_1, drug_2, drug_names, description_codes, descriptions = _encode_csv(csv_path)
+
+    # Write into a private scratch directory and swap it in, so readers never
+    # see a partial cache and concurrent builders never share a directory
+    parent_dir = os.path.dirname(os.path.abspath(cache_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=os.path.basename(cache_dir) + '.tmp.')
+
+    try:
+        np.save(os.path.join(tmp_dir, _CODE_FILES['Drug 1']), drug_1)
+        np.save(os.path.join(tmp_dir, _CODE_FILES['Drug 2']), drug_2)
+        np.save(os.path.join(tmp_dir, _CODE_FILES[DESCRIPTION_CODE_COLUMN]), description_codes)
+        _write_string_table(tmp_dir, 'drugs', drug_names)
+        _write_string_table(tmp_dir, 'descriptions', descriptions)
+
+        rows = len(drug_1)
+        meta = dict(_source_signature(csv_path), rows=rows, format_version=CACHE_FORMAT_VERSION)
+        meta['sha256'] = _file_hash(csv_path)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        _swap_in(tmp_dir, cache_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"Built interaction cache for {rows} rows "
+          f"({len(drug_names)} drugs, {len(descriptions)} unique descriptions) in {cache_dir}")
+    return cache_dir
+
+
+def _encode_csv(csv_path):
+    """
+    Read the CSV into integer codes
+
+    Returns:
+        tuple: (drug 1 codes, drug 2 codes, drug names, description codes, descriptions)
+    """
+    df = pd.read_csv(csv_path, usecols=DRUG_COLUMNS + [DESCRIPTION_COLUMN], dtype=str)
+
+    # Drug 1 and Drug 2 share one id space
+    drug_codes, drug_names = pd.factorize(
+        pd.concat([df[column] for column in DRUG_COLUMNS], ignore_index=True)
+    )
+    description_codes, descriptions = pd.factorize(df[DESCRIPTION_COLUMN])
+
+    rows = len(df)
+    drug_dtype = code_dtype(len(drug_names))
+    return (
+        drug_codes[:rows].astype(drug_dtype),
+        drug_codes[rows:].astype(drug_dtype),
+        drug_names,
+        description_codes.astype(code_dtype(len(descriptions))),
+        descriptions
+    )
+
+
+def code_dtype(categories):
+    """Smallest signed integer dtype for codes into that many categories (as pandas uses for Categorical)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _interactions_frame(drug_1, drug_2, drug_names, description_codes):
+    """Wrap code arrays in a DataFrame without copying them"""
+    drug_names = pd.Index(drug_names)
+    return pd.DataFrame({
+        'Drug 1': pd.Categorical.from_codes(drug_1, categories=drug_names, validate=False),
+        'Drug 2': pd.Categorical.from_codes(drug_2, categories=drug_names, validate=False),
+        DESCRIPTION_CODE_COLUMN: description_codes
+    }, copy=False)
+
+
+def _swap_in(tmp_dir, cache_dir):
+    """Move a finished cache into place, replacing any existing one"""
+    try:
+        os.rename(tmp_dir, cache_dir)
+        return
+    except OSError:
+        if not os.path.isdir(cache_dir):
+            raise
+
+    # Move the old cache aside first (open memory maps stay valid), then retry;
+    # if another process swapped in its own cache meanwhile, keep that one
+    old_dir = tmp_dir + '.old'
+    try:
+        os.rename(cache_dir, old_dir)
+    except OSError:
+        pass
+    try:
+        os.rename(tmp_dir, cache_dir)
+    except OSError:
+        if not os.path.isdir(cache_dir):
+            raise
+    finally:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _is_cache_current(csv_path, cache_dir):
+    """Check whether the cache matches the CSV, comparing the content hash only when mtime/size moved"""
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    if meta.get('format_version') != CACHE_FORMAT_VERSION:
+        return False
+
+    signature = _source_signature(csv_path)
+    if all(meta.get(key) == value for key, value in signature.items()):
+        return True
+
+    if meta.get('sha256') != _file_hash(csv_path):
+        return False
+
+    # Touched but unchanged: record the new signature so the hash is skipped next time
+    meta.update(signature)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='meta.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    return True
+
+
+def _read_cache(cache_dir):
+    """Build the interactions DataFrame over memory-mapped cache arrays"""
+    drug_names = list(_read_string_table(cache_dir, 'drugs'))
+    codes = {
+        column: np.load(os.path.join(cache_dir, file_name), mmap_mode='r')
+        for column, file_name in _CODE_FILES.items()
+    }
+    frame = _interactions_frame(codes['Drug 1'], codes['Drug 2'], drug_names, codes[DESCRIPTION_CODE_COLUMN])
+    return frame, _read_string_table(cache_dir, 'descriptions')
+
+
+def _write_string_table(directory, name, strings):
+    """Store strings as one UTF-8 blob plus an offsets array"""
+    encoded = [str(value).encode('utf-8') for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    np.save(os.path.join(directory, f'{name}_blob.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, f'{name}_offsets.npy'), offsets)
+
+
+def _read_string_table(directory, name):
+    """Open a string table written by _write_string_table without decoding it"""
+    blob = np.load(os.path.join(directory, f'{name}_blob.npy'), mmap_mode='r')
+    offsets = np.load(os.path.join(directory, f'{name}_offsets.npy'), mmap_mode='r')
+    return StringTable(blob, offsets)
+
+
+def _source_signature(csv_path):
+    """Cheap change signature for the source CSV"""
+    stat = os.stat(csv_path)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def _file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+if __name__ == '__main__':
+    build_cache(sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'drug_interactions.csv'))
@@ -0,0 +1,151 @@
+"""
+Interaction Classifier - Keyword-based severity and body system classification
+for drug interaction descriptions
+"""
+
+import re
+
+# Severity keywords, checked in priority order
+SEVERITY_KEYWORDS = [
+    ('High', [
+        'contraindicated', 'avoid', 'dangerous', 'severe', 'toxic', 'fatal',
+        'life-threatening', 'serious', 'major', 'significant risk'
+    ]),
+    ('Medium', [
+        'caution', 'monitor', 'adjust', 'reduce', 'increase', 'moderate',
+        'may increase', 'may decrease', 'potential', 'consider'
+    ]),
+    ('Low', [
+        'minor', 'slight', 'minimal', 'unlikely', 'rare'
+    ])
+]
+
+# Severity used when no keyword matches
+DEFAULT_SEVERITY = 'Medium'
+
+# Body systems reported by MedicineAgent
+SYSTEM_KEYWORDS = [
+    ('Cardiovascular', ['heart', 'cardiac', 'cardiovascular']),
+    ('Hepatic', ['liver', 'hepatic']),
+    ('Renal', ['kidney', 'renal']),
+    ('Nervous System', ['nervous', 'neurological', 'cns']),
+    ('Respiratory', ['respiratory', 'lung']),
+    ('Gastrointestinal', ['gastrointestinal', 'stomach', 'digestive']),
+    ('Hematologic', ['blood', 'hematologic', 'bleeding']),
+    ('Dermatologic', ['skin', 'dermatologic', 'photosensitizing'])
+]
+
+# Body areas shown on the Medicine Reactions page
+BODY_AREA_KEYWORDS = [
+    ("❤️ Cardiovascular System", ['heart', 'cardiac', 'blood pressure', 'circulation']),
+    ("🧠 Nervous System", ['nervous', 'brain', 'seizure', 'depression', 'anxiety']),
+    ("🫄 Digestive System", ['stomach', 'liver', 'digestive', 'nausea', 'gastric']),
+    ("🫁 Respiratory System", ['lung', 'respiratory', 'breathing', 'asthma']),
+    ("🫘 Kidney/Urinary System", ['kidney', 'renal', 'urinary', 'bladder']),
+    ("🧴 Skin/Integumentary System", ['skin', 'rash', 'photosensitizing', 'dermal']),
+    ("🩸 Blood/Hematologic System", ['blood', 'bleeding', 'clotting', 'anticoagulant'])
+]
+
+GENERAL_BODY_AREA = "⚠️ General Systemic Effect"
+
+
+class KeywordClassifier:
+    """
+    Multi-label keyword matcher compiled into a single regex
+
+    Every label owns one bit of the returned mask. A label is set when any
+    of its keywords occurs anywhere in the lowercased text, matching the
+    semantics of `any(keyword in text for keyword in keywords)`.
+    """
+
+    def __init__(self, label_keywords):
+        """
+        Args:
+            label_keywords (list): Ordered (label, [keywords]) pairs
+        """
+        self.labels = [label for label, _ in label_keywords]
+
+        keyword_masks = {}
+        for bit, (_, keywords) in enumerate(label_keywords):
+            for keyword in keywords:
+                keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << bit)
+
+        # The regex reports the longest keyword starting at each position, so
+        # fold in the labels of every shorter keyword that is its prefix
+        self._keyword_masks = {}
+        for keyword in keyword_masks:
+            mask = 0
+            for other, other_mask in keyword_masks.items():
+                if keyword.startswith(other):
+                    mask |= other_mask
+            self._keyword_masks[keyword] = mask
+
+        alternatives = sorted(keyword_masks, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in alternatives) + '))')
+
+    def mask(self, text):
+        """Get the label bitmask for a piece of text"""
+        mask = 0
+        for match in self._pattern.finditer(text.lower()):
+            mask |= self._keyword_masks[match.group(1)]
+        return mask
+
+    def labels_for(self, mask):
+        """Get the labels set in a bitmask, in declaration order"""
+        return [label for bit, label in enumerate(self.labels) if mask & (1 << bit)]
+
+    def classify(self, text):
+        """Get the labels matching a piece of text"""
+        return self.labels_for(self.mask(text))
+
+
+# Severity and system keywords share one pattern so a description is scanned once
+_interaction_classifier = KeywordClassifier(SEVERITY_KEYWORDS + SYSTEM_KEYWORDS)
+_severity_bits = len(SEVERITY_KEYWORDS)
+_system_labels = [label for label, _ in SYSTEM_KEYWORDS]
+
+_body_area_classifier = KeywordClassifier(BODY_AREA_KEYWORDS)
+
+
+def classify_interaction(description):
+    """
+    Classify an interaction description in a single pass
+
+    Args:
+        description (str): Interaction description text
+
+    Returns:
+        tuple: (severity, systems_mask) where systems_mask encodes the
+            affected systems for use with systems_from_mask
+    """
+    mask = _interaction_classifier.mask(description)
+    return severity_from_mask(mask), mask >> _severity_bits
+
+
+def severity_from_mask(mask):
+    """Get the highest-priority severity set in a classifier mask"""
+    for bit, (severity, _) in enumerate(SEVERITY_KEYWORDS):
+        if mask & (1 << bit):
+            return severity
+    return DEFAULT_SEVERITY
+
+
+def systems_from_mask(systems_mask):
+    """Get the body system names encoded in a systems mask"""
+    return [label for bit, label in enumerate(_system_labels) if systems_mask & (1 << bit)]
+
+
+def body_area_mask(description):
+    """Get the body areas mask of an interaction description, for use with body_areas_from_mask"""
+    return _body_area_classifier.mask(description)
+
+
+def body_areas_from_mask(mask):
+    """Get the body areas encoded in a body areas mask"""
+    areas = _body_area_classifier.labels_for(mask)
+    return areas if areas else [GENERAL_BODY_AREA]
+
+
+def classify_body_areas(description):
+    """Map an interaction description to the body areas it affects"""
+    return body_areas_from_mask(body_area_mask(description))
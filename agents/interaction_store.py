@@ -0,0 +1,274 @@
+"""
+Interaction Store - Process-wide, read-only drug interactions dataset and indexes
+
+The dataset is loaded and indexed once per process and shared by every agent
+and page through get_interaction_store().
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from itertools import combinations
+
+from agents.interaction_cache import DESCRIPTION_CODE_COLUMN, load_interactions
+from agents.interaction_classifier import classify_interaction, body_area_mask
+from agents.organ_highlights import systems_organ_mask
+
+# Locations searched for the interactions CSV, in order
+INTERACTIONS_CSV_PATHS = [
+    'db_drug_interactions.csv',  # Original file in root
+    os.path.join('data', 'drug_interactions.csv'),  # Data directory
+    'drug_interactions.csv'  # Current directory
+]
+
+# Search terms whose matching drug names are kept (least recently used dropped first)
+NAME_MATCH_CACHE_SIZE = 1024
+
+# Medicine selections whose interaction organ masks are kept (least recently used dropped first)
+ORGAN_MASK_CACHE_SIZE = 1024
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_interaction_store():
+    """Get the shared InteractionStore, loading it on first use"""
+    global _store
+    
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = InteractionStore()
+    return _store
+
+
+class RowValues:
+    """
+    Read-only per-row view of a per-code table: row -> values[codes[row]]
+    
+    Code -1 marks a missing value; it reads as `missing`, or as values[-1]
+    when no missing value is given.
+    """
+    
+    __slots__ = ('_codes', '_values', '_missing', '_has_missing')
+    
+    def __init__(self, codes, values, missing=None):
+        self._codes = codes
+        self._values = values
+        self._missing = missing
+        self._has_missing = missing is not None
+    
+    def __len__(self):
+        return len(self._codes)
+    
+    def __getitem__(self, row):
+        code = int(self._codes[row])
+        if code < 0 and self._has_missing:
+            return self._missing
+        return self._values[code]
+
+
+class InteractionStore:
+    """
+    Drug interactions dataset with lookup indexes
+    
+    Treat instances as read-only: they are shared across threads and sessions.
+    interactions_df is None when no dataset could be loaded; its description
+    column holds ids into unique_descriptions.
+    """
+    
+    def __init__(self, csv_path=None):
+        self.interactions_df = None
+        self.unique_descriptions = []
+        self.csv_path = None
+        self._load_interactions_data(csv_path)
+        self._build_index()
+    
+    def _load_interactions_data(self, csv_path=None):
+        """Load drug interactions data from CSV"""
+        try:
+            possible_paths = [csv_path] if csv_path else INTERACTIONS_CSV_PATHS
+            
+            for path in possible_paths:
+                if os.path.exists(path):
+                    print(f"Loading drug interactions from: {path}")
+                    self.interactions_df, self.unique_descriptions = load_interactions(path)
+                    self.csv_path = path
+                    print(f"Loaded {len(self.interactions_df)} drug interactions")
+                    return
+            
+            print("Warning: Drug interactions CSV not found. Using fallback data.")
+            self.interactions_df = None
+        except Exception as e:
+            print(f"Error loading drug interactions data: {e}")
+            self.interactions_df = None
+    
+    def _build_index(self):
+        """Build lookup indexes over the loaded interactions data
+
+        Pair index: canonical unordered (drug, drug) pair -> row positions
+        Partner index: drug name -> names of drugs it interacts with
+        Trigram index: 3-character substring -> drug names containing it
+        Drug rows: drug name -> row positions it appears in
+        
+        Every unique description is also classified once here. Per-row drug
+        names, descriptions, severities, systems, body areas and organs are
+        views that look each row's code up in these per-code tables, so no
+        per-row copies are kept beside the (memory-mapped) code arrays.
+        """
+        self._pair_index = {}
+        self._partner_index = {}
+        self.drug_rows = {}
+        self._trigram_index = {}
+        self._name_match_cache = OrderedDict()
+        self._name_match_lock = threading.Lock()
+        self._organ_mask_cache = OrderedDict()
+        self._organ_mask_lock = threading.Lock()
+        self._drug1_names = []
+        self._drug2_names = []
+        self.descriptions = []
+        self.severities = []
+        self.systems_masks = []
+        self.body_area_masks = []
+        self.organ_masks = []
+        
+        if self.interactions_df is None:
+            return
+        
+        self._classify_interactions()
+        
+        # Lowercased name per drug code; the trailing '' is what code -1 (missing) indexes
+        drug_1 = self.interactions_df['Drug 1'].array
+        drug_2 = self.interactions_df['Drug 2'].array
+        lowered = {}
+        names = [lowered.setdefault(name, str(name).lower()) for name in drug_1.categories] + ['']
+        self._drug1_names = RowValues(drug_1.codes, names)
+        self._drug2_names = RowValues(drug_2.codes, names)
+        
+        for row_id, (code_1, code_2) in enumerate(zip(drug_1.codes.tolist(), drug_2.codes.tolist())):
+            name_1 = names[code_1]
+            name_2 = names[code_2]
+            if name_1:
+                self.drug_rows.setdefault(name_1, []).append(row_id)
+            if name_2 and name_2 != name_1:
+                self.drug_rows.setdefault(name_2, []).append(row_id)
+            if not name_1 or not name_2:
+                continue
+            self._pair_index.setdefault(self._pair_key(name_1, name_2), []).append(row_id)
+            self._partner_index.setdefault(name_1, set()).add(name_2)
+            self._partner_index.setdefault(name_2, set()).add(name_1)
+        
+        for name in self.drug_rows:
+            for i in range(len(name) - 2):
+                self._trigram_index.setdefault(name[i:i + 3], set()).add(name)
+    
+    def _classify_interactions(self):
+        """Classify every unique description once and expose the results per row"""
+        severities = []
+        systems_masks = []
+        body_area_masks = []
+        organ_masks = []
+        
+        # The trailing entry classifies a missing description (code -1) as empty text
+        for text in list(self.unique_descriptions) + ['']:
+            severity, systems_mask = classify_interaction(text)
+            severities.append(severity)
+            systems_masks.append(systems_mask)
+            body_area_masks.append(body_area_mask(text))
+            organ_masks.append(systems_organ_mask(systems_mask))
+        
+        codes = self.interactions_df[DESCRIPTION_CODE_COLUMN].to_numpy()
+        self.descriptions = RowValues(codes, self.unique_descriptions, missing='')
+        self.severities = RowValues(codes, severities)
+        self.systems_masks = RowValues(codes, systems_masks)
+        self.body_area_masks = RowValues(codes, body_area_masks)
+        self.organ_masks = RowValues(codes, organ_masks)
+    
+    @staticmethod
+    def _pair_key(name_a, name_b):
+        """Canonical key for an unordered drug pair"""
+        return (name_a, name_b) if name_a <= name_b else (name_b, name_a)
+    
+    def match_drug_names(self, term):
+        """Get all indexed drug names containing the given term"""
+        with self._name_match_lock:
+            matches = self._name_match_cache.get(term)
+            if matches is not None:
+                self._name_match_cache.move_to_end(term)
+                return matches
+        
+        if len(term) < 3:
+            candidates = self.drug_rows.keys()
+        else:
+            postings = [self._trigram_index.get(term[i:i + 3], set()) for i in range(len(term) - 2)]
+            candidates = set.intersection(*sorted(postings, key=len))
+        
+        matches = {name for name in candidates if term in name}
+        with self._name_match_lock:
+            self._name_match_cache[term] = matches
+            while len(self._name_match_cache) > NAME_MATCH_CACHE_SIZE:
+                self._name_match_cache.popitem(last=False)
+        return matches
+    
+    def interaction_organ_mask(self, medicines):
+        """
+        Get the organs affected by the dataset's interactions between selected medicines
+        
+        Only the interaction row of each pair counts (see find_interaction_row);
+        a medicine's interactions with drugs outside the selection do not.
+        
+        Args:
+            medicines (iterable): Medicine names
+        
+        Returns:
+            int: OR of the pair rows' organ masks (0 for fewer than two
+                medicines or if no interaction is found)
+        """
+        key = frozenset(medicine.lower() for medicine in medicines)
+        with self._organ_mask_lock:
+            mask = self._organ_mask_cache.get(key)
+            if mask is not None:
+                self._organ_mask_cache.move_to_end(key)
+                return mask
+        
+        mask = 0
+        for name_a, name_b in combinations(sorted(key), 2):
+            row = self.find_interaction_row(name_a, name_b)
+            if row is not None:
+                mask |= self.organ_masks[row]
+        
+        with self._organ_mask_lock:
+            self._organ_mask_cache[key] = mask
+            while len(self._organ_mask_cache) > ORGAN_MASK_CACHE_SIZE:
+                self._organ_mask_cache.popitem(last=False)
+        return mask
+    
+    def find_interaction_row(self, drug_a, drug_b):
+        """Find the row position of the interaction between two drugs, or None"""
+        name_a = drug_a.lower()
+        name_b = drug_b.lower()
+        
+        # First try exact matches
+        rows = self._pair_index.get(self._pair_key(name_a, name_b), [])
+        if rows:
+            forward = [row for row in rows if self._drug1_names[row] == name_a]
+            return forward[0] if forward else rows[0]
+        
+        # If no exact match, try partial matches
+        matches_a = self.match_drug_names(name_a)
+        matches_b = self.match_drug_names(name_b)
+        forward_row = None
+        reverse_row = None
+        
+        for name in matches_a:
+            for partner in self._partner_index.get(name, set()) & matches_b:
+                for row in self._pair_index[self._pair_key(name, partner)]:
+                    drug_1 = self._drug1_names[row]
+                    drug_2 = self._drug2_names[row]
+                    if drug_1 in matches_a and drug_2 in matches_b:
+                        if forward_row is None or row < forward_row:
+                            forward_row = row
+                    elif reverse_row is None or row < reverse_row:
+                        reverse_row = row
+        
+        return forward_row if forward_row is not None else reverse_row
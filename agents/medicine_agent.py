@@ -2,38 +2,17 @@
 Medicine Agent - Analyzes drug interactions using the drug interactions dataset
 """
 
-import pandas as pd
-import os
+from agents.interaction_classifier import classify_interaction, systems_from_mask, body_areas_from_mask
+from agents.interaction_store import get_interaction_store
 
 class MedicineAgent:
     def __init__(self):
         self.name = "MedicineAgent"
         self.version = "1.0"
-        self.interactions_df = None
-        self._load_interactions_data()
-    
-    def _load_interactions_data(self):
-        """Load drug interactions data from CSV"""
-        try:
-            # Try multiple paths for the CSV file
-            possible_paths = [
-                'db_drug_interactions.csv',  # Original file in root
-                os.path.join('data', 'drug_interactions.csv'),  # Data directory
-                'drug_interactions.csv'  # Current directory
-            ]
-            
-            for csv_path in possible_paths:
-                if os.path.exists(csv_path):
-                    print(f"Loading drug interactions from: {csv_path}")
-                    self.interactions_df = pd.read_csv(csv_path)
-                    print(f"Loaded {len(self.interactions_df)} drug interactions")
-                    return
-            
-            print("Warning: Drug interactions CSV not found. Using fallback data.")
-            self.interactions_df = None
-        except Exception as e:
-            print(f"Error loading drug interactions data: {e}")
-            self.interactions_df = None
+        
+        # The dataset and its indexes are loaded once per process and shared
+        self.store = get_interaction_store()
+        self.interactions_df = self.store.interactions_df
     
     def run(self, drug_a, drug_b=None):
         """
@@ -61,18 +40,53 @@ class MedicineAgent:
                 'affected_systems': []
             }
     
+    def interaction_matrix(self, drugs):
+        """
+        Analyze interactions between every pair in a list of drugs
+        
+        Interactions are symmetric, so each unordered pair is looked up once
+        and mirrored across the diagonal. Diagonal cells are left empty.
+        
+        Args:
+            drugs (list): Drug names
+        
+        Returns:
+            dict: n x n matrices keyed by 'severity', 'explanation',
+                'recommendation' and 'affected_systems', plus the 'drugs' order
+        """
+        n = len(drugs)
+        severity = [['None'] * n for _ in range(n)]
+        explanation = [[''] * n for _ in range(n)]
+        recommendation = [[''] * n for _ in range(n)]
+        affected_systems = [[[] for _ in range(n)] for _ in range(n)]
+        
+        for i in range(n):
+            for j in range(i + 1, n):
+                result = self.run(drugs[i], drugs[j])
+                severity[i][j] = severity[j][i] = result.get('severity', 'None')
+                explanation[i][j] = explanation[j][i] = result.get('explanation', '')
+                recommendation[i][j] = recommendation[j][i] = result.get('recommendation', '')
+                affected_systems[i][j] = affected_systems[j][i] = result.get('affected_systems', [])
+        
+        return {
+            'drugs': list(drugs),
+            'severity': severity,
+            'explanation': explanation,
+            'recommendation': recommendation,
+            'affected_systems': affected_systems
+        }
+    
     def _analyze_single_drug(self, drug_name):
         """Analyze single drug for potential interactions with common medications"""
         if self.interactions_df is None:
             return self._fallback_single_drug_analysis(drug_name)
         
         # Find all interactions involving this drug
-        drug_interactions = self.interactions_df[
-            (self.interactions_df['Drug 1'].str.contains(drug_name, case=False, na=False)) |
-            (self.interactions_df['Drug 2'].str.contains(drug_name, case=False, na=False))
-        ]
+        drug_rows = set()
+        for name in self.store.match_drug_names(drug_name.lower()):
+            drug_rows.update(self.store.drug_rows[name])
         
-        if drug_interactions.empty:
+        if not drug_rows:
             return {
                 'severity': 'None',
                 'explanation': f'No significant interactions found for {drug_name} in our database',
@@ -81,15 +95,18 @@ class MedicineAgent:
                 'interaction_count': 0
             }
         
-        # Analyze severity based on interaction descriptions
-        interaction_count = len(drug_interactions)
-        severity = self._determine_severity_from_descriptions(drug_interactions['Interaction Description'].tolist())
+        # Severity and systems were classified per row at load time
+        interaction_count = len(drug_rows)
+        severity = self._highest_severity(self.store.severities[row] for row in drug_rows)
+        systems_mask = 0
+        for row in drug_rows:
+            systems_mask |= self.store.systems_masks[row]
         
         return {
             'severity': severity,
             'explanation': f'{drug_name} has {interaction_count} known interactions in our database',
             'recommendation': 'Review all current medications with healthcare provider',
-            'affected_systems': self._extract_affected_systems(drug_interactions['Interaction Description'].tolist()),
+            'affected_systems': systems_from_mask(systems_mask),
             'interaction_count': interaction_count
         }
     
@@ -99,15 +116,17 @@ class MedicineAgent:
             return self._fallback_interaction_analysis(drug_a, drug_b)
         
         # Search for direct interaction
-        interaction = self._find_interaction(drug_a, drug_b)
+        row = self.store.find_interaction_row(drug_a, drug_b)
         
-        if interaction is not None:
-            severity = self._determine_severity_from_description(interaction)
+        if row is not None:
+            severity = self.store.severities[row]
             return {
                 'severity': severity,
-                'explanation': interaction,
+                'explanation': self.store.descriptions[row],
                 'recommendation': self._get_recommendation_for_severity(severity),
-                'affected_systems': self._extract_affected_systems([interaction])
+                'affected_systems': systems_from_mask(self.store.systems_masks[row]),
+                'affected_body_areas': body_areas_from_mask(self.store.body_area_masks[row]),
+                'organ_mask': self.store.organ_masks[row]
             }
         else:
             return {
@@ -121,72 +140,31 @@ class MedicineAgent:
         """Find interaction between two drugs in the dataset"""
         print(f"Searching for interaction between: '{drug_a}' and '{drug_b}'")
         
-        # First try exact matches
-        interaction1 = self.interactions_df[
-            (self.interactions_df['Drug 1'].str.lower() == drug_a.lower()) &
-            (self.interactions_df['Drug 2'].str.lower() == drug_b.lower())
-        ]
-        
-        interaction2 = self.interactions_df[
-            (self.interactions_df['Drug 1'].str.lower() == drug_b.lower()) &
-            (self.interactions_df['Drug 2'].str.lower() == drug_a.lower())
-        ]
+        row = self.store.find_interaction_row(drug_a, drug_b)
         
-        # If no exact match, try partial matches
-        if interaction1.empty and interaction2.empty:
-            interaction1 = self.interactions_df[
-                (self.interactions_df['Drug 1'].str.contains(drug_a, case=False, na=False)) &
-                (self.interactions_df['Drug 2'].str.contains(drug_b, case=False, na=False))
-            ]
-            
-            interaction2 = self.interactions_df[
-                (self.interactions_df['Drug 1'].str.contains(drug_b, case=False, na=False)) &
-                (self.interactions_df['Drug 2'].str.contains(drug_a, case=False, na=False))
-            ]
-        
-        if not interaction1.empty:
-            print(f"Found interaction: {interaction1.iloc[0]['Interaction Description'][:100]}...")
-            return interaction1.iloc[0]['Interaction Description']
-        elif not interaction2.empty:
-            print(f"Found interaction: {interaction2.iloc[0]['Interaction Description'][:100]}...")
-            return interaction2.iloc[0]['Interaction Description']
+        if row is not None:
+            description = self.store.descriptions[row]
+            print(f"Found interaction: {description[:100]}...")
+            return description
         else:
             print("No interaction found in database")
             return None
     
     def _determine_severity_from_description(self, description):
         """Determine interaction severity from description text"""
-        description_lower = description.lower()
-        
-        # High severity keywords
-        high_severity_keywords = [
-            'contraindicated', 'avoid', 'dangerous', 'severe', 'toxic', 'fatal',
-            'life-threatening', 'serious', 'major', 'significant risk'
-        ]
-        
-        # Medium severity keywords
-        medium_severity_keywords = [
-            'caution', 'monitor', 'adjust', 'reduce', 'increase', 'moderate',
-            'may increase', 'may decrease', 'potential', 'consider'
-        ]
-        
-        # Low severity keywords
-        low_severity_keywords = [
-            'minor', 'slight', 'minimal', 'unlikely', 'rare'
-        ]
-        
-        if any(keyword in description_lower for keyword in high_severity_keywords):
-            return 'High'
-        elif any(keyword in description_lower for keyword in medium_severity_keywords):
-            return 'Medium'
-        elif any(keyword in description_lower for keyword in low_severity_keywords):
-            return 'Low'
-        else:
-            return 'Medium'  # Default to medium if unclear
+        severity, _ = classify_interaction(description)
+        return severity
     
     def _determine_severity_from_descriptions(self, descriptions):
         """Determine overall severity from multiple descriptions"""
-        severities = [self._determine_severity_from_description(desc) for desc in descriptions]
+        return self._highest_severity(
+            self._determine_severity_from_description(desc) for desc in descriptions
+        )
+    
+    @staticmethod
+    def _highest_severity(severities):
+        """Get the most serious of several severities ('None' if empty)"""
+        severities = set(severities)
         
         if 'High' in severities:
             return 'High'
@@ -199,29 +177,10 @@ class MedicineAgent:
     
     def _extract_affected_systems(self, descriptions):
         """Extract affected body systems from interaction descriptions"""
-        systems = set()
-        
+        systems_mask = 0
         for description in descriptions:
-            desc_lower = description.lower()
-            
-            if any(word in desc_lower for word in ['heart', 'cardiac', 'cardiovascular']):
-                systems.add('Cardiovascular')
-            if any(word in desc_lower for word in ['liver', 'hepatic']):
-                systems.add('Hepatic')
-            if any(word in desc_lower for word in ['kidney', 'renal']):
-                systems.add('Renal')
-            if any(word in desc_lower for word in ['nervous', 'neurological', 'cns']):
-                systems.add('Nervous System')
-            if any(word in desc_lower for word in ['respiratory', 'lung']):
-                systems.add('Respiratory')
-            if any(word in desc_lower for word in ['gastrointestinal', 'stomach', 'digestive']):
-                systems.add('Gastrointestinal')
-            if any(word in desc_lower for word in ['blood', 'hematologic', 'bleeding']):
-                systems.add('Hematologic')
-            if any(word in desc_lower for word in ['skin', 'dermatologic', 'photosensitizing']):
-                systems.add('Dermatologic')
-        
-        return list(systems)
+            systems_mask |= classify_interaction(description)[1]
+        return systems_from_mask(systems_mask)
     
     def _get_recommendation_for_severity(self, severity):
         """Get recommendation based on interaction severity"""
@@ -0,0 +1,144 @@
+"""
+Model Assets - URLs for the 3D body models shown by the digital twin viewers
+
+With Streamlit static serving enabled (.streamlit/config.toml), each model is
+published once per process into static/ under a content-hashed file name and
+referenced by URL, so the browser downloads it once and revalidates it by
+ETag instead of receiving it inside every page rerun. Without static serving
+the model is inlined as a base64 data URL, encoded once per process.
+
+When the model's LOD variants have been built (see model_optimizer), a viewer
+passing its height gets the smallest variant made for that height.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directory Streamlit serves at app/static/ (next to app.py)
+STATIC_DIR = os.path.join(PROJECT_DIR, 'static')
+
+# Directory holding LOD variants of the models and their manifests
+MODELS_DIR = os.path.join(PROJECT_DIR, 'models')
+
+# Body model shown by the digital twin viewers
+DEFAULT_MODEL = 'HumanBody.glb'
+
+_urls = {}
+_urls_lock = threading.Lock()
+
+_lod_manifests = {}
+
+
+def static_serving_enabled():
+    """Check whether Streamlit serves the static/ directory"""
+    try:
+        from streamlit import config
+        return bool(config.get_option('server.enableStaticServing'))
+    except Exception:
+        return False
+
+
+def lod_manifest_path(source_path, models_dir=MODELS_DIR):
+    """File listing a model's LOD variants"""
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(models_dir, f"{stem}.lods.json")
+
+
+def select_lod(path, viewport, models_dir=MODELS_DIR):
+    """
+    Pick the smallest LOD variant of a model built for a viewer size
+
+    Args:
+        path (str): Source model file
+        viewport (int): Viewer height in CSS pixels (the body model is framed to it)
+        models_dir (str, optional): Directory holding the variants and manifest
+
+    Returns:
+        str: Path of the variant, or the source path if none was built or it is stale
+    """
+    manifest_path = lod_manifest_path(path, models_dir)
+    try:
+        key = (path, os.stat(path).st_mtime_ns, os.stat(manifest_path).st_mtime_ns)
+    except OSError:
+        return path
+
+    lods = _lod_manifests.get(key)
+    if lods is None:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        with open(path, 'rb') as f:
+            current = hashlib.sha256(f.read()).hexdigest() == manifest['source_sha256']
+        lods = manifest['lods'] if current else []
+        _lod_manifests[key] = lods
+
+    # LODs go from most to least detailed; a max_viewport of None serves any size
+    chosen = path
+    for lod in lods:
+        if lod['max_viewport'] is None or viewport <= lod['max_viewport']:
+            chosen = os.path.join(os.path.dirname(manifest_path), lod['file'])
+    return chosen if os.path.exists(chosen) else path
+
+
+def get_model_url(file_name=DEFAULT_MODEL, viewport=None):
+    """
+    Get the URL a viewer loads a model from, publishing or encoding it on first use
+
+    Args:
+        file_name (str): Model file, relative to the project directory
+        viewport (int, optional): Viewer height in CSS pixels, to pick an LOD variant
+
+    Returns:
+        str: Static asset URL or data URL, or None if the model file is missing
+    """
+    path = os.path.join(PROJECT_DIR, file_name)
+    if viewport is not None:
+        path = select_lod(path, viewport)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    static = static_serving_enabled()
+    key = (path, stat.st_mtime_ns, stat.st_size, static)
+
+    url = _urls.get(key)
+    if url is None:
+        with _urls_lock:
+            url = _urls.get(key)
+            if url is None:
+                url = _publish_static(path) if static else _encode_data_url(path)
+                _urls[key] = url
+    return url
+
+
+def _publish_static(path):
+    """Place a content-hashed copy of a model in static/ and get its URL"""
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    name, ext = os.path.splitext(os.path.basename(path))
+    static_name = f"{name}.{digest}{ext}"
+    static_path = os.path.join(STATIC_DIR, static_name)
+
+    if not os.path.exists(static_path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        temp_path = f"{static_path}.{os.getpid()}.tmp"
+        try:
+            os.link(path, temp_path)
+        except OSError:
+            shutil.copyfile(path, temp_path)
+        os.replace(temp_path, static_path)
+
+    return f"app/static/{static_name}"
+
+
+def _encode_data_url(path):
+    """Inline a model as a base64 data URL"""
+    with open(path, 'rb') as f:
+        return "data:model/gltf-binary;base64," + base64.b64encode(f.read()).decode()
@@ -0,0 +1,593 @@
+"""
+Model Optimizer - Offline GLB asset pipeline for the 3D body models
+
+Parses a binary glTF (GLB), reports its vertex, triangle and texture budgets,
+and writes level-of-detail variants next to a manifest the viewers choose
+from (see model_assets.get_model_url). Each LOD is decimated by vertex
+clustering, stores its vertex data quantized (KHR_mesh_quantization) and has
+its textures downscaled when Pillow is available.
+
+Report a model's budget with:
+    python -m agents.model_optimizer HumanBody.glb --report
+
+and build its LODs (into models/) with:
+    python -m agents.model_optimizer HumanBody.glb
+"""
+
+import argparse
+import copy
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from agents.model_assets import MODELS_DIR, lod_manifest_path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32
+}
+
+TYPE_SIZES = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+MODE_TRIANGLES = 4
+
+QUANTIZATION_EXTENSION = 'KHR_mesh_quantization'
+
+# Budgets a model served to the viewers should stay within
+MODEL_BUDGETS = {
+    'file_bytes': 2 * 1024 * 1024,
+    'triangles': 50000,
+    'vertices': 50000,
+    'texture_bytes': 1024 * 1024,
+    'texture_size': 2048
+}
+
+# (triangle ratio, largest texture side, tallest viewer in CSS pixels served; None for any)
+LOD_LEVELS = (
+    (1.0, 2048, None),
+    (0.5, 1024, 600),
+    (0.2, 512, 300)
+)
+
+
+def read_glb(path):
+    """
+    Read a binary glTF file
+
+    Returns:
+        tuple: (glTF JSON dict, binary chunk bytes)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, length = struct.unpack_from('<4sII', data, 0)
+    if magic != GLB_MAGIC or version != 2:
+        raise ValueError(f"{path} is not a glTF 2.0 binary file")
+
+    gltf = None
+    binary = b''
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk)
+        elif chunk_type == CHUNK_BIN:
+            binary = chunk
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError(f"{path} has no JSON chunk")
+    if any('uri' in buffer for buffer in gltf.get('buffers', [])):
+        raise ValueError(f"{path} references external buffers, which are not supported")
+    return gltf, binary
+
+
+def write_glb(path, gltf, binary):
+    """Write a binary glTF file"""
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    binary += b'\0' * (-len(binary) % 4)
+
+    length = 12 + 8 + len(json_chunk) + (8 + len(binary) if binary else 0)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sII', GLB_MAGIC, 2, length))
+        f.write(struct.pack('<II', len(json_chunk), CHUNK_JSON))
+        f.write(json_chunk)
+        if binary:
+            f.write(struct.pack('<II', len(binary), CHUNK_BIN))
+            f.write(binary)
+
+
+def read_accessor(gltf, binary, index):
+    """Read an accessor as a (count, components) array"""
+    accessor = gltf['accessors'][index]
+    if 'sparse' in accessor:
+        raise ValueError(f"Sparse accessor {index} is not supported")
+
+    dtype = np.dtype(COMPONENT_DTYPES[accessor['componentType']])
+    components = TYPE_SIZES[accessor['type']]
+    count = accessor['count']
+    if 'bufferView' not in accessor:
+        return np.zeros((count, components), dtype=dtype)
+
+    view = gltf['bufferViews'][accessor['bufferView']]
+    offset = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    stride = view.get('byteStride', dtype.itemsize * components)
+    return np.ndarray(
+        (count, components), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize)
+    ).copy()
+
+
+def read_attribute(gltf, binary, index):
+    """Read a vertex attribute as float32, undoing normalized integer storage"""
+    accessor = gltf['accessors'][index]
+    values = read_accessor(gltf, binary, index)
+    if accessor.get('normalized'):
+        info = np.iinfo(values.dtype)
+        return np.maximum(values.astype(np.float32) / info.max, -1.0)
+    return values.astype(np.float32)
+
+
+def read_image(gltf, binary, index):
+    """Get an embedded image's bytes, or None for an image referenced by URI"""
+    image = gltf['images'][index]
+    if 'bufferView' not in image:
+        return None
+    view = gltf['bufferViews'][image['bufferView']]
+    offset = view.get('byteOffset', 0)
+    return binary[offset:offset + view['byteLength']]
+
+
+def _primitive_indices(gltf, binary, primitive):
+    """Get a triangle primitive's indices as an (n, 3) array"""
+    if 'indices' in primitive:
+        indices = read_accessor(gltf, binary, primitive['indices']).ravel()
+    else:
+        indices = np.arange(gltf['accessors'][primitive['attributes']['POSITION']]['count'])
+    return indices.astype(np.int64).reshape(-1, 3)
+
+
+def model_budget(gltf, binary, file_bytes=None):
+    """
+    Measure a model's geometry and texture sizes
+
+    Returns:
+        dict: Totals plus per-mesh and per-texture details
+    """
+    meshes = []
+    for mesh_index, mesh in enumerate(gltf.get('meshes', [])):
+        vertices = triangles = 0
+        for primitive in mesh['primitives']:
+            vertices += gltf['accessors'][primitive['attributes']['POSITION']]['count']
+            if primitive.get('mode', MODE_TRIANGLES) == MODE_TRIANGLES:
+                if 'indices' in primitive:
+                    triangles += gltf['accessors'][primitive['indices']]['count'] // 3
+                else:
+                    triangles += gltf['accessors'][primitive['attributes']['POSITION']]['count'] // 3
+        meshes.append({
+            'name': mesh.get('name', f"mesh_{mesh_index}"),
+            'primitives': len(mesh['primitives']),
+            'vertices': vertices,
+            'triangles': triangles
+        })
+
+    textures = []
+    for image_index, image in enumerate(gltf.get('images', [])):
+        data = read_image(gltf, binary, image_index)
+        width = height = None
+        if data is not None and Image is not None:
+            width, height = Image.open(io.BytesIO(data)).size
+        textures.append({
+            'name': image.get('name', f"image_{image_index}"),
+            'mime_type': image.get('mimeType'),
+            'bytes': len(data) if data is not None else None,
+            'width': width,
+            'height': height
+        })
+
+    texture_bytes = sum(texture['bytes'] or 0 for texture in textures)
+    return {
+        'file_bytes': file_bytes,
+        'vertices': sum(mesh['vertices'] for mesh in meshes),
+        'triangles': sum(mesh['triangles'] for mesh in meshes),
+        'texture_bytes': texture_bytes,
+        'geometry_bytes': len(binary) - texture_bytes,
+        'texture_size': max([max(t['width'], t['height']) for t in textures if t['width']], default=0),
+        'meshes': meshes,
+        'textures': textures
+    }
+
+
+def budget_violations(budget, budgets=MODEL_BUDGETS):
+    """List the budgets a model exceeds"""
+    return [
+        f"{name}: {budget[name]:,} exceeds {limit:,}"
+        for name, limit in budgets.items()
+        if budget.get(name) is not None and budget[name] > limit
+    ]
+
+
+def decimate(attributes, triangles, ratio):
+    """
+    Reduce a triangle mesh by vertex clustering
+
+    Vertices are merged per cell of a uniform grid over the mesh, sized by
+    bisection so that about `ratio` of the triangles survive. Texture
+    coordinates take part in the cell key, so UV seams are kept.
+
+    Args:
+        attributes (dict): Attribute name -> (vertices, components) float32 array
+        triangles (np.ndarray): (n, 3) vertex indices
+        ratio (float): Fraction of triangles to keep
+
+    Returns:
+        tuple: (attributes dict, triangles array) of the reduced mesh
+    """
+    target = max(1, int(len(triangles) * ratio))
+    if ratio >= 1.0 or len(triangles) <= target:
+        return attributes, triangles
+
+    positions = attributes['POSITION']
+    lower = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - lower).max()) or 1.0
+    unit_positions = (positions - lower) / extent
+    uvs = attributes.get('TEXCOORD_0')
+
+    def cluster(grid):
+        keys = [np.minimum((unit_positions * grid).astype(np.int64), grid - 1)]
+        if uvs is not None:
+            keys.append(np.floor(uvs * grid).astype(np.int64))
+        _, clusters = np.unique(np.hstack(keys), axis=0, return_inverse=True)
+        clustered = clusters.ravel()[triangles]
+
+        # Drop collapsed triangles and duplicates, keeping each survivor's winding
+        keep = (
+            (clustered[:, 0] != clustered[:, 1])
+            & (clustered[:, 1] != clustered[:, 2])
+            & (clustered[:, 0] != clustered[:, 2])
+        )
+        clustered = clustered[keep]
+        _, first = np.unique(np.sort(clustered, axis=1), axis=0, return_index=True)
+        return clusters.ravel(), clustered[np.sort(first)]
+
+    low, high = 2, 4096
+    best = None
+    while low <= high:
+        grid = (low + high) // 2
+        clusters, reduced = cluster(grid)
+        if len(reduced) <= target:
+            best = (clusters, reduced)
+            low = grid + 1
+        else:
+            high = grid - 1
+    if best is None:
+        best = cluster(2)
+    clusters, reduced = best
+
+    # Each cluster becomes the average of its vertices; unreferenced clusters are dropped
+    counts = np.bincount(clusters).astype(np.float32)[:, None]
+    used, reduced = np.unique(reduced, return_inverse=True)
+    reduced_attributes = {}
+    for name, values in attributes.items():
+        merged = np.zeros((len(counts), values.shape[1]), dtype=np.float64)
+        np.add.at(merged, clusters, values)
+        merged = (merged / counts)[used].astype(np.float32)
+
+        if name in ('NORMAL', 'TANGENT'):
+            lengths = np.linalg.norm(merged[:, :3], axis=1, keepdims=True)
+            merged[:, :3] /= np.where(lengths > 0, lengths, 1.0)
+            if name == 'TANGENT':
+                merged[:, 3] = np.where(merged[:, 3] < 0, -1.0, 1.0)
+        reduced_attributes[name] = merged
+
+    return reduced_attributes, reduced.reshape(-1, 3)
+
+
+class _BufferWriter:
+    """Builds a new binary chunk with its buffer views and accessors"""
+
+    def __init__(self, gltf):
+        self.gltf = gltf
+        self.data = bytearray()
+        gltf['bufferViews'] = []
+        gltf['accessors'] = []
+
+    def add_view(self, data, target=None, stride=None):
+        """Append bytes as a 4-byte aligned buffer view and get its index"""
+        self.data += b'\0' * (-len(self.data) % 4)
+        view = {'buffer': 0, 'byteOffset': len(self.data), 'byteLength': len(data)}
+        if target is not None:
+            view['target'] = target
+        if stride is not None:
+            view['byteStride'] = stride
+        self.data += data
+        self.gltf['bufferViews'].append(view)
+        return len(self.gltf['bufferViews']) - 1
+
+    def add_accessor(self, values, component_type, normalized=False, target=None, bounds=False):
+        """Append a (count, components) array as an accessor and get its index"""
+        values = np.ascontiguousarray(values, dtype=COMPONENT_DTYPES[component_type])
+        components = values.shape[1]
+        accessor_type = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4', 16: 'MAT4'}[components]
+
+        stride = None
+        if target == ARRAY_BUFFER and values.itemsize * components % 4:
+            # Vertex attribute elements must start on 4-byte boundaries
+            padded_components = components + (-values.itemsize * components % 4) // values.itemsize
+            padded = np.zeros((len(values), padded_components), dtype=values.dtype)
+            padded[:, :components] = values
+            stride = padded.itemsize * padded_components
+            data = padded.tobytes()
+        else:
+            data = values.tobytes()
+
+        accessor = {
+            'bufferView': self.add_view(data, target, stride),
+            'componentType': component_type,
+            'count': len(values),
+            'type': accessor_type
+        }
+        if normalized:
+            accessor['normalized'] = True
+        if bounds:
+            accessor['min'] = values.min(axis=0).tolist()
+            accessor['max'] = values.max(axis=0).tolist()
+        self.gltf['accessors'].append(accessor)
+        return len(self.gltf['accessors']) - 1
+
+    def copy_accessor(self, source_gltf, binary, index):
+        """Copy an accessor unchanged and get its new index"""
+        accessor = source_gltf['accessors'][index]
+        values = read_accessor(source_gltf, binary, index)
+        bounds = 'min' in accessor
+        new_index = self.add_accessor(values, accessor['componentType'], accessor.get('normalized', False), bounds=bounds)
+        if bounds:
+            self.gltf['accessors'][new_index]['min'] = accessor['min']
+            self.gltf['accessors'][new_index]['max'] = accessor['max']
+        return new_index
+
+
+def _downscale_image(data, mime_type, max_size):
+    """Shrink an encoded image so neither side exceeds max_size (unchanged without Pillow)"""
+    if Image is None or max_size is None:
+        return data
+
+    image = Image.open(io.BytesIO(data))
+    if max(image.size) <= max_size:
+        return data
+
+    image.thumbnail((max_size, max_size), Image.LANCZOS)
+    output = io.BytesIO()
+    if mime_type == 'image/jpeg':
+        image.save(output, format='JPEG', quality=85, optimize=True)
+    else:
+        image.save(output, format='PNG', optimize=True)
+    return output.getvalue()
+
+
+def _quantizable_meshes(gltf):
+    """Meshes whose positions may be quantized (skinned and morphed meshes ignore the node transform used)"""
+    excluded = {node['mesh'] for node in gltf.get('nodes', []) if 'mesh' in node and 'skin' in node}
+    return {
+        index for index, mesh in enumerate(gltf.get('meshes', []))
+        if index not in excluded and not any('targets' in p for p in mesh['primitives'])
+    }
+
+
+def optimize_model(gltf, binary, ratio=1.0, max_texture_size=None, quantize=True):
+    """
+    Build an optimized copy of a model
+
+    Args:
+        gltf (dict): Source glTF JSON
+        binary (bytes): Source binary chunk
+        ratio (float): Fraction of triangles to keep
+        max_texture_size (int, optional): Largest texture side in pixels
+        quantize (bool): Store vertex data as quantized integers
+
+    Returns:
+        tuple: (glTF JSON dict, binary chunk bytes)
+    """
+    output = copy.deepcopy(gltf)
+    writer = _BufferWriter(output)
+    quantizable = _quantizable_meshes(gltf) if quantize else set()
+    dequantize = {}
+
+    for mesh_index, mesh in enumerate(output.get('meshes', [])):
+        primitives = []
+        for primitive in mesh['primitives']:
+            attributes = {
+                name: read_attribute(gltf, binary, index)
+                for name, index in primitive['attributes'].items()
+            }
+            triangles = None
+            if primitive.get('mode', MODE_TRIANGLES) == MODE_TRIANGLES:
+                triangles = _primitive_indices(gltf, binary, primitive)
+                if 'targets' not in primitive and 'JOINTS_0' not in attributes:
+                    attributes, triangles = decimate(attributes, triangles, ratio)
+            primitives.append((primitive, attributes, triangles))
+
+        # One dequantization transform per mesh, uniform so normals stay correct
+        if mesh_index in quantizable:
+            positions = np.vstack([attributes['POSITION'] for _, attributes, _ in primitives])
+            lower, upper = positions.min(axis=0), positions.max(axis=0)
+            center = (lower + upper) / 2
+            scale = float((upper - lower).max() / 2) or 1.0
+            dequantize[mesh_index] = (center, scale)
+
+        for primitive, attributes, triangles in primitives:
+            for name, values in attributes.items():
+                source = gltf['accessors'][primitive['attributes'][name]]
+                primitive['attributes'][name] = _write_attribute(
+                    writer, name, values, source, dequantize.get(mesh_index), quantize
+                )
+            if triangles is not None:
+                component_type = 5123 if triangles.max(initial=0) < 65535 else 5125
+                primitive['indices'] = writer.add_accessor(triangles.reshape(-1, 1), component_type, target=ELEMENT_ARRAY_BUFFER)
+            elif 'indices' in primitive:
+                primitive['indices'] = writer.copy_accessor(gltf, binary, primitive['indices'])
+            for target in primitive.get('targets', []):
+                for name, index in target.items():
+                    target[name] = writer.copy_accessor(gltf, binary, index)
+
+    for skin in output.get('skins', []):
+        if 'inverseBindMatrices' in skin:
+            skin['inverseBindMatrices'] = writer.copy_accessor(gltf, binary, skin['inverseBindMatrices'])
+    for animation in output.get('animations', []):
+        for sampler in animation['samplers']:
+            sampler['input'] = writer.copy_accessor(gltf, binary, sampler['input'])
+            sampler['output'] = writer.copy_accessor(gltf, binary, sampler['output'])
+
+    for image_index, image in enumerate(output.get('images', [])):
+        data = read_image(gltf, binary, image_index)
+        if data is not None:
+            image['bufferView'] = writer.add_view(_downscale_image(data, image.get('mimeType'), max_texture_size))
+
+    # Quantized meshes move under a child node that maps them back to model units
+    for node in list(output.get('nodes', [])):
+        if node.get('mesh') in dequantize:
+            center, scale = dequantize[node['mesh']]
+            output['nodes'].append({
+                'name': f"{node.get('name', 'node')}_dequantize",
+                'mesh': node.pop('mesh'),
+                'translation': center.tolist(),
+                'scale': [scale / 32767] * 3
+            })
+            node.setdefault('children', []).append(len(output['nodes']) - 1)
+
+    if quantize:
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            if QUANTIZATION_EXTENSION not in output.setdefault(key, []):
+                output[key].append(QUANTIZATION_EXTENSION)
+
+    output['buffers'] = [{'byteLength': len(writer.data)}]
+    return output, bytes(writer.data)
+
+
+def _write_attribute(writer, name, values, source, dequantize, quantize):
+    """Write one vertex attribute, quantized where the format allows"""
+    if name.startswith('JOINTS_'):
+        return writer.add_accessor(values, source['componentType'], target=ARRAY_BUFFER)
+
+    if name == 'POSITION':
+        if dequantize is not None:
+            center, scale = dequantize
+            quantized = np.round((values - center) / scale * 32767)
+            return writer.add_accessor(np.clip(quantized, -32767, 32767), 5122, target=ARRAY_BUFFER, bounds=True)
+        return writer.add_accessor(values, 5126, target=ARRAY_BUFFER, bounds=True)
+
+    if quantize and name in ('NORMAL', 'TANGENT'):
+        return writer.add_accessor(np.round(np.clip(values, -1, 1) * 127), 5120, normalized=True, target=ARRAY_BUFFER)
+
+    if quantize and name.startswith('TEXCOORD_') and values.min(initial=0) >= 0 and values.max(initial=0) <= 1:
+        return writer.add_accessor(np.round(values * 65535), 5123, normalized=True, target=ARRAY_BUFFER)
+
+    return writer.add_accessor(values, 5126, target=ARRAY_BUFFER)
+
+
+def build_lods(path, output_dir=MODELS_DIR, levels=LOD_LEVELS):
+    """
+    Write a model's LOD variants and their manifest
+
+    Args:
+        path (str): Source GLB file
+        output_dir (str): Directory for the variants
+        levels (tuple): (triangle ratio, largest texture side, tallest viewer served) per LOD
+
+    Returns:
+        dict: The manifest written
+    """
+    gltf, binary = read_glb(path)
+    with open(path, 'rb') as f:
+        source_sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    lods = []
+    for level, (ratio, max_texture_size, max_viewport) in enumerate(levels):
+        lod_gltf, lod_binary = optimize_model(gltf, binary, ratio, max_texture_size)
+        lod_name = f"{stem}.lod{level}.glb"
+        lod_path = os.path.join(output_dir, lod_name)
+        write_glb(lod_path, lod_gltf, lod_binary)
+
+        budget = model_budget(lod_gltf, lod_binary, os.path.getsize(lod_path))
+        lods.append({
+            'file': lod_name,
+            'max_viewport': max_viewport,
+            'bytes': budget['file_bytes'],
+            'vertices': budget['vertices'],
+            'triangles': budget['triangles'],
+            'texture_bytes': budget['texture_bytes']
+        })
+
+    manifest = {
+        'source': os.path.basename(path),
+        'source_sha256': source_sha256,
+        'lods': lods
+    }
+    with open(lod_manifest_path(path, output_dir), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _print_budget(path, budget):
+    """Print a model budget report"""
+    print(f"{path}: {budget['file_bytes']:,} bytes")
+    print(f"  {budget['vertices']:,} vertices, {budget['triangles']:,} triangles, "
+          f"{budget['geometry_bytes']:,} geometry bytes, {budget['texture_bytes']:,} texture bytes")
+    for mesh in budget['meshes']:
+        print(f"  mesh {mesh['name']}: {mesh['primitives']} primitives, "
+              f"{mesh['vertices']:,} vertices, {mesh['triangles']:,} triangles")
+    for texture in budget['textures']:
+        size = f"{texture['width']}x{texture['height']}" if texture['width'] else "unknown size"
+        print(f"  texture {texture['name']}: {texture['mime_type']}, {size}, {texture['bytes'] or 0:,} bytes")
+    for violation in budget_violations(budget):
+        print(f"  over budget - {violation}")
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Report GLB model budgets and build LOD variants")
+    parser.add_argument('models', nargs='+', help="GLB files")
+    parser.add_argument('--report', action='store_true', help="Only report budgets")
+    parser.add_argument('--output-dir', default=MODELS_DIR, help="Directory for LOD variants")
+    args = parser.parse_args(argv)
+
+    for path in args.models:
+        gltf, binary = read_glb(path)
+        _print_budget(path, model_budget(gltf, binary, os.path.getsize(path)))
+        if args.report:
+            continue
+
+        manifest = build_lods(path, args.output_dir)
+        for lod in manifest['lods']:
+            viewport = f"up to {lod['max_viewport']}px" if lod['max_viewport'] else "any size"
+            print(f"  -> {lod['file']}: {lod['bytes']:,} bytes, {lod['triangles']:,} triangles ({viewport})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
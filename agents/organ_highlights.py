@@ -0,0 +1,212 @@
+"""
+Organ Highlights - Precomputed organ highlight state for the digital twin body view
+
+Organs are bits of an organ mask. Every medicine, medicine pair and body
+system combination is mapped to its mask once at import, and the body view
+HTML is rendered once per mask from a template, so drawing the twin is a
+dictionary lookup rather than string matching and formatting on each rerun.
+"""
+
+from itertools import combinations
+from string import Template
+
+from agents.interaction_classifier import SYSTEM_KEYWORDS
+
+# (key, icon, label) per organ, in bit order
+ORGANS = (
+    ('brain', '🧠', 'Brain'),
+    ('heart', '❤️', 'Heart'),
+    ('lungs', '🫁', 'Lungs'),
+    ('stomach', '🫄', 'Stomach'),
+    ('liver', '🫘', 'Liver'),
+    ('kidneys', '🫘', 'Kidneys')
+)
+
+ORGAN_BITS = {key: 1 << bit for bit, (key, _, _) in enumerate(ORGANS)}
+
+# Organs a medicine acts on
+MEDICINE_ORGANS = {
+    'Aspirin': ('heart', 'stomach'),
+    'Warfarin': ('heart', 'liver'),
+    'Lisinopril': ('heart', 'kidneys'),
+    'Ibuprofen': ('brain', 'stomach', 'kidneys'),
+    'Sertraline': ('brain',),
+    'Metformin': ('liver', 'stomach'),
+    'Albuterol': ('lungs',),
+    'Atorvastatin': ('liver', 'heart')
+}
+
+# Organs showing each body system from the interaction classifier
+SYSTEM_ORGANS = {
+    'Cardiovascular': ('heart',),
+    'Hepatic': ('liver',),
+    'Renal': ('kidneys',),
+    'Nervous System': ('brain',),
+    'Respiratory': ('lungs',),
+    'Gastrointestinal': ('stomach',),
+    'Hematologic': ('heart',),
+    'Dermatologic': ()
+}
+
+# Words in a simulation target naming each organ
+TARGET_KEYWORDS = {
+    'brain': ('Brain', 'Nervous'),
+    'heart': ('Heart', 'Cardiovascular'),
+    'lungs': ('Lung', 'Respiratory'),
+    'stomach': ('Stomach', 'Digestive'),
+    'liver': ('Liver', 'Digestive'),
+    'kidneys': ('Kidney', 'Urinary')
+}
+
+# Simulation targets whose organ masks are cached (others are matched on each call)
+MAX_CACHED_TARGETS = 256
+
+# Cell style per highlight state: an inactive organ is 'normal', an active one
+# takes its alert level from ACTIVE_ALERTS
+HIGHLIGHT_STYLES = {
+    'success': {
+        'background': '#bbf7d0',
+        'border': '#22c55e',
+        'shadow': '0 0 18px rgba(34, 197, 94, 0.9)',
+        'status': '🟢 Active'
+    },
+    'warning': {
+        'background': '#fef08a',
+        'border': '#eab308',
+        'shadow': '0 0 18px rgba(234, 179, 8, 0.9)',
+        'status': '🟢 Active'
+    },
+    'error': {
+        'background': '#fecaca',
+        'border': '#ef4444',
+        'shadow': '0 0 18px rgba(239, 68, 68, 0.9)',
+        'status': '🟢 Active'
+    },
+    'normal': {
+        'background': '#e5e7eb',
+        'border': '#94a3b8',
+        'shadow': '0 4px 10px rgba(15, 23, 42, 0.25)',
+        'status': '⚪ Normal'
+    }
+}
+
+# Alert level of an active organ, where it is not 'success'
+ACTIVE_ALERTS = {
+    'heart': 'error',
+    'stomach': 'warning'
+}
+
+# Body view rows: (organ key, label shown) per cell
+BODY_LAYOUT = (
+    (('brain', 'Brain'),),
+    (('lungs', 'Left Lung'), ('heart', 'Heart'), ('lungs', 'Right Lung')),
+    (('stomach', 'Stomach'), ('kidneys', 'Kidneys'), ('liver', 'Liver'))
+)
+
+_ORGAN_CELL = Template(
+    '<div style="flex: 1; background: $background; border: 2px solid $border; box-shadow: $shadow; '
+    'border-radius: 12px; padding: 0.75rem; text-align: center;">'
+    '<div style="font-size: 1.6rem;">$icon</div>'
+    '<div style="font-weight: 700; color: #1f2937;">$label</div>'
+    '<div style="font-size: 0.8rem; color: #374151;">$status</div>'
+    '</div>'
+)
+
+_BODY_ROW = Template('<div style="display: flex; justify-content: center; gap: 0.75rem; margin: 0.5rem 0;">$cells</div>')
+
+_BODY_VIEW = Template('<div class="organ-highlight-map">$rows</div>')
+
+_ORGAN_ICONS = {key: icon for key, icon, _ in ORGANS}
+
+
+def organ_mask(organs):
+    """Get the mask of a collection of organ keys"""
+    mask = 0
+    for organ in organs:
+        mask |= ORGAN_BITS[organ]
+    return mask
+
+
+def organs_from_mask(mask):
+    """Get the organ keys set in a mask, in bit order"""
+    return [key for key, _, _ in ORGANS if mask & ORGAN_BITS[key]]
+
+
+# Every selection of up to two known medicines -> organ mask
+_medicine_masks = {
+    frozenset(selection): organ_mask(organ for medicine in selection for organ in MEDICINE_ORGANS[medicine])
+    for size in (1, 2)
+    for selection in combinations(MEDICINE_ORGANS, size)
+}
+
+# Every interaction classifier systems mask -> organ mask
+_system_bit_masks = [organ_mask(SYSTEM_ORGANS[label]) for label, _ in SYSTEM_KEYWORDS]
+SYSTEMS_ORGAN_MASKS = [0] * (1 << len(SYSTEM_KEYWORDS))
+for _systems_mask in range(1, len(SYSTEMS_ORGAN_MASKS)):
+    # Each mask extends the one without its lowest system bit
+    _low_bit = _systems_mask & -_systems_mask
+    SYSTEMS_ORGAN_MASKS[_systems_mask] = (
+        SYSTEMS_ORGAN_MASKS[_systems_mask ^ _low_bit] | _system_bit_masks[_low_bit.bit_length() - 1]
+    )
+
+_target_masks = {}
+_body_views = {}
+
+
+def medicine_organ_mask(medicines):
+    """
+    Get the organs highlighted for selected medicines
+
+    Args:
+        medicines (iterable): Medicine names; unknown ones highlight nothing
+
+    Returns:
+        int: Organ mask
+    """
+    selection = frozenset(medicine for medicine in medicines if medicine in MEDICINE_ORGANS)
+    mask = _medicine_masks.get(selection)
+    if mask is None:
+        mask = organ_mask(organ for medicine in selection for organ in MEDICINE_ORGANS[medicine])
+    return mask
+
+
+def systems_organ_mask(systems_mask):
+    """Get the organs highlighted for an interaction classifier systems mask"""
+    return SYSTEMS_ORGAN_MASKS[systems_mask]
+
+
+def target_organ_mask(target):
+    """Get the organs a simulation target names (e.g. 'Heart', 'Digestive System')"""
+    mask = _target_masks.get(target)
+    if mask is None:
+        mask = organ_mask(
+            organ for organ, keywords in TARGET_KEYWORDS.items()
+            if any(keyword in target for keyword in keywords)
+        )
+        if len(_target_masks) < MAX_CACHED_TARGETS:
+            _target_masks[target] = mask
+    return mask
+
+
+def highlight_style(organ, mask):
+    """Get the cell style of an organ in the body view for an organ mask"""
+    if not mask & ORGAN_BITS[organ]:
+        return HIGHLIGHT_STYLES['normal']
+    return HIGHLIGHT_STYLES[ACTIVE_ALERTS.get(organ, 'success')]
+
+
+def body_view_html(mask):
+    """Get the body view HTML for an organ mask, rendered once per mask"""
+    html = _body_views.get(mask)
+    if html is None:
+        rows = []
+        for row in BODY_LAYOUT:
+            cells = []
+            for organ, label in row:
+                cells.append(_ORGAN_CELL.substitute(
+                    highlight_style(organ, mask), icon=_ORGAN_ICONS[organ], label=label
+                ))
+            rows.append(_BODY_ROW.substitute(cells=''.join(cells)))
+        html = _BODY_VIEW.substitute(rows=''.join(rows))
+        _body_views[mask] = html
+    return html
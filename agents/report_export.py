@@ -0,0 +1,142 @@
+"""
+Report Export - Bulk multi-patient PDF summary export into one ZIP archive
+
+Summaries and PDFs are produced in a process pool, since ReportLab rendering
+is CPU-bound, and each PDF is written into the archive as soon as it is done.
+Workers are spawned rather than forked: the Streamlit server that calls this
+runs many threads, and a forked child could inherit locks held by them.
+
+Export from the command line with:
+    python -m agents.report_export patients.json reports.zip [--workers N]
+
+where patients.json holds a list of patient_data dicts as taken by SummaryAgent.run.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from agents.report_worker import render_patient_report
+
+# Reports queued per worker, bounding how many finished PDFs wait in memory
+TASKS_PER_WORKER = 4
+
+# How worker processes are started (see the module docstring)
+WORKER_START_METHOD = 'spawn'
+
+
+def report_file_names(patients):
+    """
+    Get a unique archive file name for each patient's report
+
+    Names come from the sanitized patient id. A patient without an id is
+    named by its position in the list, and repeated names get a numeric suffix.
+
+    Args:
+        patients (list): patient_data dicts
+
+    Returns:
+        list: File names, in patient order
+    """
+    names = []
+    used = set()
+    for index, patient_data in enumerate(patients):
+        patient_id = patient_data.get('patient_info', {}).get('patient_id')
+        if patient_id is None or str(patient_id) == '':
+            stem = f"patient_summary_no_id_{index + 1}"
+        else:
+            stem = f"patient_summary_{re.sub(r'[^A-Za-z0-9_.-]', '_', str(patient_id))}"
+
+        name = f"{stem}.pdf"
+        duplicate = 1
+        while name in used:
+            duplicate += 1
+            name = f"{stem}_{duplicate}.pdf"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def export_reports(patients, archive, max_workers=None, progress=None):
+    """
+    Render PDF reports for many patients into a ZIP archive
+
+    Args:
+        patients (list): patient_data dicts (as taken by SummaryAgent.run)
+        archive: Output path or writable binary file object
+        max_workers (int, optional): Worker processes (CPU count by default)
+        progress (callable, optional): Called as progress(done, total, file_name)
+            after each report is written or fails
+
+    Returns:
+        dict: 'exported' (file names written) and 'failed' (file name -> error message);
+            file names are unique per archive (see report_file_names)
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    patients = list(patients)
+    file_names = report_file_names(patients)
+    total = len(patients)
+    exported = []
+    failed = {}
+
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file, \
+            ProcessPoolExecutor(max_workers=max_workers,
+                                mp_context=multiprocessing.get_context(WORKER_START_METHOD)) as executor:
+        remaining = iter(zip(file_names, patients))
+        pending = {}
+
+        def submit_next():
+            item = next(remaining, None)
+            if item is not None:
+                file_name, patient_data = item
+                future = executor.submit(render_patient_report, patient_data)
+                pending[future] = file_name
+
+        for _ in range(max_workers * TASKS_PER_WORKER):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_name = pending.pop(future)
+                try:
+                    zip_file.writestr(file_name, future.result())
+                    exported.append(file_name)
+                except Exception as e:
+                    failed[file_name] = str(e)
+
+                if progress:
+                    progress(len(exported) + len(failed), total, file_name)
+                submit_next()
+
+    return {'exported': exported, 'failed': failed}
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Export PDF summary reports for many patients into a ZIP archive")
+    parser.add_argument('patients', help="JSON file with a list of patient_data dicts")
+    parser.add_argument('archive', help="Output ZIP path")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    with open(args.patients) as f:
+        patients = json.load(f)
+
+    def report_progress(done, total, file_name):
+        print(f"[{done}/{total}] {file_name}")
+
+    result = export_reports(patients, args.archive, args.workers, report_progress)
+    print(f"Exported {len(result['exported'])} reports to {args.archive}")
+    for file_name, error in result['failed'].items():
+        print(f"Failed: {file_name}: {error}")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Report Service - Cached PDF patient summary reports
+
+Rendered PDFs are cached under a hash of exactly the content they show, so a
+report for unchanged patient data and AI summary is served without running
+ReportLab again. Reports are rendered into spooled temporary files, which
+stay in memory while small and move to disk once they grow large.
+"""
+
+import tempfile
+import threading
+from collections import OrderedDict
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from agents.agent_cache import context_fingerprint
+
+# Rendered reports kept in the cache
+MAX_CACHED_REPORTS = 64
+
+# Reports larger than this many bytes are spooled to disk instead of memory
+REPORT_SPOOL_SIZE = 4 * 1024 * 1024
+
+_styles = None
+_styles_lock = threading.Lock()
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_report_styles():
+    """Get the paragraph and table styles shared by every report, building them once per process"""
+    global _styles
+
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                sample = getSampleStyleSheet()
+                _styles = {
+                    'title': ParagraphStyle(
+                        'CustomTitle',
+                        parent=sample['Heading1'],
+                        fontSize=18,
+                        spaceAfter=30,
+                        textColor=colors.HexColor('#059669')
+                    ),
+                    'heading': sample['Heading2'],
+                    'normal': sample['Normal'],
+                    'info_table': TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+                        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                        ('FONTSIZE', (0, 0), (-1, -1), 10),
+                        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                    ]),
+                    'medication_table': TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                        ('FONTSIZE', (0, 0), (-1, 0), 12),
+                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                    ])
+                }
+    return _styles
+
+
+def report_content(patient_data, ai_summary):
+    """Get exactly the fields a patient report shows"""
+    patient_info = patient_data['patient_info']
+    return {
+        'patient_info': {
+            field: patient_info[field]
+            for field in ['name', 'patient_id', 'age', 'gender', 'primary_condition', 'report_date']
+        },
+        'summary': ai_summary['summary'],
+        'recommendations': list(ai_summary['recommendations']),
+        'medications': [
+            {field: med[field] for field in ['name', 'dosage', 'frequency']}
+            for med in patient_data['medications']
+        ]
+    }
+
+
+def render_report(content, output):
+    """
+    Render a patient summary PDF
+
+    Args:
+        content (dict): Report fields from report_content
+        output: Writable binary file object the PDF is written to
+    """
+    styles = get_report_styles()
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    story = []
+
+    # Title
+    story.append(Paragraph("MediAI Guardian 3.0 - Patient Summary Report", styles['title']))
+    story.append(Spacer(1, 12))
+
+    # Patient Info
+    story.append(Paragraph("Patient Information", styles['heading']))
+    patient_info = content['patient_info']
+    info_data = [
+        ['Patient Name:', patient_info['name']],
+        ['Patient ID:', patient_info['patient_id']],
+        ['Age:', str(patient_info['age'])],
+        ['Gender:', patient_info['gender']],
+        ['Primary Condition:', patient_info['primary_condition']],
+        ['Report Date:', patient_info['report_date']]
+    ]
+
+    info_table = Table(info_data, colWidths=[2*inch, 3*inch])
+    info_table.setStyle(styles['info_table'])
+    story.append(info_table)
+    story.append(Spacer(1, 12))
+
+    # AI Summary
+    story.append(Paragraph("AI Analysis Summary", styles['heading']))
+    story.append(Paragraph(content['summary'], styles['normal']))
+    story.append(Spacer(1, 12))
+
+    # Recommendations
+    story.append(Paragraph("AI Recommendations", styles['heading']))
+    for rec in content['recommendations']:
+        story.append(Paragraph(f"• {rec}", styles['normal']))
+    story.append(Spacer(1, 12))
+
+    # Current Medications
+    story.append(Paragraph("Current Medications", styles['heading']))
+    med_data = [['Medication', 'Dosage', 'Frequency']]
+    for med in content['medications']:
+        med_data.append([med['name'], med['dosage'], med['frequency']])
+
+    med_table = Table(med_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
+    med_table.setStyle(styles['medication_table'])
+    story.append(med_table)
+
+    doc.build(story)
+
+
+def get_report_service():
+    """Get the shared ReportService, creating it on first use"""
+    global _service
+
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ReportService()
+    return _service
+
+
+class ReportService:
+    """LRU cache of rendered patient summary PDFs"""
+
+    def __init__(self, max_entries=MAX_CACHED_REPORTS, spool_size=REPORT_SPOOL_SIZE):
+        """
+        Args:
+            max_entries (int): Rendered reports kept
+            spool_size (int): Bytes a report may use in memory before spilling to disk
+        """
+        self.max_entries = max_entries
+        self.spool_size = spool_size
+        self.hits = 0
+        self.misses = 0
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_pdf(self, patient_data, ai_summary):
+        """
+        Get a patient summary PDF, rendering it only if not cached
+
+        Returns:
+            bytes: The PDF document
+        """
+        content = report_content(patient_data, ai_summary)
+        key = context_fingerprint(content)
+
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+                self.hits += 1
+                report.seek(0)
+                return report.read()
+            self.misses += 1
+
+        report = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        render_report(content, report)
+
+        with self._lock:
+            self._reports[key] = report
+            while len(self._reports) > self.max_entries:
+                _, evicted = self._reports.popitem(last=False)
+                evicted.close()
+            report.seek(0)
+            return report.read()
@@ -0,0 +1,34 @@
+"""
+Report Worker - Renders one patient's PDF summary in a report export worker process
+
+Export workers are started with the 'spawn' method, so each one imports this
+module fresh; it imports only what rendering a report needs.
+"""
+
+import io
+
+from agents.report_service import report_content, render_report
+from agents.summary_agent import SummaryAgent
+
+_summary_agent = None
+
+
+def render_patient_report(patient_data):
+    """
+    Generate one patient's AI summary and render it as a PDF
+
+    Returns:
+        bytes: PDF document
+    """
+    global _summary_agent
+
+    if _summary_agent is None:
+        _summary_agent = SummaryAgent()
+
+    ai_summary = _summary_agent.run(patient_data)
+    if 'error' in ai_summary:
+        raise RuntimeError(ai_summary['error'])
+
+    output = io.BytesIO()
+    render_report(report_content(patient_data, ai_summary), output)
+    return output.getvalue()
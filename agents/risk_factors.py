@@ -0,0 +1,101 @@
+"""
+Risk Factors - Deduplicated, bounded, decaying set of a digital twin's risk factors
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+
+# Risk factors retained per twin
+MAX_RISK_FACTORS = 32
+
+# A risk factor not seen again for this long is dropped
+DEFAULT_RISK_FACTOR_DECAY = timedelta(hours=24)
+
+
+class RiskFactor:
+    """How often and when one risk factor was seen"""
+
+    __slots__ = ('count', 'first_seen', 'last_seen')
+
+    def __init__(self, seen_at):
+        self.count = 0
+        self.first_seen = seen_at
+        self.last_seen = seen_at
+
+
+class RiskFactorSet:
+    """
+    Risk factors keyed by name, each counted and timestamped
+
+    Entries are kept in last-seen order, so adding, removing, expiring and
+    evicting are all O(1) per entry. Adding must follow time order, as twin
+    events do. Once `max_size` is reached the least recently seen factor is
+    evicted, and factors not seen for `decay` are expired as time advances.
+    """
+
+    __slots__ = ('max_size', 'decay', '_entries')
+
+    def __init__(self, max_size=MAX_RISK_FACTORS, decay=DEFAULT_RISK_FACTOR_DECAY):
+        """
+        Args:
+            max_size (int): Risk factors retained
+            decay (timedelta, optional): Time after which an unseen factor is dropped (None to keep)
+        """
+        self.max_size = max_size
+        self.decay = decay
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def add(self, name, seen_at):
+        """Record that a risk factor was seen"""
+        entry = self._entries.pop(name, None) or RiskFactor(seen_at)
+        entry.count += 1
+        entry.last_seen = seen_at
+        self._entries[name] = entry
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, name):
+        """Remove a risk factor if present"""
+        self._entries.pop(name, None)
+
+    def discard_prefix(self, prefix):
+        """Remove every risk factor whose name starts with prefix"""
+        for name in [name for name in self._entries if name.startswith(prefix)]:
+            del self._entries[name]
+
+    def expire(self, now):
+        """Drop risk factors not seen within the decay period before now"""
+        if self.decay is None:
+            return
+        cutoff = now - self.decay
+        while self._entries:
+            name, entry = next(iter(self._entries.items()))
+            if entry.last_seen >= cutoff:
+                break
+            del self._entries[name]
+
+    def names(self):
+        """Get the risk factor names, least recently seen first"""
+        return list(self._entries)
+
+    def details(self):
+        """Get each risk factor's name, count and first/last seen times"""
+        return [
+            {
+                'name': name,
+                'count': entry.count,
+                'first_seen': entry.first_seen,
+                'last_seen': entry.last_seen
+            }
+            for name, entry in self._entries.items()
+        ]
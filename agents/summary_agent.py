@@ -2,13 +2,68 @@
 Summary Agent - Generates comprehensive patient summaries and reports
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import copy
 import json
+import threading
+
+import numpy as np
+
+from agents.agent_cache import context_fingerprint
+from agents.vitals_stats import VitalsStatistics
+
+# Columns read by assess_population_risk
+POPULATION_COLUMNS = [
+    'twin_risk',
+    'heart_rate',
+    'bp_sys',
+    'o2_sat',
+    'high_risk_interactions',
+    'medium_risk_interactions',
+    'active_emergencies'
+]
+
+# Bit order of the population risk flags bitmask
+POPULATION_RISK_FLAGS = [
+    'high_twin_risk',
+    'moderate_twin_risk',
+    'hypertension',
+    'tachycardia',
+    'low_oxygen',
+    'high_risk_interactions',
+    'medium_risk_interactions',
+    'active_emergencies'
+]
+
+
+# Summary sections and the inputs each one depends on (see _summary_inputs)
+SUMMARY_SECTIONS = {
+    'summary_body': ['recent_vitals', 'medications', 'drug_interactions', 'emergency_events', 'digital_twin_risk'],
+    'recommendations': ['latest_vitals', 'drug_interactions', 'emergency_events', 'digital_twin_risk'],
+    'risk_assessment': ['latest_vitals', 'drug_interactions', 'emergency_events', 'digital_twin_risk'],
+    'key_metrics': ['vitals_history_ends'],
+    'medication_analysis': ['medications', 'drug_interactions'],
+    'emergency_summary': ['emergency_events']
+}
+
+# Patients whose summary sections are cached
+MAX_CACHED_PATIENTS = 1000
+
+
+def population_flags_from_mask(mask):
+    """Get the population risk flag names encoded in a bitmask"""
+    return [flag for bit, flag in enumerate(POPULATION_RISK_FLAGS) if int(mask) & (1 << bit)]
+
 
 class SummaryAgent:
     def __init__(self):
         self.name = "SummaryAgent"
         self.version = "1.0"
+        
+        # Patient id -> section name -> (input fingerprint, section)
+        self._section_cache = OrderedDict()
+        self._section_cache_lock = threading.Lock()
     
     def run(self, patient_data):
         """
@@ -31,7 +86,15 @@ class SummaryAgent:
             }
     
     def _generate_comprehensive_summary(self, patient_data):
-        """Generate detailed patient summary"""
+        """
+        Generate detailed patient summary
+        
+        Each section is cached per patient with a fingerprint of the inputs
+        it depends on (SUMMARY_SECTIONS), and only sections whose inputs
+        changed since the last summary are rebuilt. When patient_data carries
+        a 'vitals_stream' (VitalsStream), key metrics are read from its
+        running statistics instead of the vitals history.
+        """
         
         # Extract patient information
         patient_info = patient_data.get('patient_info', {})
@@ -40,41 +103,127 @@ class SummaryAgent:
         drug_interactions = patient_data.get('drug_interactions', [])
         emergency_events = patient_data.get('emergency_events', [])
         digital_twin_risk = patient_data.get('digital_twin_risk', {})
+        vitals_stream = patient_data.get('vitals_stream')
         
         # Generate summary sections
-        summary_text = self._create_summary_text(
-            patient_info, vitals_history, medications, 
-            drug_interactions, emergency_events, digital_twin_risk
-        )
+        builders = {
+            'summary_body': lambda: self._create_summary_body(
+                vitals_history, medications, drug_interactions,
+                emergency_events, digital_twin_risk
+            ),
+            'recommendations': lambda: self._generate_recommendations(
+                vitals_history, medications, drug_interactions,
+                emergency_events, digital_twin_risk
+            ),
+            'risk_assessment': lambda: self._assess_overall_risk(
+                vitals_history, medications, drug_interactions,
+                emergency_events, digital_twin_risk
+            ),
+            'key_metrics': lambda: self._extract_key_metrics(vitals_history),
+            'medication_analysis': lambda: self._analyze_medications(medications, drug_interactions),
+            'emergency_summary': lambda: self._summarize_emergencies(emergency_events)
+        }
         
-        recommendations = self._generate_recommendations(
-            vitals_history, medications, drug_interactions, 
-            emergency_events, digital_twin_risk
-        )
+        if vitals_stream is not None:
+            # Running statistics are O(1) to read, so they are not cached
+            del builders['key_metrics']
         
-        risk_assessment = self._assess_overall_risk(
-            vitals_history, medications, drug_interactions, 
-            emergency_events, digital_twin_risk
-        )
+        patient_id = patient_info.get('patient_id', patient_data.get('patient_id'))
+        sections = self._build_sections(patient_id, self._summary_inputs(patient_data), builders)
+        if vitals_stream is not None:
+            sections['key_metrics'] = self._stream_key_metrics(vitals_stream)
+        
+        # The assessment time is per call, so it is kept out of the cached section
+        sections['risk_assessment']['assessment_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         return {
-            'summary': summary_text,
-            'recommendations': recommendations,
-            'risk_assessment': risk_assessment,
+            'summary': (self._create_summary_header(patient_info) + sections['summary_body']).strip(),
+            'recommendations': sections['recommendations'],
+            'risk_assessment': sections['risk_assessment'],
             'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'key_metrics': self._extract_key_metrics(vitals_history),
-            'medication_analysis': self._analyze_medications(medications, drug_interactions),
-            'emergency_summary': self._summarize_emergencies(emergency_events)
+            'key_metrics': sections['key_metrics'],
+            'medication_analysis': sections['medication_analysis'],
+            'emergency_summary': sections['emergency_summary']
+        }
+    
+    def _summary_inputs(self, patient_data):
+        """Get the inputs summary sections depend on"""
+        vitals_history = patient_data.get('vitals_history', [])
+        return {
+            'latest_vitals': vitals_history[:1],
+            'recent_vitals': vitals_history[:2],
+            # Key metrics read the whole history, but hashing every reading on
+            # each summary is O(n); readings are only added or dropped at the
+            # ends, so its length and end readings identify it
+            'vitals_history_ends': [len(vitals_history), vitals_history[:1], vitals_history[-1:]],
+            'medications': patient_data.get('medications', []),
+            'drug_interactions': patient_data.get('drug_interactions', []),
+            'emergency_events': patient_data.get('emergency_events', []),
+            'digital_twin_risk': patient_data.get('digital_twin_risk', {})
         }
     
+    def _build_sections(self, patient_id, inputs, builders):
+        """
+        Build each section, reusing the patient's cached sections whose inputs are unchanged
+        
+        Without a patient id there is nothing to key the cache on, so every
+        section is built afresh.
+        """
+        if patient_id is None:
+            return {name: builder() for name, builder in builders.items()}
+        
+        with self._section_cache_lock:
+            cache = self._section_cache.pop(patient_id, None) or {}
+            self._section_cache[patient_id] = cache
+            while len(self._section_cache) > MAX_CACHED_PATIENTS:
+                self._section_cache.popitem(last=False)
+        
+        sections = {}
+        for name, builder in builders.items():
+            fingerprint = context_fingerprint(inputs, SUMMARY_SECTIONS[name])
+            cached = cache.get(name)
+            if cached is None or cached[0] != fingerprint:
+                cached = (fingerprint, builder())
+                cache[name] = cached
+            
+            # Callers get their own copy so the cached section cannot be modified
+            sections[name] = copy.deepcopy(cached[1])
+        return sections
+    
+    def clear_cache(self, patient_id=None):
+        """Drop cached summary sections for one patient, or for all patients if None"""
+        with self._section_cache_lock:
+            if patient_id is None:
+                self._section_cache.clear()
+            else:
+                self._section_cache.pop(patient_id, None)
+    
     def _create_summary_text(self, patient_info, vitals_history, medications, 
                            drug_interactions, emergency_events, digital_twin_risk):
         """Create comprehensive summary text"""
-        
+        summary = self._create_summary_header(patient_info) + self._create_summary_body(
+            vitals_history, medications, drug_interactions, emergency_events, digital_twin_risk
+        )
+        return summary.strip()
+    
+    def _create_summary_header(self, patient_info):
+        """Create the summary text header (regenerated every time for the report timestamp)"""
         name = patient_info.get('name', 'Patient')
         age = patient_info.get('age', 'Unknown')
         condition = patient_info.get('primary_condition', 'Not specified')
         
+        return f"""
+PATIENT SUMMARY REPORT
+
+Patient: {name}, Age {age}
+Primary Condition: {condition}
+Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+"""
+    
+    def _create_summary_body(self, vitals_history, medications, drug_interactions,
+                             emergency_events, digital_twin_risk):
+        """Create the summary text after the header"""
+        
         # Vitals analysis
         if vitals_history:
             latest_vitals = vitals_history[0]
@@ -94,12 +243,6 @@ class SummaryAgent:
         current_risk = digital_twin_risk.get('current_state', 'Unknown')
         
         summary = f"""
-PATIENT SUMMARY REPORT
-
-Patient: {name}, Age {age}
-Primary Condition: {condition}
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
 CURRENT STATUS:
 The patient's digital twin indicates a {current_risk} status. {vitals_trend}
 
@@ -131,7 +274,7 @@ The patient is currently taking {med_count} medications. """
         
         summary += f"\n\nOVERALL ASSESSMENT:\n{self._generate_overall_assessment(digital_twin_risk, vitals_history, medications, emergency_events)}"
         
-        return summary.strip()
+        return summary
     
     def _analyze_vitals_trend(self, vitals_history):
         """Analyze trend in vital signs"""
@@ -272,8 +415,82 @@ The patient is currently taking {med_count} medications. """
         return {
             'overall_risk_level': overall_risk,
             'risk_score': risk_score,
-            'risk_factors': risk_factors,
-            'assessment_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'risk_factors': risk_factors
+        }
+    
+    def assess_population_risk(self, patients):
+        """
+        Score a whole panel of patients at once with vectorized operations
+        
+        Applies the same rules as the single-patient risk assessment to every
+        row. Missing vitals are skipped, as for a patient with no readings;
+        missing counts are 0.
+        
+        Args:
+            patients (pd.DataFrame or dict): Table or dict of column arrays, one
+                row per patient, with the POPULATION_COLUMNS:
+                - twin_risk: digital twin state ('High Risk', 'Mild Risk', ...)
+                - heart_rate, bp_sys, o2_sat: latest vitals
+                - high_risk_interactions, medium_risk_interactions: interaction counts
+                - active_emergencies: unresolved emergency count
+        
+        Returns:
+            dict: Per-patient numpy arrays
+                - risk_score: int
+                - risk_level: str ('Low', 'Moderate' or 'High')
+                - risk_flags: uint8 bitmask (see POPULATION_RISK_FLAGS / population_flags_from_mask)
+                - triage_order: row indices, highest risk score first
+        """
+        n = len(next(iter(patients.values()), [])) if isinstance(patients, dict) else len(patients)
+        
+        def column(name, missing):
+            if name not in patients:
+                return np.full(n, missing, dtype=float)
+            return np.asarray(patients[name], dtype=float)
+        
+        if 'twin_risk' in patients:
+            twin_risk = np.asarray(patients['twin_risk'], dtype=object)
+        else:
+            twin_risk = np.full(n, '', dtype=object)
+        heart_rate = column('heart_rate', np.nan)
+        bp_sys = column('bp_sys', np.nan)
+        o2_sat = column('o2_sat', np.nan)
+        high_interactions = np.nan_to_num(column('high_risk_interactions', 0)).astype(np.int64)
+        medium_interactions = np.nan_to_num(column('medium_risk_interactions', 0)).astype(np.int64)
+        active_emergencies = np.nan_to_num(column('active_emergencies', 0)).astype(np.int64)
+        
+        # NaN compares False, so missing vitals add no risk
+        with np.errstate(invalid='ignore'):
+            flags = {
+                'high_twin_risk': twin_risk == 'High Risk',
+                'moderate_twin_risk': twin_risk == 'Mild Risk',
+                'hypertension': bp_sys > 140,
+                'tachycardia': heart_rate > 100,
+                'low_oxygen': o2_sat < 95,
+                'high_risk_interactions': high_interactions > 0,
+                'medium_risk_interactions': medium_interactions > 0,
+                'active_emergencies': active_emergencies > 0
+            }
+        
+        risk_score = (
+            30 * flags['high_twin_risk']
+            + 15 * flags['moderate_twin_risk']
+            + 10 * flags['hypertension']
+            + 8 * flags['tachycardia']
+            + 15 * flags['low_oxygen']
+            + 12 * high_interactions
+            + 20 * active_emergencies
+        ).astype(np.int64)
+        
+        risk_flags = np.zeros(n, dtype=np.uint8)
+        for flag, values in flags.items():
+            risk_flags |= values.astype(np.uint8) << POPULATION_RISK_FLAGS.index(flag)
+        
+        return {
+            'risk_score': risk_score,
+            'risk_level': np.select([risk_score >= 50, risk_score >= 25], ['High', 'Moderate'], 'Low'),
+            'risk_flags': risk_flags,
+            'triage_order': np.argsort(-risk_score, kind='stable')
         }
     
     def _extract_key_metrics(self, vitals_history):
@@ -281,19 +498,30 @@ The patient is currently taking {med_count} medications. """
         if not vitals_history:
             return {}
         
-        # Calculate averages and ranges
-        heart_rates = [v.get('heart_rate', 0) for v in vitals_history if v.get('heart_rate')]
-        bp_sys_values = [v.get('bp_sys', 0) for v in vitals_history if v.get('bp_sys')]
+        # Calculate averages and ranges in one pass with running statistics
+        statistics = VitalsStatistics(['heart_rate', 'bp_sys'])
+        for v in vitals_history:
+            # Missing and zero readings are skipped
+            statistics.update({field: v.get(field) or None for field in statistics.fields})
         
+        return self._key_metrics_from_statistics(statistics['heart_rate'], statistics['bp_sys'])
+    
+    def _stream_key_metrics(self, vitals_stream):
+        """Extract key metrics from a VitalsStream's running statistics"""
+        statistics = vitals_stream.statistics
+        return self._key_metrics_from_statistics(statistics['heart_rate'], statistics['blood_pressure_systolic'])
+    
+    def _key_metrics_from_statistics(self, heart_rate, bp_sys):
+        """Build key metrics from heart rate and systolic blood pressure RunningStats"""
         metrics = {}
         
-        if heart_rates:
-            metrics['avg_heart_rate'] = sum(heart_rates) / len(heart_rates)
-            metrics['hr_range'] = f"{min(heart_rates)}-{max(heart_rates)}"
+        if heart_rate.count:
+            metrics['avg_heart_rate'] = heart_rate.mean
+            metrics['hr_range'] = f"{heart_rate.min}-{heart_rate.max}"
         
-        if bp_sys_values:
-            metrics['avg_systolic_bp'] = sum(bp_sys_values) / len(bp_sys_values)
-            metrics['bp_range'] = f"{min(bp_sys_values)}-{max(bp_sys_values)}"
+        if bp_sys.count:
+            metrics['avg_systolic_bp'] = bp_sys.mean
+            metrics['bp_range'] = f"{bp_sys.min}-{bp_sys.max}"
         
         return metrics
     
@@ -0,0 +1,348 @@
+"""
+Twin Events - Time-ordered digital twin event log with periodic state snapshots
+
+Every event a twin applies is recorded here. Snapshots of the twin state are
+taken every `snapshot_interval` events, so the state at any recorded time is
+rebuilt by replaying only the events after the nearest earlier snapshot.
+Once more than `max_snapshots` snapshots exist, or the retained events and
+snapshots exceed `max_bytes` (serialized size, see `nbytes`), the oldest
+snapshot and the events before the next one are dropped, keeping memory
+bounded.
+
+Events arriving late are inserted in time order and invalidate the snapshots
+taken after them; the owner rebuilds its state from the nearest earlier
+snapshot (see DigitalTwinAgent). Batches that go after the recorded events
+are recorded in bulk with extend(), and the part of a long batch that
+retention would drop anyway can be skipped (see unretained_count and skip).
+"""
+
+import copy
+import pickle
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+
+# Event types a twin understands, in type-code order
+EVENT_TYPES = (
+    'vitals_update',
+    'medicine_intake',
+    'drug_interaction',
+    'emergency',
+    'emergency_resolved'
+)
+
+_EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+# Events between state snapshots
+DEFAULT_SNAPSHOT_INTERVAL = 100
+
+# Snapshots retained (history covers about max_snapshots * snapshot_interval events)
+DEFAULT_MAX_SNAPSHOTS = 50
+
+# Serialized bytes of events and snapshots retained per twin (~1700 vitals updates).
+# This bounds history, not what a twin can ingest: a year of minute readings
+# (525,600 events) backfilled into a twin still updates its state, but only
+# about the last day of it can be replayed with state_at afterwards.
+DEFAULT_MAX_BYTES = 256 * 1024
+
+# Bytes per event held in the typed arrays (timestamp, type code, payload size)
+_EVENT_ARRAY_BYTES = 8 + 1 + 4
+
+
+def serialized_size(obj):
+    """Estimate an object's memory use by its pickled size"""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class TwinEventLog:
+    """
+    Compact event history of one digital twin
+
+    Timestamps (epoch seconds), event type codes and payload sizes are stored
+    in typed arrays; only the event payloads are Python objects. Event
+    positions are absolute, counting events already dropped from the front.
+    Payload sizes are estimated per event type from a sampled payload,
+    re-sampled whenever a snapshot is taken, rather than measured per event.
+    """
+
+    def __init__(self, initial_state, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL, max_snapshots=DEFAULT_MAX_SNAPSHOTS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            initial_state (dict): Twin state before the first event
+            snapshot_interval (int): Events between state snapshots
+            max_snapshots (int): Snapshots retained
+            max_bytes (int): Serialized bytes of events and snapshots retained
+                (checked whenever a snapshot is taken; the latest snapshot and
+                the events after it are always kept)
+        """
+        if snapshot_interval <= 0 or max_snapshots <= 0 or max_bytes <= 0:
+            raise ValueError("snapshot_interval, max_snapshots and max_bytes must be positive")
+
+        self.snapshot_interval = snapshot_interval
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        self._timestamps = array('d')
+        self._types = array('B')
+        self._sizes = array('I')
+        self._payloads = []
+        self._dropped = 0
+        # Event type code -> estimated serialized payload size
+        self._type_sizes = {}
+
+        # (event position, timestamp, state dict, size) with the state after that many
+        # events; the initial state holds for any time before the first event
+        state = copy.deepcopy(initial_state)
+        self._snapshots = [(0, float('-inf'), state, serialized_size(state))]
+        self.nbytes = self._snapshots[0][3]
+
+    def __len__(self):
+        """Total events ever recorded, including dropped ones"""
+        return self._dropped + len(self._payloads)
+
+    @property
+    def earliest_time(self):
+        """Epoch time of the oldest state that can still be rebuilt"""
+        return self._snapshots[0][1]
+
+    @property
+    def latest_time(self):
+        """Epoch time of the most recent event (or snapshot if no events are retained)"""
+        return self._timestamps[-1] if self._timestamps else self._snapshots[-1][1]
+
+    def is_late(self, timestamp):
+        """Check whether an event at a time would go before already recorded events"""
+        return timestamp.timestamp() < self.latest_time
+
+    def append(self, timestamp, event_type, event_data):
+        """
+        Record an applied event
+
+        A late event is inserted after the recorded events at or before its
+        time, and the snapshots taken after that point are discarded. Events
+        older than the retained history are clamped to its start.
+
+        Args:
+            timestamp (datetime): When the event happened
+            event_type (str): One of EVENT_TYPES
+            event_data (dict): Event payload
+
+        Returns:
+            int: Absolute position the event was recorded at
+        """
+        when = max(timestamp.timestamp(), self.earliest_time)
+        offset = bisect_right(self._timestamps, when)
+        code = _EVENT_CODES[event_type]
+        size = self._type_sizes.get(code)
+        if size is None:
+            size = self._type_sizes[code] = serialized_size(event_data)
+
+        self._timestamps.insert(offset, when)
+        self._types.insert(offset, code)
+        self._sizes.insert(offset, size)
+        self._payloads.insert(offset, event_data)
+        self.nbytes += size + _EVENT_ARRAY_BYTES
+
+        position = self._dropped + offset
+        self._discard_snapshots_after(position)
+        return position
+
+    def extend(self, events):
+        """
+        Record a batch of applied events at the end of the history
+
+        Unlike append, nothing is searched or inserted per event and no
+        snapshots are discarded, so the events must be in time order and none
+        may be earlier than the latest recorded one (events older than the
+        retained history are clamped to its start, as with append).
+
+        Args:
+            events (list): Tuples starting with (datetime, event_type, event_data)
+        """
+        codes = [_EVENT_CODES[event[1]] for event in events]
+        for code in set(codes).difference(self._type_sizes):
+            self._type_sizes[code] = serialized_size(events[codes.index(code)][2])
+        sizes = [self._type_sizes[code] for code in codes]
+
+        earliest = self.earliest_time
+        self._timestamps.extend([max(event[0].timestamp(), earliest) for event in events])
+        self._types.extend(codes)
+        self._sizes.extend(sizes)
+        self._payloads.extend([event[2] for event in events])
+        self.nbytes += sum(sizes) + len(events) * _EVENT_ARRAY_BYTES
+
+    def unretained_count(self, events):
+        """
+        Estimate how many leading events of a batch retention would drop anyway
+
+        The batch goes after the recorded events (as with extend). The count
+        ends on a snapshot boundary and leaves at least max_snapshots intervals,
+        or max_bytes of estimated events and snapshots, plus some slack for
+        the estimate, to be recorded as usual.
+
+        Args:
+            events (list): Tuples starting with (datetime, event_type, event_data), in time order
+
+        Returns:
+            int: Number of leading events that can be skipped (see skip)
+        """
+        snapshot_size = self._snapshots[-1][3]
+        kept_bytes = 0
+        kept = 0
+        for event in reversed(events):
+            if kept >= self.max_snapshots * self.snapshot_interval or kept_bytes > self.max_bytes:
+                break
+            code = _EVENT_CODES[event[1]]
+            size = self._type_sizes.get(code)
+            if size is None:
+                size = self._type_sizes[code] = serialized_size(event[2])
+            kept_bytes += size + _EVENT_ARRAY_BYTES
+            kept += 1
+            if kept % self.snapshot_interval == 0:
+                kept_bytes += snapshot_size
+
+        first_boundary = max(1, self.events_until_snapshot())
+        last_boundary = len(events) - kept - 2 * self.snapshot_interval
+        if last_boundary < first_boundary:
+            return 0
+        return last_boundary - (last_boundary - first_boundary) % self.snapshot_interval
+
+    def skip(self, count, timestamp, state):
+        """
+        Restart the history after events that were applied but not recorded
+
+        Every retained event and snapshot is dropped; the state after the
+        skipped events becomes the only snapshot.
+
+        Args:
+            count (int): Events applied after the recorded ones
+            timestamp (datetime): Time of the last skipped event
+            state (dict): Twin state after the skipped events (deep-copied)
+        """
+        self._dropped = len(self) + count
+        del self._timestamps[:]
+        del self._types[:]
+        del self._sizes[:]
+        del self._payloads[:]
+
+        state = copy.deepcopy(state)
+        size = serialized_size(state)
+        self._snapshots = [(self._dropped, timestamp.timestamp(), state, size)]
+        self.nbytes = size
+
+    def events_until_snapshot(self):
+        """Number of events to record before the next snapshot is due"""
+        return self.snapshot_interval - (len(self) - self._snapshots[-1][0])
+
+    def snapshot_due(self):
+        """Check whether a snapshot should be taken after the latest event"""
+        return self.events_until_snapshot() <= 0
+
+    def add_snapshot(self, state):
+        """
+        Store the state after the latest event
+
+        Args:
+            state (dict): Twin state (deep-copied, so later changes do not leak in)
+        """
+        state = copy.deepcopy(state)
+        size = serialized_size(state)
+        self._snapshots.append((len(self), self.latest_time, state, size))
+        self.nbytes += size
+
+        # Refresh the size estimate of the latest event's type
+        if self._payloads:
+            self._type_sizes[self._types[-1]] = serialized_size(self._payloads[-1])
+
+        while len(self._snapshots) > 1 and (
+                len(self._snapshots) > self.max_snapshots or self.nbytes > self.max_bytes):
+            self._drop_oldest_snapshot()
+
+    def replay_from(self, timestamp):
+        """
+        Find what to replay to merge events from a time into the history
+
+        Args:
+            timestamp (datetime): Time of the earliest event to merge
+
+        Returns:
+            tuple: (absolute position of the nearest snapshot the events go after,
+                snapshot state dict, list of (datetime, event_type, event_data)
+                recorded after the snapshot)
+        """
+        end = self._dropped + bisect_right(self._timestamps, max(timestamp.timestamp(), self.earliest_time))
+        position, _, state = self._snapshot_at(end)
+        return position, copy.deepcopy(state), self._event_tuples(position - self._dropped, len(self._payloads))
+
+    def truncate(self, position):
+        """Drop the events after an absolute position and the snapshots taken after them"""
+        offset = position - self._dropped
+        if offset < 0:
+            raise ValueError("Cannot truncate before the retained history")
+
+        self.nbytes -= sum(self._sizes[offset:]) + (len(self._payloads) - offset) * _EVENT_ARRAY_BYTES
+        del self._timestamps[offset:]
+        del self._types[offset:]
+        del self._sizes[offset:]
+        del self._payloads[offset:]
+        self._discard_snapshots_after(position)
+
+    def _discard_snapshots_after(self, position):
+        """Drop snapshots of states after more than `position` events"""
+        while self._snapshots[-1][0] > position:
+            self.nbytes -= self._snapshots.pop()[3]
+
+    def _drop_oldest_snapshot(self):
+        """Drop the oldest snapshot and the events only it could replay from"""
+        self.nbytes -= self._snapshots.pop(0)[3]
+        drop = self._snapshots[0][0] - self._dropped
+        self.nbytes -= sum(self._sizes[:drop]) + drop * _EVENT_ARRAY_BYTES
+        del self._timestamps[:drop]
+        del self._types[:drop]
+        del self._sizes[:drop]
+        del self._payloads[:drop]
+        self._dropped += drop
+
+    def _snapshot_at(self, end):
+        """Get the (position, timestamp, state) of the latest snapshot after at most `end` events"""
+        snapshot_positions = [snapshot[0] for snapshot in self._snapshots]
+        return self._snapshots[bisect_right(snapshot_positions, end) - 1][:3]
+
+    def replay_plan(self, when):
+        """
+        Find what to replay to rebuild the state at a time
+
+        Args:
+            when (datetime): Point in time
+
+        Returns:
+            tuple: (snapshot state dict, list of (datetime, event_type, event_data))
+                or None if the time is before the retained history
+        """
+        when = when.timestamp()
+        if when < self.earliest_time:
+            return None
+
+        # Events recorded at or before `when`, as an absolute position
+        end = self._dropped + bisect_right(self._timestamps, when)
+
+        position, _, state = self._snapshot_at(end)
+
+        return copy.deepcopy(state), self._event_tuples(position - self._dropped, end - self._dropped)
+
+    def events(self, since=None):
+        """
+        Get retained events as (datetime, event_type, event_data) tuples
+
+        Args:
+            since (datetime, optional): Only events after this time
+        """
+        start = 0 if since is None else bisect_right(self._timestamps, since.timestamp())
+        return self._event_tuples(start, len(self._payloads))
+
+    def _event_tuples(self, start, end):
+        """Get (timestamp, event_type, event_data) tuples for retained event offsets"""
+        return [
+            (datetime.fromtimestamp(self._timestamps[i]), EVENT_TYPES[self._types[i]], self._payloads[i])
+            for i in range(start, end)
+        ]
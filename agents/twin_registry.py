@@ -0,0 +1,215 @@
+"""
+Twin Registry - One DigitalTwinAgent per patient, shared by every page of a server process
+
+Twins are created on first use and kept in memory up to a resident count and
+a memory budget. Beyond either, the least recently used idle twins are
+written to disk and loaded back transparently when their patient is next
+seen. Updates to a
+twin are serialized by a lock stripe chosen from its patient id, so
+different patients update concurrently without one global lock.
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from urllib.parse import quote
+
+from agents.digital_twin_agent import DigitalTwinAgent, TwinState
+
+# Twins kept in memory before idle ones are spilled to disk
+DEFAULT_MAX_RESIDENT = 5000
+
+# Estimated bytes of twin history kept in memory before idle twins are spilled.
+# Sizes are serialized sizes (DigitalTwinAgent.nbytes); live objects take about
+# twice that, so the default keeps resident twins near 512 MB. Each twin's
+# history is capped at twin_events.DEFAULT_MAX_BYTES (256 KB), so at least
+# ~1000 twins with full histories stay resident.
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Number of locks patients are striped across
+DEFAULT_LOCK_STRIPES = 64
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_twin_registry():
+    """Get the shared TwinRegistry, creating it on first use"""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TwinRegistry()
+    return _registry
+
+
+class TwinRegistry:
+    """
+    Registry of per-patient digital twins with LRU spill to disk
+
+    Use run() to update a twin: it holds the patient's lock stripe for the
+    whole update, and a twin is never spilled while its stripe is held.
+    """
+
+    def __init__(self, max_resident=DEFAULT_MAX_RESIDENT, spill_dir=None, lock_stripes=DEFAULT_LOCK_STRIPES,
+                 memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Args:
+            max_resident (int): Twins kept in memory
+            spill_dir (str, optional): Directory for spilled twins (a temporary directory by default)
+            lock_stripes (int): Number of update locks patients are spread across
+            memory_budget (int): Estimated bytes of twins kept in memory (checked
+                whenever a twin is created or loaded)
+        """
+        if max_resident <= 0 or memory_budget <= 0:
+            raise ValueError("max_resident and memory_budget must be positive")
+
+        self.max_resident = max_resident
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self._twins = OrderedDict()
+        self._spilled = set()
+        # Bytes counted for each resident twin, and their running total
+        self._twin_bytes = {}
+        self.resident_bytes = 0
+        self._lock = threading.Lock()
+        self._stripes = [threading.RLock() for _ in range(lock_stripes)]
+
+    def __len__(self):
+        """Number of twins in memory"""
+        return len(self._twins)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._twins or patient_id in self._spilled
+
+    def patient_ids(self):
+        """Get the ids of every known patient, in memory or spilled"""
+        with self._lock:
+            return list(self._twins) + [pid for pid in self._spilled if pid not in self._twins]
+
+    def get(self, patient_id):
+        """
+        Get a patient's twin, creating it or loading it from disk as needed
+
+        The returned twin is safe to read; make changes through run().
+        """
+        with self._lock:
+            twin = self._twins.get(patient_id)
+            if twin is not None:
+                self._twins.move_to_end(patient_id)
+                return twin
+
+            if patient_id in self._spilled:
+                twin = self._load(patient_id)
+                self._spilled.discard(patient_id)
+            else:
+                twin = DigitalTwinAgent(patient_id)
+
+            self._twins[patient_id] = twin
+            self._twin_bytes[patient_id] = twin.nbytes
+            self.resident_bytes += twin.nbytes
+            self._evict_idle(keep=patient_id)
+            return twin
+
+    def run(self, patient_id, event_type, event_data):
+        """
+        Apply an event to a patient's twin (see DigitalTwinAgent.run)
+
+        Returns:
+            dict: Updated digital twin state
+        """
+        with self._stripe(patient_id):
+            twin = self.get(patient_id)
+            try:
+                return twin.run(event_type, event_data)
+            finally:
+                self._recount(patient_id, twin)
+
+    def apply_events(self, patient_id, events):
+        """Apply a batch of events to a patient's twin (see DigitalTwinAgent.apply_events)"""
+        with self._stripe(patient_id):
+            twin = self.get(patient_id)
+            try:
+                return twin.apply_events(events)
+            finally:
+                self._recount(patient_id, twin)
+
+    def state_at(self, patient_id, when):
+        """Rebuild a patient's twin state at a point in time (see DigitalTwinAgent.state_at)"""
+        with self._stripe(patient_id):
+            return self.get(patient_id).state_at(when)
+
+    def get_risk_assessment(self, patient_id):
+        """Get a patient's detailed risk assessment"""
+        with self._stripe(patient_id):
+            return self.get(patient_id).get_risk_assessment()
+
+    def remove(self, patient_id):
+        """Forget a patient's twin entirely"""
+        with self._stripe(patient_id), self._lock:
+            self._twins.pop(patient_id, None)
+            self.resident_bytes -= self._twin_bytes.pop(patient_id, 0)
+            if patient_id in self._spilled:
+                self._spilled.discard(patient_id)
+                os.remove(self._spill_path(patient_id))
+
+    def _stripe(self, patient_id):
+        """Get the update lock for a patient"""
+        return self._stripes[zlib.crc32(str(patient_id).encode('utf-8')) % len(self._stripes)]
+
+    def _recount(self, patient_id, twin):
+        """Bring resident_bytes up to date after a twin's history changed (its stripe held)"""
+        with self._lock:
+            if self._twins.get(patient_id) is twin:
+                nbytes = twin.nbytes
+                self.resident_bytes += nbytes - self._twin_bytes[patient_id]
+                self._twin_bytes[patient_id] = nbytes
+
+    def _evict_idle(self, keep):
+        """Spill least recently used twins until under the resident limits (registry lock held)"""
+        busy = []
+        while (len(self._twins) + len(busy) > self.max_resident or self.resident_bytes > self.memory_budget) \
+                and next(iter(self._twins)) != keep:
+            patient_id, twin = self._twins.popitem(last=False)
+            stripe = self._stripe(patient_id)
+
+            # A twin whose stripe is held may be mid-update, so it is not idle
+            if not stripe.acquire(blocking=False):
+                busy.append((patient_id, twin))
+                continue
+            try:
+                self._save(twin)
+                self._spilled.add(patient_id)
+                self.resident_bytes -= self._twin_bytes.pop(patient_id)
+            finally:
+                stripe.release()
+
+        # Busy twins stay resident, ahead of the twin just used
+        for patient_id, twin in busy:
+            self._twins[patient_id] = twin
+        self._twins.move_to_end(keep)
+
+    def _spill_path(self, patient_id):
+        """File a spilled twin is stored in"""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='digital_twins_')
+        return os.path.join(self.spill_dir, quote(str(patient_id), safe='') + '.pkl')
+
+    def _save(self, twin):
+        """Write a twin's state and event history to disk"""
+        path = self._spill_path(twin.patient_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'state': twin.state.to_dict(), 'events': twin.events}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _load(self, patient_id):
+        """Read a spilled twin back from disk"""
+        path = self._spill_path(patient_id)
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+        os.remove(path)
+        return DigitalTwinAgent(patient_id, TwinState.from_dict(saved['state']), saved['events'])
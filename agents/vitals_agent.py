@@ -5,10 +5,48 @@ Vitals Agent - Analyzes patient vital signs and provides health status assessmen
 import random
 from datetime import datetime
 
+import numpy as np
+
+# Risk factors reported by VitalsAgent, in bitmask order (bit 0 first)
+RISK_FACTORS = ['bradycardia', 'tachycardia', 'hypertension', 'hypotension', 'fever', 'hypothermia', 'hypoxemia']
+
+# Risk factors that escalate a single abnormal reading to high risk
+SERIOUS_RISK_FACTORS = ['hypertension', 'tachycardia', 'hypoxemia']
+
+# Vital sign fields read by the analysis
+VITAL_FIELDS = ['heart_rate', 'blood_pressure_sys', 'blood_pressure_dia', 'temperature', 'oxygen_saturation']
+
+# Analysis field -> VitalsStream field
+STREAM_FIELD_NAMES = {
+    'heart_rate': 'heart_rate',
+    'blood_pressure_sys': 'blood_pressure_systolic',
+    'blood_pressure_dia': 'blood_pressure_diastolic',
+    'temperature': 'temperature',
+    'oxygen_saturation': 'oxygen_saturation'
+}
+
+
+def risk_factor_bit(risk_factor):
+    """Get the bitmask bit for a risk factor name"""
+    return 1 << RISK_FACTORS.index(risk_factor)
+
+
+def risk_factors_from_mask(mask):
+    """Get the risk factor names encoded in a bitmask"""
+    return [factor for bit, factor in enumerate(RISK_FACTORS) if int(mask) & (1 << bit)]
+
+
 class VitalsAgent:
-    def __init__(self):
+    def __init__(self, vitals_source=None):
+        """
+        Args:
+            vitals_source (iterable, optional): Reading dicts served by
+                get_current_vitals, e.g. VitalsSimulator.readings() or
+                replay_readings(); random readings are generated if None
+        """
         self.name = "VitalsAgent"
         self.version = "1.0"
+        self.vitals_source = iter(vitals_source) if vitals_source is not None else None
         
         # Normal ranges for vital signs
         self.normal_ranges = {
@@ -94,7 +132,7 @@ class VitalsAgent:
                 'risk_level': 'Low',
                 'risk_factors': []
             }
-        elif len(issues) == 1 and not any(rf in ['hypertension', 'tachycardia', 'hypoxemia'] for rf in risk_factors):
+        elif len(issues) == 1 and not any(rf in SERIOUS_RISK_FACTORS for rf in risk_factors):
             return {
                 'status': 'Mild Concern',
                 'reason': f'Minor deviation detected: {issues[0]}',
@@ -111,6 +149,112 @@ class VitalsAgent:
                 'risk_factors': risk_factors
             }
     
+    def analyze_batch(self, readings):
+        """
+        Analyze many vital sign readings at once with vectorized comparisons
+        
+        Applies the same rules as run() to every row. Missing fields count as 0,
+        as they do for a single reading.
+        
+        Args:
+            readings (pd.DataFrame, np.ndarray or dict): Table, structured
+                array or dict of column arrays with the same fields as run()
+        
+        Returns:
+            dict: Per-row numpy arrays
+                - status: str
+                - risk_level: str
+                - risk_factors: uint8 bitmask (see RISK_FACTORS / risk_factors_from_mask)
+                - issue_count: int
+        """
+        values = {field: self._batch_column(readings, field) for field in VITAL_FIELDS}
+        hr = values['heart_rate']
+        bp_sys = values['blood_pressure_sys']
+        bp_dia = values['blood_pressure_dia']
+        temp = values['temperature']
+        o2_sat = values['oxygen_saturation']
+        
+        hypertension = (bp_sys > 140) | (bp_dia > 90)
+        fever = temp > self.normal_ranges['temperature']['max']
+        flags = {
+            'bradycardia': hr < self.normal_ranges['heart_rate']['min'],
+            'tachycardia': hr > self.normal_ranges['heart_rate']['max'],
+            'hypertension': hypertension,
+            'hypotension': ~hypertension & ((bp_sys < 90) | (bp_dia < 60)),
+            'fever': fever,
+            'hypothermia': ~fever & (temp < self.normal_ranges['temperature']['min']),
+            'hypoxemia': o2_sat < self.normal_ranges['oxygen_saturation']['min']
+        }
+        
+        risk_factors = np.zeros(len(hr), dtype=np.uint8)
+        for factor, flag in flags.items():
+            risk_factors |= flag.astype(np.uint8) << RISK_FACTORS.index(factor)
+        
+        # Each vital contributes at most one issue, so issues == risk factors set
+        issue_count = sum(flag.astype(np.int64) for flag in flags.values())
+        serious = np.zeros(len(hr), dtype=bool)
+        for factor in SERIOUS_RISK_FACTORS:
+            serious |= flags[factor]
+        
+        normal = issue_count == 0
+        mild = (issue_count == 1) & ~serious
+        
+        return {
+            'status': np.select([normal, mild], ['Normal', 'Mild Concern'], 'Attention Required'),
+            'risk_level': np.select([normal, mild], ['Low', 'Mild'], 'High'),
+            'risk_factors': risk_factors,
+            'issue_count': issue_count
+        }
+    
+    def analyze_stream(self, stream, n=None):
+        """
+        Analyze the last n readings held by a VitalsStream (see analyze_batch)
+        
+        Args:
+            stream (VitalsStream): Streamed vitals history
+            n (int, optional): Number of most recent readings (all by default)
+        """
+        window = stream.window(n)
+        columns = {field: window[stream_field] for field, stream_field in STREAM_FIELD_NAMES.items()}
+        return self.analyze_batch(columns)
+    
+    def get_vitals_statistics(self, stream):
+        """
+        Get running statistics for a VitalsStream
+        
+        The statistics are maintained as readings arrive, so this is O(1)
+        regardless of history length.
+        
+        Args:
+            stream (VitalsStream): Streamed vitals history
+        
+        Returns:
+            dict: Per-vital dicts with count, mean, std, min, max, rolling_count,
+                rolling_mean, rolling_min, rolling_max, ewma and last
+        """
+        return stream.statistics.summary()
+    
+    @staticmethod
+    def _batch_column(readings, field):
+        """Get one vital as a float array, 0 where missing"""
+        if isinstance(readings, np.ndarray):
+            present = field in (readings.dtype.names or ())
+        elif isinstance(readings, dict):
+            present = field in readings
+        else:
+            present = field in readings.columns
+        
+        if not present:
+            return np.zeros(VitalsAgent._batch_length(readings))
+        return np.nan_to_num(np.asarray(readings[field], dtype=float), nan=0.0)
+    
+    @staticmethod
+    def _batch_length(readings):
+        """Get the number of readings in a batch"""
+        if isinstance(readings, dict):
+            return len(next(iter(readings.values()), []))
+        return len(readings)
+    
     def get_recommendations(self, vitals_data):
         """Get specific recommendations based on vital signs"""
         recommendations = []
@@ -167,8 +311,11 @@ class VitalsAgent:
             return "Insufficient data for trend analysis"
         
         # Simple trend analysis (in real implementation, use ML models)
+        # The trend compares the first and last of the last 5 readings, so
+        # only those two need scoring
+        recent = historical_vitals[-5:]  # Last 5 readings
         recent_risks = []
-        for vitals in historical_vitals[-5:]:  # Last 5 readings
+        for vitals in (recent[0], recent[-1]):
             analysis = self._analyze_vitals(vitals)
             risk_score = {'Low': 1, 'Mild': 2, 'High': 3}.get(analysis['risk_level'], 1)
             recent_risks.append(risk_score)
@@ -186,6 +333,12 @@ class VitalsAgent:
     
     def get_current_vitals(self):
         """Generate realistic current vital signs with some variation"""
+        # Serve the next reading from a plugged-in device source if there is one
+        if self.vitals_source is not None:
+            reading = next(self.vitals_source, None)
+            if reading is not None:
+                return dict(reading, timestamp=reading.get('timestamp') or datetime.now())
+        
         # Generate realistic vital signs with small random variations
         return {
             'heart_rate': random.randint(65, 95),
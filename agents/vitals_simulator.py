@@ -0,0 +1,348 @@
+"""
+Vitals Simulator - Seeded multi-patient vital sign streams for testing and benchmarks
+
+Readings are physiologically correlated: each patient has a latent stress
+state that moves heart rate, blood pressure, temperature and oxygen together,
+on top of a personal baseline, slow drift, a circadian rhythm and sensor
+noise. Deterioration events (sepsis, hypoxia, ...) can be injected at chosen
+times. Streams can be recorded to CSV and replayed later.
+
+Readings use the same keys as VitalsAgent.get_current_vitals plus 'patient_id'.
+"""
+
+import asyncio
+import csv
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SIMULATED_FIELDS = [
+    'heart_rate',
+    'blood_pressure_systolic',
+    'blood_pressure_diastolic',
+    'temperature',
+    'oxygen_saturation'
+]
+
+# Population baseline and between-patient spread
+BASELINE = {
+    'heart_rate': (75.0, 8.0),
+    'blood_pressure_systolic': (120.0, 10.0),
+    'blood_pressure_diastolic': (78.0, 6.0),
+    'temperature': (98.4, 0.3),
+    'oxygen_saturation': (97.5, 1.0)
+}
+
+# Per-reading sensor noise (standard deviation)
+NOISE = {
+    'heart_rate': 1.5,
+    'blood_pressure_systolic': 2.5,
+    'blood_pressure_diastolic': 1.5,
+    'temperature': 0.05,
+    'oxygen_saturation': 0.4
+}
+
+# Response of each vital to one unit of the shared latent stress state
+STRESS_LOADINGS = {
+    'heart_rate': 8.0,
+    'blood_pressure_systolic': 7.0,
+    'blood_pressure_diastolic': 4.0,
+    'temperature': 0.1,
+    'oxygen_saturation': -0.6
+}
+
+# Random-walk drift per hour (standard deviation)
+DRIFT_PER_HOUR = {
+    'heart_rate': 2.0,
+    'blood_pressure_systolic': 3.0,
+    'blood_pressure_diastolic': 2.0,
+    'temperature': 0.1,
+    'oxygen_saturation': 0.3
+}
+
+# Circadian amplitude, peaking mid-afternoon
+CIRCADIAN_AMPLITUDE = {
+    'heart_rate': 5.0,
+    'blood_pressure_systolic': 6.0,
+    'blood_pressure_diastolic': 4.0,
+    'temperature': 0.5,
+    'oxygen_saturation': 0.0
+}
+CIRCADIAN_PEAK_HOUR = 16
+
+# Physiological limits readings are clipped to
+LIMITS = {
+    'heart_rate': (20, 220),
+    'blood_pressure_systolic': (50, 250),
+    'blood_pressure_diastolic': (30, 150),
+    'temperature': (92.0, 108.0),
+    'oxygen_saturation': (50, 100)
+}
+
+# Offsets at full severity for injectable deterioration events
+DETERIORATION_EVENTS = {
+    'sepsis': {
+        'heart_rate': 35, 'blood_pressure_systolic': -30, 'blood_pressure_diastolic': -20,
+        'temperature': 3.5, 'oxygen_saturation': -6
+    },
+    'hypertensive_crisis': {
+        'heart_rate': 15, 'blood_pressure_systolic': 70, 'blood_pressure_diastolic': 40,
+        'temperature': 0.0, 'oxygen_saturation': 0
+    },
+    'hypoxia': {
+        'heart_rate': 20, 'blood_pressure_systolic': 5, 'blood_pressure_diastolic': 3,
+        'temperature': 0.0, 'oxygen_saturation': -14
+    },
+    'bradycardia': {
+        'heart_rate': -30, 'blood_pressure_systolic': -15, 'blood_pressure_diastolic': -10,
+        'temperature': 0.0, 'oxygen_saturation': -2
+    }
+}
+
+# Fraction of an event's duration spent ramping up to full effect
+EVENT_RAMP_FRACTION = 0.25
+
+# Correlation time of the latent stress state, in seconds
+STRESS_TIME_CONSTANT = 300.0
+
+# Fields stored as integers, like VitalsAgent.get_current_vitals
+INTEGER_FIELDS = ['heart_rate', 'blood_pressure_systolic', 'blood_pressure_diastolic', 'oxygen_saturation']
+
+
+class VitalsSimulator:
+    """
+    Deterministic multi-patient vital sign generator
+
+    All patients advance together one tick (1 / rate_hz seconds) at a time,
+    with every tick computed as vectorized NumPy operations across patients.
+    The same seed always produces the same streams.
+    """
+
+    def __init__(self, n_patients=1, rate_hz=1.0, seed=None, start_time=None, patient_ids=None):
+        """
+        Args:
+            n_patients (int): Number of simulated patients
+            rate_hz (float): Readings per second per patient
+            seed (int, optional): Random seed for reproducible streams
+            start_time (datetime, optional): Timestamp of the first tick
+            patient_ids (list, optional): Ids for the patients (default P0001, P0002, ...)
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+
+        self.rate_hz = rate_hz
+        self.dt = 1.0 / rate_hz
+        self.patient_ids = list(patient_ids) if patient_ids else [f"P{i + 1:04d}" for i in range(n_patients)]
+        self.n_patients = len(self.patient_ids)
+        self.start_time = start_time or datetime.now().replace(microsecond=0)
+        self.elapsed = 0.0
+        self.events = []
+
+        self._rng = np.random.default_rng(seed)
+        self._baseline = {
+            field: self._rng.normal(mean, spread, self.n_patients)
+            for field, (mean, spread) in BASELINE.items()
+        }
+        self._drift = {field: np.zeros(self.n_patients) for field in SIMULATED_FIELDS}
+        self._stress = self._rng.normal(0.0, 1.0, self.n_patients)
+        self._stress_decay = math.exp(-self.dt / STRESS_TIME_CONSTANT)
+        self._patient_index = {patient_id: i for i, patient_id in enumerate(self.patient_ids)}
+
+    def inject_event(self, kind, start, duration, patient_id=None, severity=1.0):
+        """
+        Schedule a deterioration event
+
+        Args:
+            kind (str): One of DETERIORATION_EVENTS
+            start (float): Seconds after the simulation start
+            duration (float): Event length in seconds
+            patient_id (str, optional): Affected patient (all patients if None)
+            severity (float): Scale applied to the event's offsets
+        """
+        if kind not in DETERIORATION_EVENTS:
+            raise ValueError(f"Unknown deterioration event: {kind}")
+
+        mask = np.ones(self.n_patients, dtype=bool)
+        if patient_id is not None:
+            mask[:] = False
+            mask[self._patient_index[patient_id]] = True
+
+        self.events.append({
+            'kind': kind,
+            'start': float(start),
+            'duration': float(duration),
+            'severity': float(severity),
+            'mask': mask
+        })
+
+    def step(self):
+        """
+        Advance one tick
+
+        Returns:
+            dict: 'timestamp' (datetime), 'patient_id' (list) and one float
+                array per vital with a value for every patient
+        """
+        n = self.n_patients
+        dt_hours = self.dt / 3600.0
+
+        self._stress = (self._stress_decay * self._stress
+                        + math.sqrt(1.0 - self._stress_decay ** 2) * self._rng.standard_normal(n))
+
+        timestamp = self.start_time + timedelta(seconds=self.elapsed)
+        hour = timestamp.hour + timestamp.minute / 60.0 + timestamp.second / 3600.0
+        circadian = math.cos(2 * math.pi * (hour - CIRCADIAN_PEAK_HOUR) / 24.0)
+        event_offsets = self._event_offsets()
+
+        tick = {'timestamp': timestamp, 'patient_id': self.patient_ids}
+        for field in SIMULATED_FIELDS:
+            self._drift[field] += self._rng.normal(0.0, DRIFT_PER_HOUR[field] * math.sqrt(dt_hours), n)
+            value = (self._baseline[field]
+                     + self._drift[field]
+                     + STRESS_LOADINGS[field] * self._stress
+                     + CIRCADIAN_AMPLITUDE[field] * circadian
+                     + event_offsets[field]
+                     + self._rng.normal(0.0, NOISE[field], n))
+            low, high = LIMITS[field]
+            tick[field] = np.clip(value, low, high)
+
+        self.elapsed += self.dt
+        return tick
+
+    def generate(self, ticks):
+        """
+        Generate many ticks as flat column arrays
+
+        Args:
+            ticks (int): Number of ticks to simulate
+
+        Returns:
+            dict: 'timestamp' (datetime64[ns]), 'patient_id' and one rounded
+                array per vital, with ticks * n_patients rows ordered by
+                time then patient
+        """
+        timestamps = np.empty(ticks, dtype='datetime64[ns]')
+        values = {field: np.empty((ticks, self.n_patients)) for field in SIMULATED_FIELDS}
+
+        for t in range(ticks):
+            tick = self.step()
+            timestamps[t] = np.datetime64(tick['timestamp'], 'ns')
+            for field in SIMULATED_FIELDS:
+                values[field][t] = tick[field]
+
+        columns = {
+            'timestamp': np.repeat(timestamps, self.n_patients),
+            'patient_id': np.tile(np.array(self.patient_ids, dtype=object), ticks)
+        }
+        for field in SIMULATED_FIELDS:
+            columns[field] = _round_field(field, values[field].ravel())
+        return columns
+
+    def readings(self, ticks=None):
+        """
+        Yield reading dicts, one per patient per tick
+
+        Args:
+            ticks (int, optional): Number of ticks (endless if None)
+        """
+        count = 0
+        while ticks is None or count < ticks:
+            yield from self._tick_readings(self.step())
+            count += 1
+
+    async def readings_async(self, ticks=None, realtime=True):
+        """
+        Async version of readings()
+
+        Args:
+            ticks (int, optional): Number of ticks (endless if None)
+            realtime (bool): Pace ticks at rate_hz instead of as fast as possible
+        """
+        count = 0
+        while ticks is None or count < ticks:
+            for reading in self._tick_readings(self.step()):
+                yield reading
+            count += 1
+            await asyncio.sleep(self.dt if realtime else 0)
+
+    def _tick_readings(self, tick):
+        """Split a tick into per-patient reading dicts"""
+        rounded = {field: _round_field(field, tick[field]).tolist() for field in SIMULATED_FIELDS}
+        for i, patient_id in enumerate(tick['patient_id']):
+            reading = {field: rounded[field][i] for field in SIMULATED_FIELDS}
+            reading['timestamp'] = tick['timestamp']
+            reading['patient_id'] = patient_id
+            yield reading
+
+    def _event_offsets(self):
+        """Sum the offsets of every event active at the current time"""
+        offsets = {field: np.zeros(self.n_patients) for field in SIMULATED_FIELDS}
+
+        for event in self.events:
+            into_event = self.elapsed - event['start']
+            if not 0 <= into_event < event['duration']:
+                continue
+
+            ramp = min(1.0, into_event / max(event['duration'] * EVENT_RAMP_FRACTION, self.dt))
+            scale = event['severity'] * ramp
+            for field, offset in DETERIORATION_EVENTS[event['kind']].items():
+                offsets[field][event['mask']] += offset * scale
+
+        return offsets
+
+
+def _round_field(field, values):
+    """Round simulated values the way real readings are reported"""
+    if field in INTEGER_FIELDS:
+        return np.rint(values).astype(np.int64)
+    return np.round(values, 1)
+
+
+def record_readings(readings, path):
+    """
+    Write readings to a CSV file for later replay
+
+    Args:
+        readings: Iterable of reading dicts
+        path (str): Output CSV path
+
+    Returns:
+        int: Number of readings written
+    """
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['patient_id', 'timestamp'] + SIMULATED_FIELDS)
+        for reading in readings:
+            writer.writerow(
+                [reading.get('patient_id', ''), reading['timestamp'].isoformat()]
+                + [reading.get(field, '') for field in SIMULATED_FIELDS]
+            )
+            count += 1
+    return count
+
+
+def replay_readings(path, patient_id=None):
+    """
+    Yield readings recorded by record_readings
+
+    Args:
+        path (str): Recorded CSV path
+        patient_id (str, optional): Only replay this patient's readings
+    """
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if patient_id is not None and row['patient_id'] != patient_id:
+                continue
+
+            reading = {'patient_id': row['patient_id'], 'timestamp': datetime.fromisoformat(row['timestamp'])}
+            for field in SIMULATED_FIELDS:
+                value = row.get(field, '')
+                if value == '':
+                    reading[field] = None
+                elif field in INTEGER_FIELDS:
+                    reading[field] = int(float(value))
+                else:
+                    reading[field] = float(value)
+            yield reading
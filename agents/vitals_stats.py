@@ -0,0 +1,147 @@
+"""
+Vitals Stats - Incremental statistics maintained as vital sign readings arrive
+"""
+
+import math
+from collections import deque
+
+# Default smoothing factor for the exponentially weighted moving average
+DEFAULT_EWMA_ALPHA = 0.1
+
+# Default number of recent readings covered by the rolling mean, min and max
+DEFAULT_ROLLING_WINDOW = 60
+
+
+class RunningStats:
+    """
+    O(1)-per-value statistics for one vital sign
+
+    Keeps the all-time count, mean and variance (Welford's algorithm), min and
+    max, an EWMA, the mean of the last `window` values from a running sum, and
+    their min/max using monotonic deques. Missing values (None or NaN) are
+    ignored.
+    """
+
+    def __init__(self, window=DEFAULT_ROLLING_WINDOW, alpha=DEFAULT_EWMA_ALPHA):
+        self.window = window
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.ewma = None
+        self.last = None
+        self._position = 0
+        self._rolling_values = deque()
+        self._rolling_sum = 0.0
+        self._rolling_min = deque()
+        self._rolling_max = deque()
+
+    def update(self, value):
+        """Add one value"""
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+        self.last = value
+
+        self._rolling_values.append(value)
+        self._rolling_sum += value
+        if len(self._rolling_values) > self.window:
+            self._rolling_sum -= self._rolling_values.popleft()
+
+        # Monotonic deques: each value is pushed and popped at most once
+        position = self._position
+        self._position += 1
+        while self._rolling_min and self._rolling_min[-1][1] >= value:
+            self._rolling_min.pop()
+        self._rolling_min.append((position, value))
+        while self._rolling_max and self._rolling_max[-1][1] <= value:
+            self._rolling_max.pop()
+        self._rolling_max.append((position, value))
+
+        oldest = position - self.window + 1
+        if self._rolling_min[0][0] < oldest:
+            self._rolling_min.popleft()
+        if self._rolling_max[0][0] < oldest:
+            self._rolling_max.popleft()
+
+    @property
+    def variance(self):
+        """Sample variance (0 with fewer than two values)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Sample standard deviation"""
+        return math.sqrt(self.variance)
+
+    @property
+    def rolling_count(self):
+        """Number of values covered by the rolling statistics"""
+        return len(self._rolling_values)
+
+    @property
+    def rolling_mean(self):
+        """Mean of the last `window` values"""
+        return self._rolling_sum / len(self._rolling_values) if self._rolling_values else None
+
+    @property
+    def rolling_min(self):
+        """Minimum of the last `window` values"""
+        return self._rolling_min[0][1] if self._rolling_min else None
+
+    @property
+    def rolling_max(self):
+        """Maximum of the last `window` values"""
+        return self._rolling_max[0][1] if self._rolling_max else None
+
+    def summary(self):
+        """Get all statistics as a dict"""
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else None,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+            'rolling_count': self.rolling_count,
+            'rolling_mean': self.rolling_mean,
+            'rolling_min': self.rolling_min,
+            'rolling_max': self.rolling_max,
+            'ewma': self.ewma,
+            'last': self.last
+        }
+
+
+class VitalsStatistics:
+    """RunningStats for each vital sign field of a reading dict"""
+
+    def __init__(self, fields, window=DEFAULT_ROLLING_WINDOW, alpha=DEFAULT_EWMA_ALPHA):
+        """
+        Args:
+            fields (list): Reading keys to track
+            window (int, optional): Rolling mean/min/max window in readings
+            alpha (float, optional): EWMA smoothing factor
+        """
+        self.fields = list(fields)
+        self.stats = {field: RunningStats(window, alpha) for field in self.fields}
+
+    def __getitem__(self, field):
+        return self.stats[field]
+
+    def update(self, reading):
+        """Add one reading dict"""
+        for field, stats in self.stats.items():
+            stats.update(reading.get(field))
+
+    def summary(self):
+        """Get every field's statistics as a dict of dicts"""
+        return {field: stats.summary() for field, stats in self.stats.items()}
@@ -0,0 +1,213 @@
+"""
+Vitals Stream - Streaming vital sign ingestion with fixed-capacity ring buffers
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from agents.vitals_stats import VitalsStatistics
+
+# Vital sign fields kept by a stream (as produced by VitalsAgent.get_current_vitals)
+STREAM_FIELDS = [
+    'heart_rate',
+    'blood_pressure_systolic',
+    'blood_pressure_diastolic',
+    'temperature',
+    'oxygen_saturation'
+]
+
+# Default history: 4 hours of 1 Hz readings
+DEFAULT_CAPACITY = 4 * 60 * 60
+
+# Default number of points a charted series is reduced to
+DEFAULT_CHART_POINTS = 300
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring buffer over a NumPy array
+
+    Every value is written twice, at i and i + capacity, so the most recent n
+    values are always one contiguous slice. Appends are O(1) and windows are
+    zero-copy read-only views. A view aliases the buffer, so copy it if it has
+    to survive later appends.
+
+    The double write is deliberate: it costs a second scalar store per append
+    and twice the memory (2 * capacity * itemsize, about 230 KB per float64
+    vital at the default capacity), and in return windows are read far more
+    often than values are appended (every rerun reduces and charts them), and
+    a single-write buffer would have to concatenate its two wrapped slices
+    into a copy on each read.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        """Add a value, overwriting the oldest one when full"""
+        self._data[self._next] = value
+        self._data[self._next + self.capacity] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def view(self, n=None):
+        """Get the last n values (all retained values by default), oldest first"""
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._next + self.capacity
+        window = self._data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def last(self):
+        """Get the most recent value"""
+        if not self._size:
+            raise IndexError("last() on an empty RingBuffer")
+        return self._data[self._next + self.capacity - 1]
+
+
+class VitalsStream:
+    """
+    Per-patient vital sign history fed from a reading source
+
+    Each vital and the reading timestamps live in their own RingBuffer. Readings
+    are dicts with the STREAM_FIELDS keys and an optional 'timestamp'; missing
+    vitals are stored as NaN. `statistics` is updated with every reading, so
+    summary metrics never rescan the history.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, fields=STREAM_FIELDS):
+        """
+        Args:
+            capacity (int): Readings retained per vital
+            fields (list, optional): Vital sign fields to keep
+        """
+        self.capacity = capacity
+        self.fields = list(fields)
+        self._buffers = {field: RingBuffer(capacity) for field in self.fields}
+        self._timestamps = RingBuffer(capacity, dtype='datetime64[ns]')
+        self.statistics = VitalsStatistics(self.fields)
+        self.total_readings = 0
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def append(self, reading):
+        """Add one reading dict"""
+        timestamp = reading.get('timestamp') or datetime.now()
+        self._timestamps.append(np.datetime64(timestamp, 'ns'))
+        for field, buffer in self._buffers.items():
+            value = reading.get(field)
+            buffer.append(np.nan if value is None else value)
+        self.statistics.update(reading)
+        self.total_readings += 1
+
+    def consume(self, source, limit=None):
+        """
+        Ingest readings from an iterable or generator
+
+        Args:
+            source: Iterable of reading dicts
+            limit (int, optional): Stop after this many readings
+
+        Returns:
+            int: Number of readings ingested
+        """
+        count = 0
+        for reading in source:
+            self.append(reading)
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    async def consume_async(self, source, limit=None):
+        """Ingest readings from an async iterator (see consume)"""
+        count = 0
+        async for reading in source:
+            self.append(reading)
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    def window(self, n=None):
+        """
+        Get the last n readings as zero-copy column views
+
+        Args:
+            n (int, optional): Number of readings (all retained by default)
+
+        Returns:
+            dict: 'timestamp' plus one array per vital, oldest first
+        """
+        columns = {'timestamp': self._timestamps.view(n)}
+        for field, buffer in self._buffers.items():
+            columns[field] = buffer.view(n)
+        return columns
+
+    def values(self, field, n=None):
+        """Get the last n values of one vital as a zero-copy view"""
+        return self._buffers[field].view(n)
+
+    def chart_series(self, field, n=None, max_points=DEFAULT_CHART_POINTS):
+        """
+        Get one vital's last n readings reduced for charting (see min_max_downsample)
+
+        Returns:
+            tuple: (timestamps, values), oldest first
+        """
+        return min_max_downsample(self._timestamps.view(n), self._buffers[field].view(n), max_points)
+
+    def latest(self):
+        """Get the most recent reading as a dict, or None if empty"""
+        if not len(self):
+            return None
+        reading = {field: buffer.last().item() for field, buffer in self._buffers.items()}
+        reading['timestamp'] = self._timestamps.last().astype('datetime64[us]').item()
+        return reading
+
+
+def min_max_downsample(x, y, max_points=DEFAULT_CHART_POINTS):
+    """
+    Reduce a series to at most max_points points, keeping its peaks
+
+    The series is split into max_points // 2 equal buckets and the minimum and
+    maximum of each are kept in time order, so spikes stay visible in a chart.
+    Missing (NaN) values are skipped; an all-missing bucket keeps one NaN so
+    the chart still shows the gap.
+
+    Args:
+        x (np.ndarray): Timestamps
+        y (np.ndarray): Values, same length as x
+        max_points (int): Maximum points returned
+
+    Returns:
+        tuple: (x, y), the input views themselves if already short enough
+    """
+    if len(y) <= max_points:
+        return x, y
+
+    buckets = max(1, max_points // 2)
+    edges = np.linspace(0, len(y), buckets + 1).astype(np.intp)
+    keep = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        missing = np.isnan(bucket)
+        if missing.all():
+            keep.append(start)
+            continue
+        low = int(np.argmin(np.where(missing, np.inf, bucket)))
+        high = int(np.argmax(np.where(missing, -np.inf, bucket)))
+        keep.extend(start + i for i in sorted({low, high}))
+
+    keep = np.asarray(keep, dtype=np.intp)
+    return x[keep], y[keep]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures
+"""
+
+import pandas as pd
+import pytest
+
+from agents import interaction_store
+from agents.interaction_store import InteractionStore
+
+# Small interactions dataset: reversed duplicates, shared partners and
+# names that only match as substrings ('statin', 'pril')
+INTERACTION_ROWS = [
+    ['Warfarin', 'Aspirin', 'Aspirin may increase the risk of bleeding; severe hemorrhage is possible'],
+    ['Aspirin', 'Warfarin', 'Warfarin with aspirin: monitor blood counts'],
+    ['Warfarin', 'Ibuprofen', 'Ibuprofen may increase the anticoagulant effect of warfarin'],
+    ['Lisinopril', 'Potassium Chloride', 'Lisinopril may increase serum potassium; monitor kidney function'],
+    ['Enalapril', 'Spironolactone', 'Enalapril with spironolactone can cause dangerous hyperkalemia and renal failure'],
+    ['Simvastatin', 'Clarithromycin', 'Clarithromycin raises simvastatin levels; serious liver toxicity reported'],
+    ['Diltiazem', 'Atorvastatin', 'Diltiazem may increase atorvastatin exposure; consider a lower dose'],
+    ['Digoxin', 'Amiodarone', 'Amiodarone raises digoxin levels and can cause fatal cardiac arrhythmia'],
+    ['Metformin', 'Cimetidine', 'Minor interaction, rarely relevant'],
+    ['Ibuprofen', 'Aspirin', 'Ibuprofen may reduce the cardiac protective effect of aspirin'],
+    ['Sertraline', 'Tramadol', 'Combined use may cause serotonin syndrome affecting the nervous system'],
+    ['Isotretinoin', 'Doxycycline', 'Photosensitizing drugs; skin reactions are unlikely but possible'],
+]
+
+
+def write_interactions_csv(path, rows=INTERACTION_ROWS):
+    pd.DataFrame(rows, columns=['Drug 1', 'Drug 2', 'Interaction Description']).to_csv(path, index=False)
+
+
+@pytest.fixture
+def interactions_csv(tmp_path):
+    path = tmp_path / 'drug_interactions.csv'
+    write_interactions_csv(path)
+    return str(path)
+
+
+@pytest.fixture
+def fixture_store(interactions_csv, monkeypatch):
+    """InteractionStore over INTERACTION_ROWS, installed as the shared store"""
+    store = InteractionStore(interactions_csv)
+    monkeypatch.setattr(interaction_store, '_store', store)
+    return store
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import os
 
@@ -10,7 +10,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.vitals_agent import VitalsAgent
 from agents.medicine_agent import MedicineAgent
-from agents.digital_twin_agent import DigitalTwinAgent
+from agents.twin_registry import get_twin_registry
+from agents.interaction_store import get_interaction_store
+from agents.vitals_stream import VitalsStream
+from agents.organ_highlights import body_view_html, medicine_organ_mask, target_organ_mask
 
 # Configure page
 st.set_page_config(
@@ -30,11 +33,20 @@ if st.session_state.role != "patient":
     st.switch_page("app.py")
     st.stop()
 
+# ---------- SETTINGS ----------
+# Largest regimen shown in the interaction heatmap
+MAX_HEATMAP_MEDICINES = 20
+
+# Charted points above which trend lines are drawn without markers
+VITALS_CHART_MARKER_LIMIT = 60
+
+# Vitals readings kept per patient session (4 hours at 1 Hz)
+VITALS_HISTORY_CAPACITY = 4 * 60 * 60
+
 # ---------- SESSION STATE ----------
 for key, default in [
     ("agent_actions_log", []),
     ("health_alerts", []),
-    ("vitals_history", []),
     ("life_saved_counter", 0),
     ("guardian_mode", True),
     ("medicine_history", []),
@@ -43,6 +55,10 @@ for key, default in [
     if key not in st.session_state:
         st.session_state[key] = default
 
+# Streamed vitals history, one ring buffer per vital
+if "vitals_stream" not in st.session_state:
+    st.session_state.vitals_stream = VitalsStream(capacity=VITALS_HISTORY_CAPACITY)
+
 # ---------- CACHED AGENTS ----------
 @st.cache_resource
 def get_medicine_agent():
@@ -536,44 +552,8 @@ def render_enhanced_digital_twin():
         target_organ = "None"
         medicine_name = "None"
 
-    # Map condition text to organ flags
-    brain_active = "Brain" in target_organ or "Nervous" in target_organ
-    heart_active = "Heart" in target_organ or "Cardiovascular" in target_organ
-    lung_active = "Lung" in target_organ or "Respiratory" in target_organ
-    stomach_active = "Stomach" in target_organ or "Digestive" in target_organ
-    liver_active = "Liver" in target_organ or "Digestive" in target_organ
-    kidney_active = "Kidney" in target_organ or "Urinary" in target_organ
-
-    # Colors per organ
-    def organ_color(active):
-        return "#bbf7d0" if active else "#e5e7eb"
-
-    def organ_border(active):
-        return "#22c55e" if active else "#94a3b8"
-
-    def organ_shadow(active):
-        return "0 0 18px rgba(34, 197, 94, 0.9)" if active else "0 4px 10px rgba(15, 23, 42, 0.25)"
-
-    brain_bg = organ_color(brain_active)
-    heart_bg = organ_color(heart_active)
-    lung_bg = organ_color(lung_active)
-    liver_bg = organ_color(liver_active)
-    stomach_bg = organ_color(stomach_active)
-    kidney_bg = organ_color(kidney_active)
-
-    brain_border = organ_border(brain_active)
-    heart_border = organ_border(heart_active)
-    lung_border = organ_border(lung_active)
-    liver_border = organ_border(liver_active)
-    stomach_border = organ_border(stomach_active)
-    kidney_border = organ_border(kidney_active)
-
-    brain_shadow = organ_shadow(brain_active)
-    heart_shadow = organ_shadow(heart_active)
-    lung_shadow = organ_shadow(lung_active)
-    liver_shadow = organ_shadow(liver_active)
-    stomach_shadow = organ_shadow(stomach_active)
-    kidney_shadow = organ_shadow(kidney_active)
+    # Organs named by the simulation target
+    organs_mask = target_organ_mask(target_organ)
 
     # Create clean human body using Streamlit columns
     st.markdown("### 👤 Human Body Digital Twin")
@@ -605,33 +585,12 @@ def render_enhanced_digital_twin():
             key="medicine2_selector"
         )
     
-    # Determine which organs are affected by the selected medicines
-    medicine_effects = {
-        "Aspirin": ["Heart", "Stomach"],
-        "Warfarin": ["Heart", "Liver"],
-        "Lisinopril": ["Heart", "Kidneys"],
-        "Ibuprofen": ["Brain", "Stomach", "Kidneys"],
-        "Sertraline": ["Brain"],
-        "Metformin": ["Liver", "Stomach"],
-        "Albuterol": ["Lungs"],
-        "Atorvastatin": ["Liver", "Heart"]
-    }
-    
-    # Update organ activity based on selected medicines
-    if medicine1 != "Select medicine..." or medicine2 != "Select medicine...":
-        affected_systems = set()
-        if medicine1 != "Select medicine..." and medicine1 in medicine_effects:
-            affected_systems.update(medicine_effects[medicine1])
-        if medicine2 != "Select medicine..." and medicine2 in medicine_effects:
-            affected_systems.update(medicine_effects[medicine2])
-        
-        # Override organ states based on selected medicines
-        brain_active = "Brain" in affected_systems
-        heart_active = "Heart" in affected_systems
-        lung_active = "Lungs" in affected_systems
-        stomach_active = "Stomach" in affected_systems
-        liver_active = "Liver" in affected_systems
-        kidney_active = "Kidneys" in affected_systems
+    # Organs affected by the selected medicines override the simulation target: the
+    # medicines' own organs plus those of the pair's interaction in the dataset
+    selected_medicines = [medicine for medicine in (medicine1, medicine2) if medicine != "Select medicine..."]
+    if selected_medicines:
+        organs_mask = (medicine_organ_mask(selected_medicines)
+                       | get_interaction_store().interaction_organ_mask(selected_medicines))
     
     # Create two main columns - body on left, interaction analysis on right
     body_col, interaction_col = st.columns([1, 1])
@@ -680,61 +639,7 @@ def render_enhanced_digital_twin():
         st.markdown("### 🫀 Interactive Body Systems")
         st.markdown("*Real-time organ monitoring based on selected medicines*")
         
-        # Create container for body systems
-        with st.container():
-            # Head area - Brain
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                if brain_active:
-                    st.success("🧠 **Brain** - 🟢 Active")
-                else:
-                    st.info("🧠 **Brain** - ⚪ Normal")
-            
-            st.markdown("---")
-            
-            # Chest area - Lungs and Heart
-            chest_col1, chest_col2, chest_col3 = st.columns([1, 1, 1])
-            
-            with chest_col1:
-                if lung_active:
-                    st.success("🫁 **Left Lung** - 🟢 Active")
-                else:
-                    st.info("🫁 **Left Lung** - ⚪ Normal")
-            
-            with chest_col2:
-                if heart_active:
-                    st.error("❤️ **Heart** - 🟢 Active")
-                else:
-                    st.info("❤️ **Heart** - ⚪ Normal")
-            
-            with chest_col3:
-                if lung_active:
-                    st.success("🫁 **Right Lung** - 🟢 Active")
-                else:
-                    st.info("🫁 **Right Lung** - ⚪ Normal")
-            
-            st.markdown("---")
-            
-            # Abdomen area - Stomach, Kidneys, Liver
-            abdomen_col1, abdomen_col2, abdomen_col3 = st.columns([1, 1, 1])
-            
-            with abdomen_col1:
-                if stomach_active:
-                    st.warning("🫄 **Stomach** - 🟢 Active")
-                else:
-                    st.info("🫄 **Stomach** - ⚪ Normal")
-            
-            with abdomen_col2:
-                if kidney_active:
-                    st.success("🫘 **Kidneys** - 🟢 Active")
-                else:
-                    st.info("🫘 **Kidneys** - ⚪ Normal")
-            
-            with abdomen_col3:
-                if liver_active:
-                    st.success("🫘 **Liver** - 🟢 Active")
-                else:
-                    st.info("🫘 **Liver** - ⚪ Normal")
+        st.markdown(body_view_html(organs_mask), unsafe_allow_html=True)
         
         # Single medicine simulation option
         if (medicine1 != "Select medicine..." or medicine2 != "Select medicine...") and not (medicine1 != "Select medicine..." and medicine2 != "Select medicine..."):
@@ -1114,9 +1019,8 @@ def render_enhanced_vitals():
     vitals_agent = VitalsAgent()
     current_vitals = vitals_agent.get_current_vitals()
     current_vitals["timestamp"] = datetime.now()
-    st.session_state.vitals_history.append(current_vitals)
-    if len(st.session_state.vitals_history) > 20:
-        st.session_state.vitals_history = st.session_state.vitals_history[-20:]
+    vitals_stream = st.session_state.vitals_stream
+    vitals_stream.append(current_vitals)
 
     vitals_config = {
         "heart_rate": {
@@ -1214,60 +1118,62 @@ def render_enhanced_vitals():
                 unsafe_allow_html=True,
             )
 
-    if len(st.session_state.vitals_history) > 1:
+    if len(vitals_stream) > 1:
         st.markdown('<div style="margin-top: 2rem;"><div class="section-title">📈 Real-Time Vital Trends</div></div>', unsafe_allow_html=True)
         
         st.markdown(
             f"""
             <div style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); 
                        border-left: 4px solid #0891b2; padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
-                <strong>🔗 Live Data Connection:</strong> Displaying trends from the last {len(st.session_state.vitals_history)} readings
+                <strong>🔗 Live Data Connection:</strong> Displaying trends from the last {len(vitals_stream)} readings
                 <br><small>📊 Chart updates automatically with each vital sign measurement above</small>
             </div>
             """,
             unsafe_allow_html=True
         )
         
-        df = pd.DataFrame(st.session_state.vitals_history)
+        # Each series reduced to its per-bucket min/max, oldest reading first
+        series = {field: vitals_stream.chart_series(field) for field in vitals_stream.fields}
+        mode = 'lines+markers' if len(series["heart_rate"][1]) <= VITALS_CHART_MARKER_LIMIT else 'lines'
         
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x=df["timestamp"], 
-            y=df["heart_rate"], 
+            x=series["heart_rate"][0], 
+            y=series["heart_rate"][1], 
             name="💓 Heart Rate",
             line=dict(color="#ef4444", width=4, shape='spline'),
-            mode='lines+markers',
+            mode=mode,
             marker=dict(size=10, symbol='circle', line=dict(width=2, color='white')),
             hovertemplate="<b>Heart Rate</b><br>%{y} bpm<br>%{x}<extra></extra>"
         ))
         
         fig.add_trace(go.Scatter(
-            x=df["timestamp"], 
-            y=df["oxygen_saturation"], 
+            x=series["oxygen_saturation"][0], 
+            y=series["oxygen_saturation"][1], 
             name="🫁 Oxygen Saturation",
             line=dict(color="#0891b2", width=4, shape='spline'),
-            mode='lines+markers',
+            mode=mode,
             marker=dict(size=8, symbol='circle', line=dict(width=2, color='white')),
             hovertemplate="<b>Oxygen Saturation</b><br>%{y}%<br>%{x}<extra></extra>"
         ))
         
         fig.add_trace(go.Scatter(
-            x=df["timestamp"], 
-            y=df["temperature"], 
+            x=series["temperature"][0], 
+            y=series["temperature"][1], 
             name="🌡️ Temperature",
             line=dict(color="#f59e0b", width=4, shape='spline'),
-            mode='lines+markers',
+            mode=mode,
             marker=dict(size=8, symbol='diamond', line=dict(width=2, color='white')),
             hovertemplate="<b>Temperature</b><br>%{y}°F<br>%{x}<extra></extra>"
         ))
         
         fig.add_trace(go.Scatter(
-            x=df["timestamp"], 
-            y=df["blood_pressure_systolic"], 
+            x=series["blood_pressure_systolic"][0], 
+            y=series["blood_pressure_systolic"][1], 
             name="🩸 Blood Pressure",
             line=dict(color="#8b5cf6", width=4, shape='spline'),
-            mode='lines+markers',
+            mode=mode,
             marker=dict(size=8, symbol='square', line=dict(width=2, color='white')),
             hovertemplate="<b>Blood Pressure</b><br>%{y} mmHg<br>%{x}<extra></extra>"
         ))
@@ -1319,29 +1225,43 @@ def render_enhanced_vitals():
         
         col1, col2, col3, col4 = st.columns(4)
         
+        # Running statistics are kept up to date as readings arrive; the tiles
+        # average the rolling window of recent readings, not the whole history
+        vitals_stats = vitals_agent.get_vitals_statistics(vitals_stream)
+        window_label = f"last {vitals_stats['heart_rate']['rolling_count']}"
+        
         with col1:
-            avg_hr = df["heart_rate"].mean()
-            st.metric("💓 Avg Heart Rate", f"{avg_hr:.0f} bpm", f"{df['heart_rate'].iloc[-1] - avg_hr:.0f}")
+            hr_stats = vitals_stats["heart_rate"]
+            st.metric(f"💓 Avg Heart Rate ({window_label})", f"{hr_stats['rolling_mean']:.0f} bpm", f"{hr_stats['last'] - hr_stats['rolling_mean']:.0f}")
         
         with col2:
-            avg_o2 = df["oxygen_saturation"].mean()
-            st.metric("🫁 Avg O2 Sat", f"{avg_o2:.1f}%", f"{df['oxygen_saturation'].iloc[-1] - avg_o2:.1f}")
+            o2_stats = vitals_stats["oxygen_saturation"]
+            st.metric(f"🫁 Avg O2 Sat ({window_label})", f"{o2_stats['rolling_mean']:.1f}%", f"{o2_stats['last'] - o2_stats['rolling_mean']:.1f}")
         
         with col3:
-            avg_temp = df["temperature"].mean()
-            st.metric("🌡️ Avg Temperature", f"{avg_temp:.1f}°F", f"{df['temperature'].iloc[-1] - avg_temp:.1f}")
+            temp_stats = vitals_stats["temperature"]
+            st.metric(f"🌡️ Avg Temperature ({window_label})", f"{temp_stats['rolling_mean']:.1f}°F", f"{temp_stats['last'] - temp_stats['rolling_mean']:.1f}")
         
         with col4:
-            avg_bp = df["blood_pressure_systolic"].mean()
-            st.metric("🩸 Avg BP", f"{avg_bp:.0f} mmHg", f"{df['blood_pressure_systolic'].iloc[-1] - avg_bp:.0f}")
+            bp_stats = vitals_stats["blood_pressure_systolic"]
+            st.metric(f"🩸 Avg BP ({window_label})", f"{bp_stats['rolling_mean']:.0f} mmHg", f"{bp_stats['last'] - bp_stats['rolling_mean']:.0f}")
 
 def render_risk_timeline():
     st.markdown("### ⏱️ Risk Timeline")
     risk_time = st.slider("Time perspective:", -24, 24, 0, help="Hours from now")
+    twin_registry = get_twin_registry()
     if risk_time < 0:
-        st.info(f"📊 {abs(risk_time)} hours ago: Risk was moderate due to medication timing")
+        # Rebuilt from the twin's event history
+        past_state = twin_registry.state_at(st.session_state.username, datetime.now() + timedelta(hours=risk_time))
+        if past_state is None:
+            st.info(f"📊 {abs(risk_time)} hours ago: No recorded history that far back")
+        else:
+            st.info(f"📊 {abs(risk_time)} hours ago: {past_state['risk_level']} "
+                    f"(health score {past_state['health_score']})")
     elif risk_time == 0:
-        st.success("📍 Current: Low risk - all systems stable")
+        assessment = twin_registry.get_risk_assessment(st.session_state.username)
+        st.success(f"📍 Current: {assessment['current_risk_level']} "
+                   f"(health score {assessment['health_score']})")
     else:
         st.warning(f"🔮 {risk_time} hours ahead: Projected moderate risk if medication not taken")
     st.markdown(
@@ -1390,7 +1310,7 @@ def render_drug_interaction_heatmap():
     
     # Allow selection of 2-4 medicines
     selected_medicines = st.multiselect(
-        f"Select 2-4 medicines typically used for {selected_condition}:",
+        f"Select 2 or more medicines typically used for {selected_condition}:",
         recommended_medicines + ["Other medicines..."],
         key="condition_medicines_selector"
     )
@@ -1412,9 +1332,9 @@ def render_drug_interaction_heatmap():
         st.warning("Please select at least **2 medicines** to analyze their effectiveness and interactions.")
         return
     
-    if len(selected_medicines) > 4:
-        st.info("Using the first 4 medicines selected for better visualization.")
-        medicines = selected_medicines[:4]
+    if len(selected_medicines) > MAX_HEATMAP_MEDICINES:
+        st.info(f"Using the first {MAX_HEATMAP_MEDICINES} medicines selected for better visualization.")
+        medicines = selected_medicines[:MAX_HEATMAP_MEDICINES]
     else:
         medicines = selected_medicines
     
@@ -1485,6 +1405,10 @@ def render_drug_interaction_heatmap():
     agent = get_medicine_agent()
     
     n = len(medicines)
+    try:
+        pair_results = agent.interaction_matrix(medicines)
+    except Exception:
+        pair_results = None
     interaction_matrix = [[0.0 for _ in range(n)] for _ in range(n)]
     effectiveness_matrix = [[0.0 for _ in range(n)] for _ in range(n)]
     hover_text = [["" for _ in range(n)] for _ in range(n)]
@@ -1503,11 +1427,10 @@ def render_drug_interaction_heatmap():
                 interaction_matrix[i][j] = 0.0
                 hover_text[i][j] = f"{medicines[i]}<br>Effectiveness: {int(med_data['effectiveness'] * 100)}%<br>For {selected_condition}"
             else:
-                try:
-                    result = agent.run(medicines[i], medicines[j])
-                    severity = result.get("severity", "None")
-                    explanation = result.get("explanation", "No interaction data")
-                except Exception:
+                if pair_results is not None:
+                    severity = pair_results["severity"][i][j]
+                    explanation = pair_results["explanation"][i][j] or "No interaction data"
+                else:
                     severity = "None"
                     explanation = "Unable to check interaction"
                 
@@ -5,13 +5,15 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import sys
 import os
+import io
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.vitals_agent import VitalsAgent
-from agents.digital_twin_agent import DigitalTwinAgent
+from agents.twin_registry import get_twin_registry
 from agents.summary_agent import SummaryAgent
+from agents.report_export import export_reports
 
 # Configure page
 st.set_page_config(
@@ -79,7 +81,7 @@ st.markdown("""
 def get_agents():
     return {
         'vitals': VitalsAgent(),
-        'digital_twin': DigitalTwinAgent(),
+        'digital_twin': get_twin_registry(),
         'summary': SummaryAgent()
     }
 
@@ -136,6 +138,70 @@ def get_patient_data():
         }
     }
 
+def triage_patients(patients):
+    """Score every patient's overall risk in one vectorized pass, highest risk first"""
+    patient_ids = list(patients.keys())
+    panel = pd.DataFrame({
+        'twin_risk': [patients[pid]['risk_level'] for pid in patient_ids],
+        'heart_rate': [patients[pid]['last_vitals']['heart_rate'] for pid in patient_ids],
+        'bp_sys': [float(patients[pid]['last_vitals']['blood_pressure'].split('/')[0]) for pid in patient_ids],
+        'o2_sat': [patients[pid]['last_vitals']['oxygen_saturation'] for pid in patient_ids],
+        'active_emergencies': [1 if patients[pid]['last_emergency'] else 0 for pid in patient_ids]
+    })
+    triage = agents['summary'].assess_population_risk(panel)
+    
+    return [
+        (patient_ids[i], int(triage['risk_score'][i]), triage['risk_level'][i])
+        for i in triage['triage_order']
+    ]
+
+def summary_patient_data(patient_id, patient):
+    """Build the patient_data SummaryAgent and the PDF reports take from a dashboard patient"""
+    vitals = patient['last_vitals']
+    bp_sys, bp_dia = vitals['blood_pressure'].split('/')
+    
+    return {
+        'patient_info': {
+            'name': patient['name'],
+            'patient_id': patient_id,
+            'age': patient['age'],
+            'gender': patient['gender'],
+            'primary_condition': patient['condition'],
+            'report_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        },
+        'vitals_history': [{
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'heart_rate': vitals['heart_rate'],
+            'bp_sys': int(bp_sys),
+            'bp_dia': int(bp_dia),
+            'temp': vitals['temperature'],
+            'o2_sat': vitals['oxygen_saturation']
+        }],
+        'medications': [
+            {'name': med, 'dosage': '-', 'frequency': '-'}
+            for med in patient['medications']
+        ],
+        'emergency_events': [
+            {'type': patient['last_emergency'], 'resolved': False}
+        ] if patient['last_emergency'] else [],
+        'digital_twin_risk': {'current_state': patient['risk_level']}
+    }
+
+def export_patient_reports(patients):
+    """Render every patient's PDF summary into one ZIP, showing progress"""
+    progress_bar = st.progress(0.0, text="Generating patient reports...")
+    
+    def report_progress(done, total, file_name):
+        progress_bar.progress(done / total, text=f"Generated {done}/{total}: {file_name}")
+    
+    archive = io.BytesIO()
+    result = export_reports(
+        [summary_patient_data(pid, patient) for pid, patient in patients.items()],
+        archive,
+        progress=report_progress
+    )
+    return archive.getvalue(), result
+
 def create_vitals_trend_chart():
     """Create a sample vitals trend chart"""
     dates = pd.date_range(start=datetime.now() - timedelta(days=7), end=datetime.now(), freq='D')
@@ -207,8 +273,10 @@ def main():
         # Patient Summary
         st.markdown("### 👥 Patient Overview")
         
-        for patient_id, patient in patients.items():
-            with st.expander(f"👤 {patient['name']} (ID: {patient_id})", expanded=True):
+        for patient_id, triage_score, triage_level in triage_patients(patients):
+            patient = patients[patient_id]
+            with st.expander(f"👤 {patient['name']} (ID: {patient_id}) - Triage: {triage_level} ({triage_score})",
+                             expanded=True):
                 col_info, col_vitals = st.columns(2)
                 
                 with col_info:
@@ -331,6 +399,18 @@ def main():
         if st.button("📊 Generate Hospital Report", use_container_width=True):
             st.success("Hospital-wide report generated!")
         
+        if st.button("📦 Export All Patient Reports", use_container_width=True):
+            archive, result = export_patient_reports(patients)
+            for file_name, error in result['failed'].items():
+                st.error(f"Report failed for {file_name}: {error}")
+            st.download_button(
+                label="📥 Download Reports (ZIP)",
+                data=archive,
+                file_name=f"patient_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+        
         if st.button("🚨 Emergency Protocol", use_container_width=True):
             st.info("Emergency protocol activated")
         
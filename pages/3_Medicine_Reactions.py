@@ -10,8 +10,12 @@ import plotly.express as px
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.medicine_agent import MedicineAgent
-from agents.digital_twin_agent import DigitalTwinAgent
+from agents.twin_registry import get_twin_registry
 from agents.enhanced_ai_coordinator import AgenticAICoordinator
+from agents.interaction_classifier import classify_body_areas
+from agents.interaction_store import get_interaction_store
+from agents.drug_search import DrugSearchIndex
+from agents.model_assets import get_model_url
 
 # Configure page
 st.set_page_config(
@@ -352,33 +356,32 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Brand-name medicines always offered by the selector
+COMMON_BRAND_DRUGS = [
+    "Insulin", "Advil", "Tylenol", "Motrin", "Aleve", "Benadryl", 
+    "Claritin", "Zyrtec", "Pepcid", "Tums", "Robitussin", "Sudafed"
+]
+
+# Autocomplete result sizes
+MAX_DRUG_SUGGESTIONS = 25
+MAX_DRUG_SEARCH_RESULTS = 100
+
 # Initialize agents
 @st.cache_resource
 def get_agents():
     return {
         'medicine': MedicineAgent(),
-        'digital_twin': DigitalTwinAgent()
+        'digital_twin': get_twin_registry()
     }
 
 agents = get_agents()
 
 # Load drug interactions data
-@st.cache_data
+@st.cache_resource
 def load_drug_data():
     try:
-        # Try multiple paths for the CSV file
-        possible_paths = [
-            'db_drug_interactions.csv',  # Original file in root
-            'data/drug_interactions.csv',  # Data directory
-            'drug_interactions.csv'  # Current directory
-        ]
-        
-        df = None
-        for csv_path in possible_paths:
-            if os.path.exists(csv_path):
-                print(f"Loading drugs from: {csv_path}")
-                df = pd.read_csv(csv_path)
-                break
+        # Shared, read-only dataset loaded once per server process
+        df = get_interaction_store().interactions_df
         
         if df is not None:
             # Get unique drugs and limit for performance
@@ -386,30 +389,9 @@ def load_drug_data():
             drug2_list = df['Drug 2'].dropna().unique().tolist()
             all_drugs = sorted(list(set(drug1_list + drug2_list)))
             
-            # Filter out very long names and prioritize common drugs
-            drugs = []
-            
-            # First, add common/recognizable drug names
-            common_patterns = [
-                'insulin', 'aspirin', 'ibuprofen', 'acetaminophen', 'advil', 'tylenol',
-                'metformin', 'lisinopril', 'atorvastatin', 'amlodipine', 'omeprazole',
-                'warfarin', 'digoxin', 'furosemide', 'hydrochlorothiazide', 'losartan',
-                'sertraline', 'fluoxetine', 'lorazepam', 'gabapentin', 'prednisone'
-            ]
-            
-            # Add drugs that match common patterns first
-            for drug in all_drugs:
-                if len(drug) < 50:  # Reasonable length
-                    drug_lower = drug.lower()
-                    if any(pattern in drug_lower for pattern in common_patterns):
-                        drugs.append(drug)
-            
-            # Then add other drugs up to limit
-            for drug in all_drugs:
-                if len(drug) < 50 and drug not in drugs:
-                    drugs.append(drug)
-                    if len(drugs) >= 1000:  # Increase limit
-                        break
+            # Filter out very long names; the selector searches this list
+            # through the autocomplete index, so it no longer needs a cap
+            drugs = [drug for drug in all_drugs if len(drug) < 50]
             
             # Add essential drugs if missing
             essential_drugs = [
@@ -422,7 +404,7 @@ def load_drug_data():
                     drugs.append(essential)
             
             drugs = sorted(drugs)
-            print(f"Loaded {len(drugs)} unique drugs (prioritized common medications)")
+            print(f"Loaded {len(drugs)} unique drugs")
             return df, drugs
         else:
             raise FileNotFoundError("No CSV file found")
@@ -438,41 +420,37 @@ def load_drug_data():
             "Digoxin", "Verteporfin", "Trioxsalen", "Aminolevulinic acid", "Titanium dioxide"
         ]
 
-def get_affected_body_areas(drug_interaction):
-    """Map drug interactions to affected body areas"""
-    interaction_text = drug_interaction.lower()
-    
-    areas = []
-    
-    # Cardiovascular
-    if any(word in interaction_text for word in ['heart', 'cardiac', 'blood pressure', 'circulation']):
-        areas.append("❤️ Cardiovascular System")
-    
-    # Nervous System
-    if any(word in interaction_text for word in ['nervous', 'brain', 'seizure', 'depression', 'anxiety']):
-        areas.append("🧠 Nervous System")
-    
-    # Digestive System
-    if any(word in interaction_text for word in ['stomach', 'liver', 'digestive', 'nausea', 'gastric']):
-        areas.append("🫄 Digestive System")
-    
-    # Respiratory System
-    if any(word in interaction_text for word in ['lung', 'respiratory', 'breathing', 'asthma']):
-        areas.append("🫁 Respiratory System")
-    
-    # Kidney/Urinary
-    if any(word in interaction_text for word in ['kidney', 'renal', 'urinary', 'bladder']):
-        areas.append("🫘 Kidney/Urinary System")
-    
-    # Skin
-    if any(word in interaction_text for word in ['skin', 'rash', 'photosensitizing', 'dermal']):
-        areas.append("🧴 Skin/Integumentary System")
-    
-    # Blood/Hematologic
-    if any(word in interaction_text for word in ['blood', 'bleeding', 'clotting', 'anticoagulant']):
-        areas.append("🩸 Blood/Hematologic System")
-    
-    return areas if areas else ["⚠️ General Systemic Effect"]
+# Names the "Browse Available Drugs" sample is drawn from
+SAMPLE_DRUG_TERMS = ['insulin', 'aspirin', 'ibuprofen', 'acetaminophen', 'metformin',
+                     'lisinopril', 'atorvastatin', 'warfarin', 'digoxin', 'omeprazole']
+
+@st.cache_resource
+def get_drug_vocabulary():
+    """Drugs offered by the selector, built once per server process"""
+    _, drugs = load_drug_data()
+    known = set(drugs)
+    missing_common = [drug for drug in COMMON_BRAND_DRUGS if drug not in known]
+    all_drugs = sorted(known.union(missing_common))
+    return {
+        'dataset_count': len(drugs),
+        'missing_common': missing_common,
+        'drugs': all_drugs,
+        'sample_drugs': [
+            drug for drug in all_drugs
+            if any(term in drug.lower() for term in SAMPLE_DRUG_TERMS)
+        ][:20]
+    }
+
+@st.cache_resource
+def get_drug_search():
+    """Autocomplete index over the drugs offered by the selector"""
+    return DrugSearchIndex(get_drug_vocabulary()['drugs'])
+
+def get_affected_body_areas(result):
+    """Get the body areas an interaction affects, precomputed for dataset interactions"""
+    if 'affected_body_areas' in result:
+        return result['affected_body_areas']
+    return classify_body_areas(result['explanation'])
 
 def main():
     # Enhanced Header with Animation
@@ -487,7 +465,9 @@ def main():
     ''', unsafe_allow_html=True)
     
     # Load drug data
-    interactions_df, available_drugs = load_drug_data()
+    interactions_df, _ = load_drug_data()
+    drug_vocabulary = get_drug_vocabulary()
+    available_drugs = drug_vocabulary['drugs']
 
     # Session state for dynamic medicine selection
     if 'selected_drugs' not in st.session_state:
@@ -596,23 +576,15 @@ def main():
                 📊 Database Status
             </div>
             <div style="color: #0369a1; font-size: 0.9rem;">
-                {len(available_drugs):,} medications available for analysis
+                {drug_vocabulary['dataset_count']:,} medications available for analysis
             </div>
         </div>
         ''', unsafe_allow_html=True)
         
-        # Add common drugs if not in list
-        common_drugs_to_add = [
-            "Insulin", "Advil", "Tylenol", "Motrin", "Aleve", "Benadryl", 
-            "Claritin", "Zyrtec", "Pepcid", "Tums", "Robitussin", "Sudafed"
-        ]
-        missing_common = [drug for drug in common_drugs_to_add if drug not in available_drugs]
+        # Common drugs not in the database are added to the vocabulary
+        missing_common = drug_vocabulary['missing_common']
         if missing_common:
             st.warning(f"⚠️ Adding common drugs not found in database: {', '.join(missing_common)}")
-            available_drugs.extend(missing_common)
-        
-        # Deduplicate and sort
-        available_drugs = sorted(list(dict.fromkeys(available_drugs)))
         
         # Enhanced medicine selector
         st.markdown('''
@@ -626,13 +598,24 @@ def main():
         </div>
         ''', unsafe_allow_html=True)
         
+        drug_search = get_drug_search()
+        medicine_query = st.text_input(
+            "🔍 Type a medicine name:",
+            key="medicine_add_query",
+            placeholder="Type: insulin, advil, warfarin, etc..."
+        )
+        suggestions = drug_search.search(medicine_query, limit=MAX_DRUG_SUGGESTIONS)
+        
         new_drug = st.selectbox(
-            "🔍 Select a medicine to add:",
-            ["None"] + available_drugs,
+            "💊 Select a medicine to add:",
+            ["None"] + suggestions,
             key="medicine_add_select",
-            help="Choose from over 1000+ medications in our database"
+            help=f"Matches from {len(drug_search.names):,} medications in our database, including brand names"
         )
         
+        if medicine_query and not suggestions:
+            st.info(f"No medicines match '{medicine_query}'. Try a generic or brand name.")
+        
         if st.button("➕ Add Medicine", key="add_medicine_button"):
             if new_drug == "None":
                 st.warning("Please select a medicine before adding.")
@@ -864,7 +847,7 @@ def main():
                 st.session_state.interaction_history.append(st.session_state.current_interaction)
                 
                 # Update digital twin
-                new_state = agents['digital_twin'].run("drug_interaction", {
+                new_state = agents['digital_twin'].run(st.session_state.username, "drug_interaction", {
                     'drug_a': drug_a,
                     'drug_b': drug_b,
                     'condition': selected_condition,
@@ -981,7 +964,7 @@ def main():
                 st.write(result['explanation'])
                 
                 # Affected body areas
-                affected_areas = get_affected_body_areas(result['explanation'])
+                affected_areas = get_affected_body_areas(result)
                 if affected_areas:
                     st.markdown("### 🎯 Affected Body Systems")
                     for area in affected_areas:
@@ -989,7 +972,7 @@ def main():
                                    unsafe_allow_html=True)
                 
                 # Update digital twin
-                twin_update = agents['digital_twin'].run("drug_interaction", {
+                twin_update = agents['digital_twin'].run(st.session_state.username, "drug_interaction", {
                     'drug_a': interaction['drug_a'],
                     'drug_b': interaction['drug_b'],
                     'severity': severity,
@@ -1023,9 +1006,7 @@ def main():
         # Show sample of available drugs
         with st.expander("📋 Browse Available Drugs (Sample)", expanded=False):
             st.write("**Common medications available:**")
-            sample_drugs = [drug for drug in available_drugs if any(common in drug.lower() 
-                          for common in ['insulin', 'aspirin', 'ibuprofen', 'acetaminophen', 'metformin', 
-                                       'lisinopril', 'atorvastatin', 'warfarin', 'digoxin', 'omeprazole'])][:20]
+            sample_drugs = drug_vocabulary['sample_drugs']
             
             if sample_drugs:
                 for i, drug in enumerate(sample_drugs):
@@ -1049,7 +1030,7 @@ def main():
         search_term = st.text_input("🔍 Search for a specific drug:", placeholder="Type: insulin, advil, tylenol, etc...")
         
         if search_term and len(search_term) >= 2:
-            matching_drugs = [drug for drug in available_drugs if search_term.lower() in drug.lower()]
+            matching_drugs = get_drug_search().search(search_term, limit=MAX_DRUG_SEARCH_RESULTS)
             if matching_drugs:
                 st.success(f"**Found {len(matching_drugs)} matching drugs:**")
                 
@@ -1175,14 +1156,8 @@ def main():
             """, unsafe_allow_html=True)
             
             # Try GLB model
-            glb_file_path = "HumanBody.glb"
-            if os.path.exists(glb_file_path):
-                import base64
-                with open(glb_file_path, 'rb') as f:
-                    glb_data = f.read()
-                glb_base64 = base64.b64encode(glb_data).decode()
-                glb_data_url = f"data:model/gltf-binary;base64,{glb_base64}"
-                
+            glb_data_url = get_model_url(viewport=450)
+            if glb_data_url:
                 st.markdown(f"""
                 <div class="glb-container" style="border: 2px solid {interaction_color}; border-radius: 15px; padding: 1rem; position: relative;">
                     <script type="module" src="https://unpkg.com/@google/model-viewer/dist/model-viewer.min.js"></script>
@@ -1366,11 +1341,11 @@ def main():
             """, unsafe_allow_html=True)
         else:
             # Default state - no interaction checked yet
-            st.markdown("""
+            st.markdown(f"""
             <div class="glb-container" style="border: 2px solid #e5e7eb; border-radius: 15px; padding: 1rem;">
                 <script type="module" src="https://unpkg.com/@google/model-viewer/dist/model-viewer.min.js"></script>
                 <model-viewer 
-                    src="HumanBody.glb"
+                    src="{get_model_url(viewport=450)}"
                     alt="Digital Twin"
                     camera-controls
                     auto-rotate
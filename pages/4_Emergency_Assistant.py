@@ -8,7 +8,8 @@ import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.emergency_agent import EmergencyAgent
-from agents.digital_twin_agent import DigitalTwinAgent
+from agents.twin_registry import get_twin_registry
+from agents.model_assets import get_model_url
 
 # Configure page
 st.set_page_config(
@@ -105,7 +106,7 @@ st.markdown("""
 def get_agents():
     return {
         'emergency': EmergencyAgent(),
-        'digital_twin': DigitalTwinAgent()
+        'digital_twin': get_twin_registry()
     }
 
 agents = get_agents()
@@ -126,7 +127,7 @@ def simulate_emergency(emergency_type):
     emergency_response = agents['emergency'].run(emergency_type)
     
     # Update digital twin
-    twin_update = agents['digital_twin'].run("emergency", {
+    twin_update = agents['digital_twin'].run(st.session_state.username, "emergency", {
         'type': emergency_type,
         'severity': 'High',
         'timestamp': datetime.now()
@@ -206,7 +207,7 @@ def main():
                     st.session_state.emergency_active = False
                     
                     # Update digital twin to stable
-                    agents['digital_twin'].run("emergency_resolved", {})
+                    agents['digital_twin'].run(st.session_state.username, "emergency_resolved", {})
                     
                     st.success("✅ Emergency marked as resolved")
                     st.rerun()
@@ -262,11 +263,11 @@ def main():
         
         if st.session_state.emergency_active:
             # Emergency state with pulsing red glow
-            st.markdown("""
+            st.markdown(f"""
             <div style="background: #fef2f2; border-radius: 15px; padding: 1rem; text-align: center;">
                 <script type="module" src="https://unpkg.com/@google/model-viewer/dist/model-viewer.min.js"></script>
                 <model-viewer 
-                    src="HumanBody.glb"
+                    src="{get_model_url(viewport=400)}"
                     alt="Digital Twin - Emergency State"
                     camera-controls
                     auto-rotate
@@ -282,11 +283,11 @@ def main():
             """, unsafe_allow_html=True)
         else:
             # Normal state
-            st.markdown("""
+            st.markdown(f"""
             <div style="background: #f0fdf4; border-radius: 15px; padding: 1rem; text-align: center;">
                 <script type="module" src="https://unpkg.com/@google/model-viewer/dist/model-viewer.min.js"></script>
                 <model-viewer 
-                    src="HumanBody.glb"
+                    src="{get_model_url(viewport=400)}"
                     alt="Digital Twin - Normal State"
                     camera-controls
                     auto-rotate
@@ -5,16 +5,11 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import sys
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import io
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from agents.report_service import get_report_service
 from agents.summary_agent import SummaryAgent
 from agents.vitals_agent import VitalsAgent
 
@@ -162,80 +157,8 @@ def create_vitals_chart(vitals_data):
     return fig
 
 def generate_pdf_report(patient_data, ai_summary):
-    """Generate PDF report"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        textColor=colors.HexColor('#059669')
-    )
-    story.append(Paragraph("MediAI Guardian 3.0 - Patient Summary Report", title_style))
-    story.append(Spacer(1, 12))
-    
-    # Patient Info
-    story.append(Paragraph("Patient Information", styles['Heading2']))
-    patient_info = patient_data['patient_info']
-    info_data = [
-        ['Patient Name:', patient_info['name']],
-        ['Patient ID:', patient_info['patient_id']],
-        ['Age:', str(patient_info['age'])],
-        ['Gender:', patient_info['gender']],
-        ['Primary Condition:', patient_info['primary_condition']],
-        ['Report Date:', patient_info['report_date']]
-    ]
-    
-    info_table = Table(info_data, colWidths=[2*inch, 3*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.white),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    story.append(info_table)
-    story.append(Spacer(1, 12))
-    
-    # AI Summary
-    story.append(Paragraph("AI Analysis Summary", styles['Heading2']))
-    story.append(Paragraph(ai_summary['summary'], styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    # Recommendations
-    story.append(Paragraph("AI Recommendations", styles['Heading2']))
-    for rec in ai_summary['recommendations']:
-        story.append(Paragraph(f"• {rec}", styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    # Current Medications
-    story.append(Paragraph("Current Medications", styles['Heading2']))
-    med_data = [['Medication', 'Dosage', 'Frequency']]
-    for med in patient_data['medications']:
-        med_data.append([med['name'], med['dosage'], med['frequency']])
-    
-    med_table = Table(med_data, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-    med_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(med_table)
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+    """Generate PDF report (served from the report cache when the content is unchanged)"""
+    return get_report_service().get_pdf(patient_data, ai_summary)
 
 def main():
     # Header
@@ -411,14 +334,14 @@ def main():
             st.markdown("### 📄 Export Report")
             
             if st.button("📥 Download PDF Report", use_container_width=True):
-                pdf_buffer = generate_pdf_report(
+                pdf_bytes = generate_pdf_report(
                     st.session_state.current_patient_data,
                     st.session_state.current_summary
                 )
                 
                 st.download_button(
                     label="📄 Download PDF",
-                    data=pdf_buffer,
+                    data=pdf_bytes,
                     file_name=f"patient_summary_{patient_info['patient_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
                     mime="application/pdf",
                     use_container_width=True
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the agent output cache and context fingerprints
+"""
+
+from agents import agent_cache
+from agents.agent_cache import AgentResultCache, context_fingerprint
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_lru_drops_least_recently_used():
+    cache = AgentResultCache(max_entries=2, ttl=None)
+    cache.put("ddi_agent", "a", {"risk_score": 1})
+    cache.put("ddi_agent", "b", {"risk_score": 2})
+    assert cache.get("ddi_agent", "a") == {"risk_score": 1}
+
+    cache.put("ddi_agent", "c", {"risk_score": 3})
+    assert len(cache) == 2
+    assert cache.get("ddi_agent", "b") is None
+    assert cache.get("ddi_agent", "a") == {"risk_score": 1}
+    assert cache.get("ddi_agent", "c") == {"risk_score": 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    # Same fingerprint for another agent is a separate entry
+    assert cache.get("safety_agent", "a") is None
+
+
+def test_ttl_expires_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(agent_cache, "time", clock)
+    cache = AgentResultCache(max_entries=10, ttl=30.0)
+    cache.put("ddi_agent", "a", {"risk_score": 1})
+
+    clock.now += 30.0
+    assert cache.get("ddi_agent", "a") == {"risk_score": 1}
+    clock.now += 0.5
+    assert cache.get("ddi_agent", "a") is None
+    assert len(cache) == 0
+
+    # Putting again restarts the entry's lifetime
+    cache.put("ddi_agent", "a", {"risk_score": 2})
+    clock.now += 20.0
+    assert cache.get("ddi_agent", "a") == {"risk_score": 2}
+
+
+def test_zero_size_disables_caching():
+    cache = AgentResultCache(max_entries=0)
+    cache.put("ddi_agent", "a", {"risk_score": 1})
+    assert len(cache) == 0
+    assert cache.get("ddi_agent", "a") is None
+
+
+def test_fingerprint_stability():
+    context = {"medications": ["Warfarin", "Aspirin"], "vitals": {"heart_rate": 80, "temperature": 98.6}}
+    reordered = {"vitals": {"temperature": 98.6, "heart_rate": 80}, "medications": ["Warfarin", "Aspirin"]}
+    assert context_fingerprint(context) == context_fingerprint(reordered)
+    assert context_fingerprint(context) == context_fingerprint(dict(context))
+
+    # List order matters
+    swapped = dict(context, medications=["Aspirin", "Warfarin"])
+    assert context_fingerprint(context) != context_fingerprint(swapped)
+
+    # Only the listed fields count; missing fields hash as None
+    noisy = dict(context, query="hello")
+    assert context_fingerprint(context, ["medications"]) == context_fingerprint(noisy, ["medications"])
+    assert context_fingerprint(context, ["symptoms"]) == context_fingerprint({}, ["symptoms"])
+    assert context_fingerprint(context, ["vitals"]) != context_fingerprint(context, ["medications"])
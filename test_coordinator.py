@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent agent execution in the AI coordinator
+"""
+
+import threading
+
+from agents.enhanced_ai_coordinator import AgenticAICoordinator
+
+
+class _FixedAgent:
+    def __init__(self, risk_score):
+        self.risk_score = risk_score
+        self.calls = 0
+
+    def analyze(self, context):
+        self.calls += 1
+        return {"risk_score": self.risk_score, "recommendations": [], "warnings": []}
+
+
+class _BlockingAgent:
+    """Agent whose calls block until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+
+    def analyze(self, context):
+        self.threads.append(threading.current_thread())
+        self.release.wait(5)
+        return {"risk_score": 9}
+
+
+def _coordinator(fixture_store, **kwargs):
+    coordinator = AgenticAICoordinator("threads", cache_size=0, **kwargs)
+    blocking = _BlockingAgent()
+    coordinator.agents = {"fast_agent": _FixedAgent(3), "slow_agent": blocking, "other_agent": _FixedAgent(5)}
+    return coordinator, blocking
+
+
+def test_per_agent_timeout(fixture_store):
+    coordinator, blocking = _coordinator(
+        fixture_store, agent_timeout=5.0, agent_timeouts={"slow_agent": 0.1}
+    )
+    try:
+        decision = coordinator.coordinate_decision({"medications": []})
+    finally:
+        blocking.release.set()
+
+    record = coordinator.decision_log[-1]
+    assert record["agent_inputs"]["slow_agent"]["status"] == "timeout"
+    assert record["agent_inputs"]["fast_agent"]["risk_score"] == 3
+    assert decision["overall_risk_score"] == 5
+
+
+def test_pool_replaced_after_timeout(fixture_store):
+    coordinator, blocking = _coordinator(fixture_store, agent_timeout=0.1)
+    try:
+        coordinator.coordinate_decision({})
+        assert coordinator._executor is None
+        assert coordinator.stuck_workers == 1
+        first_thread = blocking.threads[0]
+
+        coordinator.coordinate_decision({})
+        assert blocking.threads[1] is not first_thread
+        assert coordinator.decision_log[-1]["stuck_workers"] == 2
+        assert coordinator.agents["fast_agent"].calls == 2
+    finally:
+        blocking.release.set()
+
+    first_thread.join(5)
+    blocking.threads[1].join(5)
+    assert coordinator.stuck_workers == 0
+
+    # With nothing timing out the pool is kept between decisions
+    coordinator.coordinate_decision({})
+    executor = coordinator._executor
+    assert executor is not None
+    coordinator.coordinate_decision({})
+    assert coordinator._executor is executor
+    assert coordinator.decision_log[-1]["timed_out_agents"] == []
+
+
+def test_timed_out_agents_are_logged(fixture_store):
+    coordinator, blocking = _coordinator(fixture_store, agent_timeout=0.1)
+    try:
+        coordinator.coordinate_decision({})
+        coordinator.coordinate_decision({})
+    finally:
+        blocking.release.set()
+
+    for record in coordinator.get_recent_decisions():
+        assert record["timed_out_agents"] == ["slow_agent"]
+
+    performance = coordinator.get_agent_performance()
+    assert performance["slow_agent"]["timed_out_calls"] == 2
+    assert performance["slow_agent"]["successful_calls"] == 0
+    assert performance["fast_agent"]["timed_out_calls"] == 0
+    assert performance["fast_agent"]["success_rate"] == 100
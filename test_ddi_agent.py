@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the coordinator's drug-drug interaction agent
+"""
+
+import pytest
+
+from agents import interaction_store
+from agents.enhanced_ai_coordinator import DDIAgent
+from agents.interaction_store import InteractionStore
+
+
+@pytest.fixture
+def fallback_store(tmp_path, monkeypatch):
+    """Shared store with no dataset, so the agent uses its built-in combinations"""
+    store = InteractionStore(str(tmp_path / 'missing.csv'))
+    monkeypatch.setattr(interaction_store, '_store', store)
+    return store
+
+
+def _score(medications):
+    return DDIAgent().analyze({'medications': medications})['risk_score']
+
+
+def test_single_medication(fixture_store):
+    result = DDIAgent().analyze({'medications': ['Warfarin']})
+    assert result['risk_score'] == 1
+    assert result['warnings'] == []
+
+
+def test_dataset_scores_by_severity(fixture_store):
+    # Base 2, plus 6 / 3 / 1 per High / Medium / Low interacting pair
+    assert _score(['Warfarin', 'Aspirin']) == 8
+    assert _score(['Lisinopril', 'Potassium Chloride']) == 5
+    assert _score(['Metformin', 'Cimetidine']) == 3
+    assert _score(['Digoxin', 'Metformin']) == 2
+    assert _score(['Warfarin', 'Aspirin', 'Ibuprofen']) == 10
+
+
+def test_dataset_interactions_reported_once_per_pair(fixture_store):
+    result = DDIAgent().analyze({'medications': ['Warfarin', 'aspirin', 'WARFARIN', 'Digoxin']})
+    assert result['risk_score'] == 8
+    assert [(i['drug_a'], i['drug_b'], i['severity']) for i in result['interactions']] == [
+        ('WARFARIN', 'aspirin', 'High')
+    ]
+    assert result['recommendations'][0] == 'Consult pharmacist immediately'
+    assert result['warnings'][:2] == [
+        '⚠️ High interaction risk detected',
+        '💊 WARFARIN + aspirin: ' + fixture_store.descriptions[0]
+    ]
+    assert result['warnings'][-1] == '🩸 Monitor bleeding risk with blood thinners'
+
+
+def test_dataset_substring_match(fixture_store):
+    result = DDIAgent().analyze({'medications': ['Atorvastatin', 'Diltiazem']})
+    assert result['risk_score'] == 5
+    assert result['interactions'][0]['severity'] == 'Medium'
+
+
+def test_fallback_scores(fallback_store):
+    assert fallback_store.interactions_df is None
+
+    # Each built-in combination counts as a High pair (+6; it was +4 before the dataset lookup)
+    assert _score(['warfarin', 'aspirin']) == 8
+    assert _score(['Aspirin', 'Warfarin']) == 8
+    assert _score(['lisinopril', 'potassium', 'ibuprofen']) == 8
+    assert _score(['metformin', 'ibuprofen']) == 2
+    assert _score(['warfarin', 'aspirin', 'metformin', 'alcohol']) == 10
+
+    result = DDIAgent().analyze({'medications': ['warfarin', 'aspirin']})
+    assert result['interactions'][0]['description'] == 'Known high risk combination: warfarin and aspirin'
+    assert '⚠️ High interaction risk detected' in result['warnings']
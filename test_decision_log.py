@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded decision log
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from agents.decision_log import DecisionLog
+
+
+def _record(i, failed=(), timed_out=()):
+    agent_inputs = {"ddi_agent": {"risk_score": i}, "safety_agent": {"risk_score": 1}}
+    for agent_name in failed:
+        agent_inputs[agent_name] = {"error": "boom", "status": "failed"}
+    for agent_name in timed_out:
+        agent_inputs[agent_name] = {"error": "Timed out after 1s", "status": "timeout"}
+    return {"id": f"decision_{i}", "timestamp": datetime(2026, 1, 1, 8, 0, i % 60), "agent_inputs": agent_inputs}
+
+
+def test_ring_keeps_most_recent_records():
+    log = DecisionLog(retention=5)
+    for i in range(12):
+        log.append(_record(i))
+
+    assert len(log) == 5
+    assert log.total_decisions == 12
+    assert [record["id"] for record in log] == [f"decision_{i}" for i in range(7, 12)]
+    assert log[-1]["id"] == "decision_11"
+    assert [record["id"] for record in log.recent(2)] == ["decision_10", "decision_11"]
+    assert len(log.recent(50)) == 5
+    assert log.recent(0) == []
+
+
+def test_counters_cover_evicted_records():
+    log = DecisionLog(retention=2)
+    log.append(_record(0, failed=["ddi_agent"]))
+    log.append(_record(1, timed_out=["safety_agent"]))
+    for i in range(2, 6):
+        log.append(_record(i))
+
+    performance = log.agent_performance(["ddi_agent", "safety_agent", "chat_agent"])
+    assert performance["ddi_agent"]["successful_calls"] == 5
+    assert performance["ddi_agent"]["total_calls"] == 6
+    assert performance["safety_agent"]["timed_out_calls"] == 1
+    assert performance["safety_agent"]["successful_calls"] == 5
+    assert performance["chat_agent"]["success_rate"] == 100
+
+
+def test_spill_writes_every_record_as_json_lines(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    log = DecisionLog(retention=3, spill_path=str(path))
+    for i in range(10):
+        log.append(_record(i))
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 10
+    spilled = [json.loads(line) for line in lines]
+    assert [record["id"] for record in spilled] == [f"decision_{i}" for i in range(10)]
+    assert spilled[4]["timestamp"] == str(datetime(2026, 1, 1, 8, 0, 4))
+    assert len(log) == 3
+
+
+def test_retention_must_be_positive():
+    with pytest.raises(ValueError):
+        DecisionLog(retention=0)
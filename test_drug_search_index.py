@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the drug-name autocomplete index
+"""
+
+from agents.drug_search import DrugSearchIndex
+
+DRUGS = [
+    'Atorvastatin', 'Simvastatin', 'Nystatin', 'Lisinopril', 'Enalapril',
+    'Omeprazole', 'Insulin Glargine', 'Insulin Lispro', 'Ibuprofen', 'Warfarin'
+]
+
+
+def test_prefix_and_word_prefix():
+    index = DrugSearchIndex(DRUGS)
+    assert index.search('ator') == ['Atorvastatin']
+    assert index.search('glar') == ['Insulin Glargine']
+    assert index.search('insulin') == ['Insulin Glargine', 'Insulin Lispro']
+    assert index.search('Advil') == ['Ibuprofen']
+
+
+def test_substring_fallback():
+    index = DrugSearchIndex(DRUGS)
+    assert index.search('statin') == ['Atorvastatin', 'Nystatin', 'Simvastatin']
+    assert index.search('vastatin')[:2] == ['Atorvastatin', 'Simvastatin']
+
+    # Prefix matches rank first ("Prilosec" is an Omeprazole alias), then substrings
+    assert index.search('pril') == ['Omeprazole', 'Enalapril', 'Lisinopril']
+    assert index.search('statin', limit=1) == ['Atorvastatin']
+
+
+def test_fuzzy_after_substring():
+    index = DrugSearchIndex(DRUGS)
+    assert index.search('warfrin')[0] == 'Warfarin'
+    assert index.search('zz') == []
+    assert index.search('  ') == []
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary drug interactions cache
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from agents.interaction_cache import build_cache, load_interactions, DESCRIPTION_CODE_COLUMN
+
+SHIPPED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'drug_interactions.csv')
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=['Drug 1', 'Drug 2', 'Interaction Description']).to_csv(path, index=False)
+
+
+def _as_records(frame, descriptions):
+    """Rows of a loaded frame as (drug 1, drug 2, description) with None for missing values"""
+    records = []
+    for drug_1, drug_2, code in zip(frame['Drug 1'], frame['Drug 2'], frame[DESCRIPTION_CODE_COLUMN]):
+        records.append((
+            None if pd.isna(drug_1) else drug_1,
+            None if pd.isna(drug_2) else drug_2,
+            None if code < 0 else descriptions[code]
+        ))
+    return records
+
+
+def _csv_records(path):
+    raw = pd.read_csv(path, dtype=str)
+    return [
+        tuple(None if pd.isna(value) else value for value in row)
+        for row in raw[['Drug 1', 'Drug 2', 'Interaction Description']].itertuples(index=False)
+    ]
+
+
+def test_cache_round_trip_matches_csv(tmp_path):
+    csv_path = tmp_path / 'interactions.csv'
+    _write_csv(csv_path, [
+        ['Aspirin', 'Warfarin', 'Increased bleeding risk'],
+        ['Warfarin', 'Ibuprofen', 'Increased bleeding risk'],
+        ['Metformin', None, 'Monitor blood glucose'],
+        ['Café-drug', 'Aspirin', None],
+        ['Ibuprofen', 'Aspirin', 'Minor – reduced effect'],
+    ])
+
+    # First load builds the cache, second one reads it back
+    built, _ = load_interactions(str(csv_path))
+    frame, descriptions = load_interactions(str(csv_path))
+
+    expected = _csv_records(csv_path)
+    assert _as_records(built, descriptions) == expected
+    assert _as_records(frame, descriptions) == expected
+    assert len(descriptions) == 3
+
+
+def test_cache_codes_are_memory_mapped(tmp_path):
+    csv_path = tmp_path / 'interactions.csv'
+    _write_csv(csv_path, [['Aspirin', 'Warfarin', 'Increased bleeding risk']])
+    load_interactions(str(csv_path))
+
+    frame, _ = load_interactions(str(csv_path))
+    columns = [frame['Drug 1'].array.codes, frame['Drug 2'].array.codes, frame[DESCRIPTION_CODE_COLUMN].to_numpy()]
+    for codes in columns:
+        base = codes
+        while base.base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap)
+
+
+def test_shipped_header_only_csv(tmp_path):
+    csv_path = tmp_path / 'drug_interactions.csv'
+    shutil.copy(SHIPPED_CSV, csv_path)
+
+    for _ in range(2):
+        frame, descriptions = load_interactions(str(csv_path))
+        assert len(frame) == len(pd.read_csv(SHIPPED_CSV))
+        assert list(frame.columns) == ['Drug 1', 'Drug 2', DESCRIPTION_CODE_COLUMN]
+        assert _as_records(frame, descriptions) == _csv_records(csv_path)
+
+
+def test_cache_rebuilds_when_csv_changes(tmp_path):
+    csv_path = tmp_path / 'interactions.csv'
+    _write_csv(csv_path, [['Aspirin', 'Warfarin', 'Increased bleeding risk']])
+    load_interactions(str(csv_path))
+
+    _write_csv(csv_path, [['Aspirin', 'Warfarin', 'Increased bleeding risk'], ['Zed', 'Aspirin', 'Rare']])
+    frame, descriptions = load_interactions(str(csv_path))
+    assert _as_records(frame, descriptions) == _csv_records(csv_path)
+
+
+def test_rebuild_over_existing_cache(tmp_path):
+    csv_path = tmp_path / 'interactions.csv'
+    cache_dir = tmp_path / 'cache'
+    _write_csv(csv_path, [['Aspirin', 'Warfarin', 'Increased bleeding risk']])
+
+    build_cache(str(csv_path), str(cache_dir))
+    build_cache(str(csv_path), str(cache_dir))
+
+    # Only the cache itself is left, no scratch directories
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'interactions.csv']
+    frame, descriptions = load_interactions(str(csv_path), str(cache_dir))
+    assert _as_records(frame, descriptions) == _csv_records(csv_path)
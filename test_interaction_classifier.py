@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass interaction classifier
+"""
+
+import random
+
+from agents.interaction_classifier import (
+    SEVERITY_KEYWORDS, SYSTEM_KEYWORDS, classify_interaction, systems_from_mask
+)
+from conftest import INTERACTION_ROWS
+
+# Keyword lists of the original per-description loops
+HIGH_KEYWORDS = [
+    'contraindicated', 'avoid', 'dangerous', 'severe', 'toxic', 'fatal',
+    'life-threatening', 'serious', 'major', 'significant risk'
+]
+MEDIUM_KEYWORDS = [
+    'caution', 'monitor', 'adjust', 'reduce', 'increase', 'moderate',
+    'may increase', 'may decrease', 'potential', 'consider'
+]
+LOW_KEYWORDS = ['minor', 'slight', 'minimal', 'unlikely', 'rare']
+SYSTEM_WORDS = [
+    ('Cardiovascular', ['heart', 'cardiac', 'cardiovascular']),
+    ('Hepatic', ['liver', 'hepatic']),
+    ('Renal', ['kidney', 'renal']),
+    ('Nervous System', ['nervous', 'neurological', 'cns']),
+    ('Respiratory', ['respiratory', 'lung']),
+    ('Gastrointestinal', ['gastrointestinal', 'stomach', 'digestive']),
+    ('Hematologic', ['blood', 'hematologic', 'bleeding']),
+    ('Dermatologic', ['skin', 'dermatologic', 'photosensitizing'])
+]
+
+
+def _reference_severity(description):
+    description_lower = description.lower()
+    if any(keyword in description_lower for keyword in HIGH_KEYWORDS):
+        return 'High'
+    elif any(keyword in description_lower for keyword in MEDIUM_KEYWORDS):
+        return 'Medium'
+    elif any(keyword in description_lower for keyword in LOW_KEYWORDS):
+        return 'Low'
+    return 'Medium'
+
+
+def _reference_systems(description):
+    desc_lower = description.lower()
+    return {system for system, words in SYSTEM_WORDS if any(word in desc_lower for word in words)}
+
+
+def _descriptions():
+    """Fixture descriptions, overlapping keywords and random keyword soup"""
+    descriptions = [row[2] for row in INTERACTION_ROWS] + [
+        '',
+        'No known interaction',
+        'MAY INCREASE the risk of Serious Bleeding',
+        'may decrease efficacy; minor',
+        'significant riskiness for the CNS and the heart',
+        'cardiovascularly insignificant',
+        'photosensitizing rash, unlikely',
+        'moderately reduced renal clearance',
+        'livers and kidneys',
+    ]
+
+    keywords = [keyword for _, words in SEVERITY_KEYWORDS + SYSTEM_KEYWORDS for keyword in words]
+    filler = ['the', 'drug', 'risk', 'may', 'in', 'cr', 'ease', 'x', '-', '']
+    rng = random.Random(11)
+    for _ in range(2000):
+        words = [rng.choice(keywords if rng.random() < 0.3 else filler) for _ in range(rng.randint(0, 8))]
+        separator = rng.choice([' ', '', ', '])
+        text = separator.join(words)
+        descriptions.append(text.upper() if rng.random() < 0.2 else text)
+    return descriptions
+
+
+def test_severity_matches_keyword_loops():
+    for description in _descriptions():
+        severity, _ = classify_interaction(description)
+        assert severity == _reference_severity(description), description
+
+
+def test_systems_match_keyword_loops():
+    for description in _descriptions():
+        _, systems_mask = classify_interaction(description)
+        systems = systems_from_mask(systems_mask)
+        assert len(systems) == len(set(systems))
+        assert set(systems) == _reference_systems(description), description
+
+
+def test_keyword_lists_unchanged():
+    assert SEVERITY_KEYWORDS == [('High', HIGH_KEYWORDS), ('Medium', MEDIUM_KEYWORDS), ('Low', LOW_KEYWORDS)]
+    assert SYSTEM_KEYWORDS == SYSTEM_WORDS
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the interaction store indexes and pair lookup
+"""
+
+from itertools import permutations
+
+import pandas as pd
+
+from conftest import INTERACTION_ROWS
+
+
+def _reference_row(frame, drug_a, drug_b):
+    """Row found by the original DataFrame scan: exact pair first, then substrings, forward first"""
+    drug_1 = frame['Drug 1'].str.lower()
+    drug_2 = frame['Drug 2'].str.lower()
+    forward = frame[(drug_1 == drug_a.lower()) & (drug_2 == drug_b.lower())]
+    reverse = frame[(drug_1 == drug_b.lower()) & (drug_2 == drug_a.lower())]
+
+    if forward.empty and reverse.empty:
+        forward = frame[
+            frame['Drug 1'].str.contains(drug_a, case=False, na=False, regex=False) &
+            frame['Drug 2'].str.contains(drug_b, case=False, na=False, regex=False)
+        ]
+        reverse = frame[
+            frame['Drug 1'].str.contains(drug_b, case=False, na=False, regex=False) &
+            frame['Drug 2'].str.contains(drug_a, case=False, na=False, regex=False)
+        ]
+
+    if not forward.empty:
+        return int(forward.index[0])
+    if not reverse.empty:
+        return int(reverse.index[0])
+    return None
+
+
+def test_pair_and_partner_indexes(fixture_store):
+    assert fixture_store._pair_index[('aspirin', 'warfarin')] == [0, 1]
+    assert fixture_store._pair_index[('atorvastatin', 'diltiazem')] == [6]
+    assert len(fixture_store._pair_index) == len(INTERACTION_ROWS) - 1
+
+    assert fixture_store._partner_index['warfarin'] == {'aspirin', 'ibuprofen'}
+    assert fixture_store._partner_index['aspirin'] == {'warfarin', 'ibuprofen'}
+    assert fixture_store.drug_rows['aspirin'] == [0, 1, 9]
+
+
+def test_trigram_index(fixture_store):
+    assert fixture_store._trigram_index['sta'] == {'simvastatin', 'atorvastatin'}
+    assert fixture_store._trigram_index['pri'] == {'lisinopril', 'enalapril'}
+    for name in fixture_store.drug_rows:
+        for i in range(len(name) - 2):
+            assert name in fixture_store._trigram_index[name[i:i + 3]]
+
+    assert fixture_store.match_drug_names('statin') == {'simvastatin', 'atorvastatin'}
+    assert fixture_store.match_drug_names('pril') == {'lisinopril', 'enalapril'}
+    assert fixture_store.match_drug_names('zz') == set()
+
+
+def test_find_interaction_row_matches_dataframe_scan(fixture_store, interactions_csv):
+    frame = pd.read_csv(interactions_csv)
+    names = sorted({name for row in INTERACTION_ROWS for name in row[:2]})
+    terms = names + ['statin', 'pril', 'WARF', 'chloride', 'unknown']
+
+    for drug_a, drug_b in permutations(terms, 2):
+        assert fixture_store.find_interaction_row(drug_a, drug_b) == _reference_row(frame, drug_a, drug_b), (drug_a, drug_b)
+
+
+def test_exact_pair_before_substring(fixture_store):
+    # Forward row wins over its reverse duplicate
+    assert fixture_store.find_interaction_row('Warfarin', 'Aspirin') == 0
+    assert fixture_store.find_interaction_row('aspirin', 'warfarin') == 1
+
+    # No exact pair: substrings, forward before reverse
+    assert fixture_store.find_interaction_row('diltiazem', 'statin') == 6
+    assert fixture_store.find_interaction_row('statin', 'diltiazem') == 6
+    assert fixture_store.find_interaction_row('pril', 'potassium') == 3
+    assert fixture_store.find_interaction_row('digoxin', 'aspirin') is None
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the MedicineAgent interaction matrix
+"""
+
+from agents.medicine_agent import MedicineAgent
+
+MATRIX_FIELDS = ['severity', 'explanation', 'recommendation', 'affected_systems']
+
+
+def test_interaction_matrix_is_symmetric(fixture_store):
+    agent = MedicineAgent()
+    drugs = ['Warfarin', 'Aspirin', 'Ibuprofen', 'Digoxin', 'Atorvastatin']
+    matrix = agent.interaction_matrix(drugs)
+
+    assert matrix['drugs'] == drugs
+    for field in MATRIX_FIELDS:
+        assert len(matrix[field]) == len(drugs)
+        for i in range(len(drugs)):
+            for j in range(len(drugs)):
+                assert matrix[field][i][j] == matrix[field][j][i], (field, i, j)
+
+    # Each cell holds the pair analysis of the upper-triangle order
+    for i in range(len(drugs)):
+        for j in range(i + 1, len(drugs)):
+            result = agent.run(drugs[i], drugs[j])
+            for field in MATRIX_FIELDS:
+                assert matrix[field][i][j] == result[field]
+
+    assert matrix['severity'][0][1] == 'High'
+    assert matrix['severity'][1][2] == 'Medium'
+    assert matrix['severity'][3][4] == 'None'
+
+
+def test_interaction_matrix_diagonal_is_empty(fixture_store):
+    matrix = MedicineAgent().interaction_matrix(['Warfarin', 'Aspirin', 'Warfarin'])
+    for i in range(3):
+        assert matrix['severity'][i][i] == 'None'
+        assert matrix['explanation'][i][i] == ''
+        assert matrix['recommendation'][i][i] == ''
+        assert matrix['affected_systems'][i][i] == []
+
+    # A repeated drug is still paired with its other occurrence
+    assert matrix['severity'][0][2] == matrix['severity'][2][0]
+
+
+def test_interaction_matrix_small_inputs(fixture_store):
+    agent = MedicineAgent()
+    assert agent.interaction_matrix([])['severity'] == []
+    assert agent.interaction_matrix(['Aspirin'])['severity'] == [['None']]
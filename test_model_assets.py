@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for 3D model LOD selection
+"""
+
+import hashlib
+import json
+import os
+
+from agents.model_assets import lod_manifest_path, select_lod
+
+
+def _write(path, data, mtime_ns):
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _write_manifest(source, models_dir, mtime_ns):
+    with open(source, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    manifest = {
+        'source': os.path.basename(source),
+        'source_sha256': digest,
+        'lods': [
+            {'file': 'Body.lod0.glb', 'max_viewport': None},
+            {'file': 'Body.lod1.glb', 'max_viewport': 400}
+        ]
+    }
+    path = lod_manifest_path(source, str(models_dir))
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _setup(tmp_path):
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    source = str(tmp_path / 'Body.glb')
+    _write(source, b'original model', 1_000_000_000)
+    _write(str(models_dir / 'Body.lod0.glb'), b'full detail', 1_000_000_000)
+    _write(str(models_dir / 'Body.lod1.glb'), b'low detail', 1_000_000_000)
+    _write_manifest(source, models_dir, 1_000_000_000)
+    return source, models_dir
+
+
+def test_select_lod_picks_smallest_variant_for_viewport(tmp_path):
+    source, models_dir = _setup(tmp_path)
+    assert select_lod(source, 300, str(models_dir)) == str(models_dir / 'Body.lod1.glb')
+    assert select_lod(source, 800, str(models_dir)) == str(models_dir / 'Body.lod0.glb')
+
+
+def test_select_lod_ignores_stale_manifest(tmp_path):
+    source, models_dir = _setup(tmp_path)
+    assert select_lod(source, 300, str(models_dir)) != source
+
+    # The source changed after the variants were built
+    _write(source, b'edited model', 2_000_000_000)
+    assert select_lod(source, 300, str(models_dir)) == source
+
+    # Rebuilding the manifest for the new source makes the variants current again
+    _write_manifest(source, models_dir, 2_000_000_000)
+    assert select_lod(source, 300, str(models_dir)) == str(models_dir / 'Body.lod1.glb')
+
+
+def test_select_lod_falls_back_to_source(tmp_path):
+    source, models_dir = _setup(tmp_path)
+    os.remove(models_dir / 'Body.lod1.glb')
+    assert select_lod(source, 300, str(models_dir)) == source
+
+    os.remove(lod_manifest_path(source, str(models_dir)))
+    assert select_lod(source, 800, str(models_dir)) == source
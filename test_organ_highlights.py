@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the digital twin's organ highlight masks and body view
+"""
+
+from agents.interaction_classifier import classify_interaction
+from agents.interaction_store import InteractionStore
+from agents.organ_highlights import (
+    HIGHLIGHT_STYLES, MAX_CACHED_TARGETS, ORGAN_BITS, SYSTEMS_ORGAN_MASKS,
+    _target_masks, body_view_html, highlight_style, medicine_organ_mask, organ_mask,
+    organs_from_mask, systems_organ_mask, target_organ_mask
+)
+from conftest import INTERACTION_ROWS, write_interactions_csv
+
+
+def _selection_organs(store, medicines):
+    """Organs the Patient Dashboard body view highlights for selected medicines"""
+    return organs_from_mask(medicine_organ_mask(medicines) | store.interaction_organ_mask(medicines))
+
+
+def test_organ_mask_round_trip():
+    assert organs_from_mask(organ_mask(['kidneys', 'brain'])) == ['brain', 'kidneys']
+    assert organ_mask([]) == 0
+    assert organs_from_mask(sum(ORGAN_BITS.values())) == list(ORGAN_BITS)
+
+
+def test_medicine_organ_mask():
+    assert organs_from_mask(medicine_organ_mask(['Sertraline'])) == ['brain']
+    assert organs_from_mask(medicine_organ_mask(['Aspirin', 'Albuterol'])) == ['heart', 'lungs', 'stomach']
+    assert medicine_organ_mask(['Unknown']) == 0
+    # Selections of more than two medicines are not precomputed
+    assert organs_from_mask(medicine_organ_mask(['Sertraline', 'Albuterol', 'Lisinopril'])) == \
+        ['brain', 'heart', 'lungs', 'kidneys']
+
+
+def test_systems_organ_mask_matches_classifier_systems():
+    assert systems_organ_mask(0) == 0
+    for text in ('severe hemorrhage', 'renal failure and liver toxicity', 'skin rash', 'seizures and nausea'):
+        _, systems_mask = classify_interaction(text)
+        assert systems_organ_mask(systems_mask) == SYSTEMS_ORGAN_MASKS[systems_mask]
+    _, systems_mask = classify_interaction('renal failure and liver toxicity')
+    assert organs_from_mask(systems_organ_mask(systems_mask)) == ['liver', 'kidneys']
+
+
+def test_target_organ_mask_and_cache_bound():
+    assert organs_from_mask(target_organ_mask('Digestive System')) == ['stomach', 'liver']
+    assert target_organ_mask('None') == 0
+
+    for i in range(MAX_CACHED_TARGETS + 10):
+        assert organs_from_mask(target_organ_mask(f'Heart {i}')) == ['heart']
+    assert len(_target_masks) <= MAX_CACHED_TARGETS
+
+
+def test_single_medicine_highlights_its_own_organs(fixture_store):
+    # Sertraline and Lisinopril have dataset interactions with drugs that are not selected
+    assert fixture_store.interaction_organ_mask(['Sertraline']) == 0
+    assert fixture_store.interaction_organ_mask(['Lisinopril']) == 0
+    assert _selection_organs(fixture_store, ['Lisinopril']) == ['heart', 'kidneys']
+    assert _selection_organs(fixture_store, ['Albuterol']) == ['lungs']
+
+
+def test_pair_adds_interaction_organs_to_medicine_organs(tmp_path):
+    path = tmp_path / 'drug_interactions.csv'
+    write_interactions_csv(path, INTERACTION_ROWS + [['Metformin', 'Albuterol', 'May rarely cause renal failure']])
+    store = InteractionStore(str(path))
+
+    assert organs_from_mask(store.interaction_organ_mask(['Albuterol', 'Metformin'])) == ['kidneys']
+    assert _selection_organs(store, ['Albuterol', 'Metformin']) == ['lungs', 'stomach', 'liver', 'kidneys']
+
+    # A pair without a dataset interaction shows just the medicines' organs
+    assert store.interaction_organ_mask(['Albuterol', 'Sertraline']) == 0
+    assert _selection_organs(store, ['Albuterol', 'Sertraline']) == ['brain', 'lungs']
+
+
+def test_highlight_styles():
+    mask = organ_mask(['heart', 'lungs', 'stomach'])
+    assert highlight_style('heart', mask) is HIGHLIGHT_STYLES['error']
+    assert highlight_style('stomach', mask) is HIGHLIGHT_STYLES['warning']
+    assert highlight_style('lungs', mask) is HIGHLIGHT_STYLES['success']
+    assert highlight_style('brain', mask) is HIGHLIGHT_STYLES['normal']
+    assert highlight_style('heart', 0) is HIGHLIGHT_STYLES['normal']
+
+
+def test_body_view_html():
+    html = body_view_html(organ_mask(['heart']))
+    assert body_view_html(organ_mask(['heart'])) is html
+    assert html.count(HIGHLIGHT_STYLES['error']['background']) == 1
+    assert html.count(HIGHLIGHT_STYLES['normal']['status']) == 6
+    assert html.count('Lung') == 2
+
+    # Both lung cells follow the one lungs bit
+    lungs = body_view_html(organ_mask(['lungs']))
+    assert lungs.count(HIGHLIGHT_STYLES['success']['background']) == 2
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized population risk scoring
+"""
+
+import numpy as np
+import pandas as pd
+
+from agents.summary_agent import SummaryAgent, population_flags_from_mask
+
+# Per-patient risk factor text for each population flag that adds to the score
+FLAG_FACTORS = {
+    'high_twin_risk': 'High digital twin risk level',
+    'moderate_twin_risk': 'Moderate digital twin risk level',
+    'hypertension': 'Hypertension',
+    'tachycardia': 'Tachycardia',
+    'low_oxygen': 'Low oxygen saturation'
+}
+
+
+def _population(n=300, seed=5):
+    rng = np.random.default_rng(seed)
+
+    def vital(low, high):
+        values = rng.integers(low, high, n).astype(float)
+        values[rng.random(n) < 0.15] = np.nan
+        return values
+
+    return pd.DataFrame({
+        'twin_risk': rng.choice(['Healthy', 'Mild Risk', 'High Risk'], n),
+        'heart_rate': vital(50, 130),
+        'bp_sys': vital(90, 180),
+        'o2_sat': vital(85, 101),
+        'high_risk_interactions': rng.integers(0, 3, n),
+        'medium_risk_interactions': rng.integers(0, 3, n),
+        'active_emergencies': rng.choice([0, 0, 0, 1, 2], n)
+    })
+
+
+def _single_patient_risk(agent, row):
+    """Score one population row through the per-patient assessment"""
+    latest_vitals = {
+        field: row[field] for field in ('heart_rate', 'bp_sys', 'o2_sat') if not np.isnan(row[field])
+    }
+    interactions = (
+        [{'severity': 'High'}] * int(row['high_risk_interactions'])
+        + [{'severity': 'Medium'}] * int(row['medium_risk_interactions'])
+    )
+    emergencies = [{'resolved': False}] * int(row['active_emergencies']) + [{'resolved': True}]
+    return agent._assess_overall_risk(
+        [latest_vitals] if latest_vitals else [], [], interactions, emergencies,
+        {'current_state': row['twin_risk']}
+    )
+
+
+def test_population_matches_per_patient_scoring():
+    agent = SummaryAgent()
+    patients = _population()
+    population = agent.assess_population_risk(patients)
+
+    for i, row in patients.iterrows():
+        single = _single_patient_risk(agent, row)
+        assert population['risk_score'][i] == single['risk_score'], i
+        assert population['risk_level'][i] == single['overall_risk_level'], i
+
+        flags = population_flags_from_mask(population['risk_flags'][i])
+        expected = [factor for flag, factor in FLAG_FACTORS.items() if flag in flags]
+        assert [factor for factor in single['risk_factors'] if factor in FLAG_FACTORS.values()] == expected
+        assert ('high_risk_interactions' in flags) == (row['high_risk_interactions'] > 0)
+        assert ('active_emergencies' in flags) == (row['active_emergencies'] > 0)
+
+    scores = population['risk_score'][population['triage_order']]
+    assert list(scores) == sorted(population['risk_score'], reverse=True)
+
+
+def test_dict_input_and_missing_columns():
+    agent = SummaryAgent()
+    population = agent.assess_population_risk({'heart_rate': [120, np.nan, 80], 'active_emergencies': [0, 2, 0]})
+    assert population['risk_score'].tolist() == [8, 40, 0]
+    assert population['risk_level'].tolist() == ['Low', 'Moderate', 'Low']
+    assert population['triage_order'].tolist() == [1, 0, 2]
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk PDF report export
+"""
+
+import zipfile
+
+from agents.report_export import export_reports, report_file_names
+
+
+def _patient(patient_id):
+    return {
+        'patient_info': {
+            'name': f'Patient {patient_id}',
+            'patient_id': patient_id,
+            'age': 60,
+            'gender': 'Male',
+            'primary_condition': 'Hypertension',
+            'report_date': '2026-01-01 08:00:00'
+        },
+        'vitals_history': [{'date': '2026-01-01', 'heart_rate': 82, 'bp_sys': 145}],
+        'medications': [{'name': 'Lisinopril', 'dosage': '10mg', 'frequency': 'Once daily', 'start_date': '2025-01-15'}]
+    }
+
+
+def test_report_file_names():
+    patients = [_patient('P1'), _patient('P/1'), _patient('P_1'), {'patient_info': {}}]
+    assert report_file_names(patients) == [
+        'patient_summary_P1.pdf', 'patient_summary_P_1.pdf', 'patient_summary_P_1_2.pdf',
+        'patient_summary_no_id_4.pdf'
+    ]
+
+
+def test_export_in_spawned_workers(tmp_path):
+    progress = []
+    archive = tmp_path / 'reports.zip'
+    result = export_reports([_patient('P1'), _patient('P2')], str(archive), max_workers=1,
+                            progress=lambda done, total, name: progress.append((done, total)))
+
+    assert result == {'exported': ['patient_summary_P1.pdf', 'patient_summary_P2.pdf'], 'failed': {}}
+    assert progress == [(1, 2), (2, 2)]
+    with zipfile.ZipFile(archive) as zip_file:
+        assert zip_file.namelist() == result['exported']
+        assert all(zip_file.read(name).startswith(b'%PDF') for name in zip_file.namelist())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached PDF report service
+"""
+
+import copy
+
+from agents import report_service
+from agents.agent_cache import context_fingerprint
+from agents.report_service import ReportService, report_content
+
+PATIENT_DATA = {
+    'patient_info': {
+        'name': 'Jane Doe',
+        'patient_id': 'P1',
+        'age': 47,
+        'gender': 'Female',
+        'primary_condition': 'Hypertension',
+        'report_date': '2026-01-01 08:00:00'
+    },
+    'vitals_history': [{'date': '2026-01-01', 'heart_rate': 78, 'bp_sys': 130}],
+    'medications': [{'name': 'Lisinopril', 'dosage': '10mg', 'frequency': 'Once daily', 'start_date': '2025-01-15'}]
+}
+
+AI_SUMMARY = {
+    'summary': 'Stable blood pressure on current medication.',
+    'recommendations': ['Continue current medication', 'Recheck blood pressure in 3 months'],
+    'risk_assessment': {'overall_risk_level': 'Low'}
+}
+
+
+def _counting_renders(monkeypatch):
+    renders = []
+    render = report_service.render_report
+
+    def counting_render(content, output):
+        renders.append(content)
+        render(content, output)
+
+    monkeypatch.setattr(report_service, 'render_report', counting_render)
+    return renders
+
+
+def test_repeat_request_served_from_cache(monkeypatch):
+    renders = _counting_renders(monkeypatch)
+    service = ReportService()
+
+    first = service.get_pdf(PATIENT_DATA, AI_SUMMARY)
+    second = service.get_pdf(copy.deepcopy(PATIENT_DATA), copy.deepcopy(AI_SUMMARY))
+
+    assert first.startswith(b'%PDF')
+    assert second == first
+    assert len(renders) == 1
+    assert (service.hits, service.misses) == (1, 1)
+
+    # Fields the report does not show do not affect the cache key
+    changed_vitals = dict(PATIENT_DATA, vitals_history=[])
+    changed_risk = dict(AI_SUMMARY, risk_assessment={'overall_risk_level': 'High'})
+    assert service.get_pdf(changed_vitals, changed_risk) == first
+    assert len(renders) == 1
+
+
+def test_content_change_renders_new_report(monkeypatch):
+    renders = _counting_renders(monkeypatch)
+    service = ReportService()
+    first = service.get_pdf(PATIENT_DATA, AI_SUMMARY)
+
+    changed = dict(AI_SUMMARY, recommendations=AI_SUMMARY['recommendations'] + ['Reduce salt intake'])
+    assert context_fingerprint(report_content(PATIENT_DATA, changed)) != \
+        context_fingerprint(report_content(PATIENT_DATA, AI_SUMMARY))
+
+    updated = service.get_pdf(PATIENT_DATA, changed)
+    assert updated != first
+    assert len(renders) == 2
+    assert renders[1]['recommendations'][-1] == 'Reduce salt intake'
+
+    # Both versions stay cached
+    assert service.get_pdf(PATIENT_DATA, AI_SUMMARY) == first
+    assert service.get_pdf(PATIENT_DATA, changed) == updated
+    assert len(renders) == 2
+
+
+def test_least_recently_used_report_is_evicted(monkeypatch):
+    renders = _counting_renders(monkeypatch)
+    service = ReportService(max_entries=1, spool_size=1024)
+    service.get_pdf(PATIENT_DATA, AI_SUMMARY)
+    service.get_pdf(PATIENT_DATA, dict(AI_SUMMARY, summary='Blood pressure improving.'))
+    service.get_pdf(PATIENT_DATA, AI_SUMMARY)
+    assert len(renders) == 3
+    assert service.misses == 3
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded, decaying risk factor set
+"""
+
+from datetime import datetime, timedelta
+
+from agents.risk_factors import RiskFactorSet
+
+START = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def test_repeated_factor_is_counted_once():
+    factors = RiskFactorSet()
+    for minute in range(5):
+        factors.add('Tachycardia', START + timedelta(minutes=minute))
+
+    assert len(factors) == 1
+    details = factors.details()[0]
+    assert details['count'] == 5
+    assert details['first_seen'] == START
+    assert details['last_seen'] == START + timedelta(minutes=4)
+
+
+def test_count_bound_evicts_least_recently_seen():
+    factors = RiskFactorSet(max_size=3, decay=None)
+    for minute, name in enumerate(['A', 'B', 'C', 'A', 'D', 'E']):
+        factors.add(name, START + timedelta(minutes=minute))
+        assert len(factors) <= 3
+
+    # B and C were seen least recently; A was refreshed before D arrived
+    assert factors.names() == ['A', 'D', 'E']
+    assert 'B' not in factors
+
+    # An evicted factor starts counting again
+    factors.add('B', START + timedelta(minutes=10))
+    assert factors.names() == ['D', 'E', 'B']
+    assert factors.details()[-1]['count'] == 1
+
+
+def test_decay_expires_unseen_factors():
+    factors = RiskFactorSet(decay=timedelta(hours=1))
+    factors.add('Fever', START)
+    factors.add('Hypertension', START + timedelta(minutes=30))
+    factors.add('Fever', START + timedelta(minutes=40))
+
+    factors.expire(START + timedelta(minutes=90))
+    assert factors.names() == ['Hypertension', 'Fever']
+
+    factors.expire(START + timedelta(minutes=95))
+    assert factors.names() == ['Fever']
+
+    factors.expire(START + timedelta(minutes=100))
+    assert factors.names() == ['Fever']
+    factors.expire(START + timedelta(minutes=101))
+    assert len(factors) == 0
+
+
+def test_no_decay_keeps_factors():
+    factors = RiskFactorSet(decay=None)
+    factors.add('Fever', START)
+    factors.expire(START + timedelta(days=365))
+    assert factors.names() == ['Fever']
+
+
+def test_discard_prefix():
+    factors = RiskFactorSet()
+    factors.add('Active Emergency: Fall', START)
+    factors.add('Fever', START)
+    factors.add('Active Emergency: Chest pain', START)
+    factors.discard_prefix('Active Emergency:')
+    factors.discard('Missing')
+    assert factors.names() == ['Fever']
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tests for the digital twin event log and snapshot replay
+"""
+
+import copy
+import random
+import time
+from datetime import datetime, timedelta
+
+from agents.digital_twin_agent import DigitalTwinAgent, TwinState
+from agents.twin_events import TwinEventLog
+
+START = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def _events(count, seed=3):
+    """Random (datetime, event_type, event_data) tuples, one minute apart"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        timestamp = START + timedelta(minutes=i)
+        kind = rng.random()
+        if kind < 0.7:
+            event = ('vitals_update', {
+                'heart_rate': rng.randint(50, 130),
+                'blood_pressure_sys': rng.randint(85, 170),
+                'blood_pressure_dia': rng.randint(55, 100),
+                'temperature': rng.choice([96.5, 98.6, 100.2]),
+                'oxygen_saturation': rng.randint(90, 100)
+            })
+        elif kind < 0.85:
+            event = ('drug_interaction', {'severity': rng.choice(['High', 'Medium', 'Low', 'None'])})
+        elif kind < 0.95:
+            event = ('emergency', {'type': 'Chest pain', 'severity': rng.choice(['High', 'Low'])})
+        else:
+            event = ('emergency_resolved', {})
+        events.append((timestamp, event[0], dict(event[1], timestamp=timestamp)))
+    return events
+
+
+def _new_twin(snapshot_interval=10, max_snapshots=1000, max_bytes=10 ** 9):
+    state = TwinState()
+    state.last_updated = START - timedelta(days=1)
+    log = TwinEventLog(state.to_dict(), snapshot_interval, max_snapshots, max_bytes)
+    return DigitalTwinAgent('P1', state, log)
+
+
+def _full_replay(events, until=None):
+    """State from applying every event up to a time, in time order, with no snapshots"""
+    twin = _new_twin()
+    for timestamp, event_type, event_data in sorted(events, key=lambda event: event[0]):
+        if until is None or timestamp <= until:
+            twin._apply_event(event_type, event_data, timestamp)
+    twin._update_risk_level()
+    return twin._get_current_state()
+
+
+def test_snapshot_replay_matches_full_replay():
+    events = _events(250)
+    twin = _new_twin()
+    for _, event_type, event_data in events:
+        twin.run(event_type, event_data)
+
+    for minutes in (0, 9, 10, 11, 99, 137, 249):
+        when = START + timedelta(minutes=minutes, seconds=30)
+        assert twin.state_at(when) == _full_replay(events, when)
+
+    current = twin._get_current_state()
+    assert current == _full_replay(events)
+
+
+def test_late_events_are_merged_in_time_order():
+    events = _events(120)
+    late = events[40:45]
+    twin = _new_twin()
+    for _, event_type, event_data in events[:40] + events[45:]:
+        twin.run(event_type, event_data)
+
+    for _, event_type, event_data in late:
+        result = twin.run(event_type, event_data)
+        assert 'error' not in result
+
+    assert len(twin.events) == len(events)
+    assert [event[0] for event in twin.events.events()] == [event[0] for event in events]
+    assert twin._get_current_state() == _full_replay(events)
+    for minutes in (30, 42, 44, 60, 119):
+        when = START + timedelta(minutes=minutes, seconds=30)
+        assert twin.state_at(when) == _full_replay(events, when)
+
+
+def test_backfill_batch_out_of_order():
+    events = _events(150)
+    twin = _new_twin()
+    for _, event_type, event_data in events[100:]:
+        twin.run(event_type, event_data)
+
+    backfill = [(event_type, event_data) for _, event_type, event_data in events[:100]]
+    random.Random(5).shuffle(backfill)
+    result = twin.apply_events(backfill)
+
+    assert result['failed_events'] == []
+    assert twin._get_current_state()['health_score'] == _full_replay(events)['health_score']
+    assert [event[0] for event in twin.events.events()] == [event[0] for event in events]
+
+
+def test_bulk_backfill_matches_per_event_updates():
+    events = _events(3000)
+    bulk = _new_twin(snapshot_interval=20, max_bytes=40 * 1024)
+    single = _new_twin(snapshot_interval=20, max_bytes=40 * 1024)
+
+    result = bulk.apply_events([(event_type, event_data) for _, event_type, event_data in events])
+    for _, event_type, event_data in events:
+        single.run(event_type, event_data)
+
+    assert result['failed_events'] == []
+    assert bulk._get_current_state() == single._get_current_state()
+    assert len(bulk.events) == len(single.events) == 3000
+    assert bulk.events.events() == single.events.events()
+    for minutes in (2900, 2950, 2999):
+        when = START + timedelta(minutes=minutes, seconds=30)
+        assert bulk.state_at(when) == single.state_at(when) == _full_replay(events, when)
+
+
+def test_year_of_minute_readings_backfills_quickly():
+    readings = [
+        {'heart_rate': 60 + i % 50, 'blood_pressure_sys': 100 + i % 45, 'blood_pressure_dia': 70 + i % 25,
+         'temperature': 98.6, 'oxygen_saturation': 94 + i % 6}
+        for i in range(97)
+    ]
+    count = 365 * 24 * 60
+    batch = [
+        ('vitals_update', dict(readings[i % 97], timestamp=START + timedelta(minutes=i)))
+        for i in range(count)
+    ]
+    twin = _new_twin(snapshot_interval=100, max_snapshots=50, max_bytes=256 * 1024)
+
+    started = time.perf_counter()
+    result = twin.apply_events(batch)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 5.0
+    assert result['failed_events'] == []
+    assert len(twin.events) == count
+    assert twin.events.nbytes <= 256 * 1024 + 100 * 400
+
+    # Only the latest part of the year stays replayable
+    last = START + timedelta(minutes=count - 1)
+    assert twin.state_at(START + timedelta(days=300)) is None
+    assert twin.state_at(last) == twin._get_current_state()
+
+
+def test_failed_event_is_not_logged():
+    twin = _new_twin()
+    twin.run('vitals_update', {'heart_rate': 80, 'timestamp': START})
+    result = twin.run('drug_interaction', {'severity': 'High', 'timestamp': 'not a time'})
+    assert 'error' not in result
+    result = twin.run('vitals_update', {'heart_rate': 'fast', 'timestamp': START + timedelta(minutes=1)})
+    assert 'error' in result
+    assert len(twin.events) == 2
+
+
+def test_retention_stays_within_byte_budget():
+    twin = _new_twin(snapshot_interval=20, max_bytes=40 * 1024)
+    for _, event_type, event_data in _events(2000):
+        twin.run(event_type, event_data)
+
+    log = twin.events
+    assert len(log) == 2000
+    assert log.nbytes <= 40 * 1024 + 20 * 400
+    assert log.earliest_time > START.timestamp()
+    assert twin.state_at(START) is None
+
+
+def test_backfill_reports_failed_events():
+    twin = _new_twin()
+    twin.run('vitals_update', {'heart_rate': 80, 'timestamp': START + timedelta(hours=1)})
+    result = twin.apply_events([
+        ('vitals_update', {'heart_rate': 'fast', 'timestamp': START}),
+        ('unknown_event', {'timestamp': START}),
+        ('drug_interaction', {'severity': 'Low', 'timestamp': START + timedelta(minutes=5)})
+    ])
+
+    assert [failure['index'] for failure in result['failed_events']] == [0, 1]
+    assert result['failed_events'][1]['event_type'] == 'unknown_event'
+    assert [event[1] for event in twin.events.events()] == ['drug_interaction', 'vitals_update']
+
+
+def test_failed_event_leaves_state_unchanged():
+    twin = _new_twin()
+    twin.run('vitals_update', {'heart_rate': 120, 'temperature': 101.0, 'timestamp': START})
+    twin.run('emergency', {'type': 'Fall', 'severity': 'Low', 'timestamp': START + timedelta(minutes=1)})
+    before = copy.deepcopy(twin._get_current_state())
+    state_before = copy.deepcopy(twin.state.to_dict())
+
+    # Two days later the risk factors above would expire before each handler failed
+    later = START + timedelta(days=2)
+    bad_events = [
+        ('emergency', {'type': 'Chest pain', 'severity': ['High'], 'timestamp': later}),
+        ('medicine_intake', {'medicine': 'Aspirin', 'interaction': 'High', 'timestamp': later}),
+        ('vitals_update', {'heart_rate': 80, 'blood_pressure_sys': 'high', 'timestamp': later}),
+    ]
+    for event_type, event_data in bad_events:
+        assert 'error' in twin.run(event_type, event_data)
+        assert twin._get_current_state() == before
+
+    result = twin.apply_events(bad_events)
+    assert [failure['index'] for failure in result['failed_events']] == [0, 1, 2]
+    assert twin._get_current_state() == before
+    assert twin.state.risk_factors.details() == state_before['risk_factors'].details()
+    assert len(twin.events) == 2
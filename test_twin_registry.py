@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the digital twin registry's memory accounting and spill to disk
+"""
+
+from datetime import datetime, timedelta
+
+from agents.twin_registry import TwinRegistry
+
+START = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def _vitals(minute):
+    return {'heart_rate': 70 + minute % 30, 'blood_pressure_sys': 120, 'timestamp': START + timedelta(minutes=minute)}
+
+
+def _resident_total(registry):
+    return sum(twin.nbytes for twin in registry._twins.values())
+
+
+def test_resident_bytes_tracks_updates(tmp_path):
+    registry = TwinRegistry(spill_dir=str(tmp_path))
+    for minute in range(50):
+        registry.run(f'P{minute % 3}', 'vitals_update', _vitals(minute))
+        assert registry.resident_bytes == _resident_total(registry)
+
+    registry.apply_events('P1', [('vitals_update', _vitals(minute)) for minute in range(100, 140)])
+    assert registry.resident_bytes == _resident_total(registry)
+
+    # A failed event leaves the count alone
+    registry.run('P2', 'vitals_update', {'heart_rate': 'fast'})
+    assert registry.resident_bytes == _resident_total(registry)
+
+    registry.remove('P0')
+    assert registry.resident_bytes == _resident_total(registry)
+
+
+def test_memory_budget_spills_and_reloads(tmp_path):
+    registry = TwinRegistry(spill_dir=str(tmp_path), memory_budget=20 * 1024)
+    for patient in range(10):
+        for minute in range(30):
+            registry.run(f'P{patient}', 'vitals_update', _vitals(minute))
+
+    assert len(registry) < 10
+    assert registry.resident_bytes == _resident_total(registry)
+    assert sorted(registry.patient_ids()) == [f'P{patient}' for patient in range(10)]
+
+    # Loading a spilled twin back counts it again and spills another
+    assert 'P0' not in registry._twins
+    assert len(registry.get('P0').events) == 30
+    assert 'P0' in registry._twins
+    assert registry.resident_bytes == _resident_total(registry)
+    assert registry.resident_bytes <= 20 * 1024
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the seeded vitals simulator and CSV record/replay
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from agents.vitals_simulator import (
+    SIMULATED_FIELDS, VitalsSimulator, record_readings, replay_readings
+)
+
+START = datetime(2026, 1, 1, 8, 0, 0)
+
+
+def _simulator(seed=42):
+    simulator = VitalsSimulator(n_patients=3, rate_hz=2.0, seed=seed, start_time=START)
+    simulator.inject_event('sepsis', start=20, duration=40, patient_id='P0002')
+    return simulator
+
+
+def test_same_seed_same_stream():
+    first = list(_simulator().readings(ticks=100))
+    second = list(_simulator().readings(ticks=100))
+    assert first == second
+    assert len(first) == 300
+    assert first != list(_simulator(seed=43).readings(ticks=100))
+
+
+def test_generate_matches_readings():
+    columns = _simulator().generate(50)
+    readings = list(_simulator().readings(ticks=50))
+
+    assert list(columns['patient_id']) == [reading['patient_id'] for reading in readings]
+    assert list(columns['timestamp']) == [np.datetime64(reading['timestamp'], 'ns') for reading in readings]
+    for field in SIMULATED_FIELDS:
+        assert columns[field].tolist() == [reading[field] for reading in readings]
+
+
+def test_injected_event_affects_only_its_patient():
+    readings = list(_simulator().readings(ticks=120))
+    during = readings[150:240]  # 25-40 s in, after the ramp
+    by_patient = {}
+    for reading in during:
+        by_patient.setdefault(reading['patient_id'], []).append(reading['temperature'])
+
+    assert np.mean(by_patient['P0002']) > np.mean(by_patient['P0001']) + 1.5
+    assert np.mean(by_patient['P0002']) > np.mean(by_patient['P0003']) + 1.5
+
+
+def test_record_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'vitals.csv')
+    readings = list(_simulator().readings(ticks=40))
+    readings[5] = dict(readings[5], temperature=None)
+
+    assert record_readings(readings, path) == len(readings)
+    assert list(replay_readings(path)) == readings
+
+    replayed = list(replay_readings(path, patient_id='P0003'))
+    assert replayed == [reading for reading in readings if reading['patient_id'] == 'P0003']
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental vital sign statistics
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from agents.summary_agent import SummaryAgent
+from agents.vitals_stats import RunningStats
+from agents.vitals_stream import VitalsStream
+
+
+def _values():
+    rng = np.random.default_rng(7)
+    values = rng.normal(80, 12, 500)
+    values[rng.choice(len(values), 40, replace=False)] = np.nan
+    return values
+
+
+def test_running_stats_match_numpy():
+    values = _values()
+    stats = RunningStats(window=25, alpha=0.2)
+    for value in values:
+        stats.update(float(value))
+
+    present = values[~np.isnan(values)]
+    assert stats.count == len(present)
+    assert stats.mean == pytest.approx(np.mean(present))
+    assert stats.variance == pytest.approx(np.var(present, ddof=1))
+    assert stats.std == pytest.approx(np.std(present, ddof=1))
+    assert stats.min == np.min(present)
+    assert stats.max == np.max(present)
+    assert stats.last == present[-1]
+
+    recent = present[-25:]
+    assert stats.rolling_count == 25
+    assert stats.rolling_mean == pytest.approx(np.mean(recent))
+    assert stats.rolling_min == np.min(recent)
+    assert stats.rolling_max == np.max(recent)
+
+    ewma = present[0]
+    for value in present[1:]:
+        ewma = 0.2 * value + 0.8 * ewma
+    assert stats.ewma == pytest.approx(ewma)
+
+
+def test_running_stats_rolling_window_at_every_step():
+    values = _values()[:120]
+    stats = RunningStats(window=10)
+    present = []
+    for value in values:
+        stats.update(float(value))
+        if not math.isnan(value):
+            present.append(value)
+        if present:
+            recent = present[-10:]
+            assert stats.rolling_mean == pytest.approx(np.mean(recent))
+            assert stats.rolling_min == min(recent)
+            assert stats.rolling_max == max(recent)
+
+
+def test_running_stats_empty():
+    stats = RunningStats()
+    stats.update(None)
+    summary = stats.summary()
+    assert summary['count'] == 0
+    assert summary['mean'] is None
+    assert summary['rolling_mean'] is None
+    assert summary['std'] == 0.0
+
+
+def test_summary_key_metrics_from_stream():
+    stream = VitalsStream(capacity=50)
+    heart_rates = [72, 88, 65, 90, 101]
+    for heart_rate in heart_rates:
+        stream.append({'heart_rate': heart_rate, 'blood_pressure_systolic': heart_rate + 50})
+
+    summary = SummaryAgent().run({'patient_info': {'patient_id': 'P1'}, 'vitals_stream': stream})
+    metrics = summary['key_metrics']
+    assert metrics['avg_heart_rate'] == pytest.approx(np.mean(heart_rates))
+    assert metrics['hr_range'] == '65-101'
+    assert metrics['bp_range'] == '115-151'
+
+
+def test_summary_key_metrics_cached_on_history_ends(monkeypatch):
+    agent = SummaryAgent()
+    calls = []
+    extract = agent._extract_key_metrics
+    monkeypatch.setattr(agent, '_extract_key_metrics', lambda history: calls.append(len(history)) or extract(history))
+
+    history = [{'date': f'2026-01-{day:02d}', 'heart_rate': 60 + day, 'bp_sys': 110 + day} for day in range(30, 0, -1)]
+    patient_data = {'patient_info': {'patient_id': 'P1'}, 'vitals_history': history}
+    first = agent.run(patient_data)['key_metrics']
+    assert agent.run(dict(patient_data, vitals_history=list(history)))['key_metrics'] == first
+    assert calls == [30]
+
+    # A new latest reading, or one dropped from the old end, rebuilds the metrics
+    newer = [{'date': '2026-01-31', 'heart_rate': 140, 'bp_sys': 150}] + history
+    assert agent.run(dict(patient_data, vitals_history=newer))['key_metrics']['hr_range'] == '61-140'
+    assert agent.run(dict(patient_data, vitals_history=newer[:-1]))['key_metrics']['hr_range'] == '62-140'
+    assert calls == [30, 31, 30]